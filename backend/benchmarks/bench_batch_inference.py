@@ -0,0 +1,65 @@
+# benchmarks/bench_batch_inference.py
+#
+# Compare per-row (`apply(analyze_all_models)`) and batched scoring throughput,
+# plus the padding efficiency of the length-bucketed batches.
+# Run from anywhere:  python3 backend/benchmarks/bench_batch_inference.py --rows 512
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+import sentiment_analysis as sa  # noqa: E402
+
+
+def load_sample_titles(n_rows):
+    titles = []
+    for path in sorted(glob.glob("data/raw_news/*_news.csv")):
+        df = pd.read_csv(path)
+        df.columns = [col.strip().lower() for col in df.columns]
+        if "title" in df.columns:
+            titles.extend(df["title"].dropna().astype(str).tolist())
+        if len(titles) >= n_rows:
+            break
+    return pd.Series(titles[:n_rows], name="title")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=256)
+    args = parser.parse_args()
+
+    titles = load_sample_titles(args.rows)
+    print(f"📰 Benchmarking {len(titles)} headlines | batch sizes: {sa.BATCH_SIZES}")
+
+    # Score cache disabled so both modes pay for every forward pass
+    per_row, per_row_s = timed(lambda: titles.apply(sa.analyze_all_models, use_cache=False).apply(pd.Series))
+    # score_titles: batched, without near-duplicate sharing, so both modes score the same titles
+    batched, batched_s = timed(lambda: sa.score_titles(titles, use_cache=False))
+
+    print(f"🐢 per-row : {per_row_s:8.2f}s  ({len(titles) / per_row_s:8.1f} rows/s)")
+    print(f"🚀 batched : {batched_s:8.2f}s  ({len(titles) / batched_s:8.1f} rows/s)")
+    print(f"⚡ speedup : {per_row_s / batched_s:8.2f}x")
+    sa.report_inference_stats()  # padding efficiency of the length-bucketed batches
+
+    for model_name in sa.MODEL_PIPELINES:
+        col = f"label_{model_name}"
+        agreement = (per_row[col] == batched[col]).mean()
+        max_diff = (per_row[f"score_{model_name}"] - batched[f"score_{model_name}"]).abs().max()
+        print(f"🔍 {model_name}: label agreement {agreement:.1%}, max score diff {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
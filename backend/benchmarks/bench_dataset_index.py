@@ -0,0 +1,90 @@
+# benchmarks/bench_dataset_index.py
+#
+# Per-request latency of a ticker + published-date-range lookup: the old full
+# scan (str.contains over every row, then to_datetime + mask) vs the cached
+# TickerDateIndex (binary search + slice), at 1x, 10x and 100x the current
+# merged row count (synthetic rows when the merged dataset isn't built).
+#   python3 backend/benchmarks/bench_dataset_index.py --lookups 200
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import storage  # noqa: E402
+from dataset_cache import TickerDateIndex  # noqa: E402
+
+
+def synthetic_merged(n_rows, n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    published = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n_rows), unit="m")
+    return pd.DataFrame({
+        "date": published.strftime("%Y-%m-%d %H:%M:%S"),
+        "published": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        "title": [f"Synthetic headline {i}" for i in range(n_rows)],
+        "ticker": rng.choice([f"T{i:03d}" for i in range(n_tickers)], n_rows),
+        "score_finbert": rng.random(n_rows),
+    })
+
+
+def scan_lookup(df, ticker, start, end):
+    """What the routes did before the index."""
+    df = df[df["ticker"].str.contains(ticker, case=False, na=False, regex=False)].copy()
+    df["published"] = pd.to_datetime(df["published"], errors="coerce")
+    return df[(df["published"] >= start) & (df["published"] <= end)]
+
+
+def per_lookup_ms(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(*q)
+    return 1000 * (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-rows", type=int, default=None, help="Defaults to the merged dataset's row count")
+    parser.add_argument("--tickers", type=int, default=None)
+    parser.add_argument("--lookups", type=int, default=100)
+    args = parser.parse_args()
+
+    base_rows, n_tickers = args.base_rows, args.tickers
+    if base_rows is None or n_tickers is None:
+        current = storage.read_table("merged", columns=["ticker"]) if storage.table_exists("merged") else pd.DataFrame()
+        base_rows = base_rows or len(current) or 20_000
+        n_tickers = n_tickers or (current["ticker"].nunique() if len(current) else 100)
+    print(f"📏 Base: {base_rows} rows, {n_tickers} tickers | {args.lookups} lookups per size")
+
+    rng = np.random.default_rng(1)
+    print(f"{'rows':>10}{'build s':>10}{'scan ms':>12}{'index ms':>12}{'speedup':>10}")
+    for factor in (1, 10, 100):
+        df = synthetic_merged(base_rows * factor, n_tickers)
+
+        start = time.perf_counter()
+        index = TickerDateIndex(df)
+        build_s = time.perf_counter() - start
+
+        queries = []
+        for _ in range(args.lookups):
+            day = datetime(2024, 1, 1) + pd.Timedelta(days=int(rng.integers(0, 330)))
+            queries.append((f"T{rng.integers(0, n_tickers):03d}", day, day + pd.Timedelta(days=30, seconds=-1)))
+
+        # The old path is slow enough at 100x that a handful of lookups is representative
+        scan_queries = queries[: max(1, args.lookups // factor)]
+        scan_ms = per_lookup_ms(lambda t, s, e: scan_lookup(df, t, s, e), scan_queries)
+        index_ms = per_lookup_ms(lambda t, s, e: index.lookup(t, s, e), queries)
+
+        t, s, e = queries[0]
+        assert len(scan_lookup(df, t, s, e)) == len(index.lookup(t, s, e))
+        print(f"{len(df):>10}{build_s:>10.2f}{scan_ms:>12.2f}{index_ms:>12.3f}{scan_ms / index_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
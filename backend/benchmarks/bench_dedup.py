@@ -0,0 +1,85 @@
+# benchmarks/bench_dedup.py
+#
+# Dedup keys on a synthetic 1M-headline frame: the previous per-row
+# df.apply(make_hash) MD5 + JSON manifest of hex digests vs dedup.row_keys +
+# the SeenKeys .npy store (key build, "already seen?" lookup, save + load).
+#   python3 backend/benchmarks/bench_dedup.py --rows 1000000
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+from dedup import SeenKeys, first_occurrence, row_keys  # noqa: E402
+
+
+def make_hash(row):
+    """The pre-dedup.py key, kept here for comparison."""
+    return hashlib.md5(f"{row.get('date','')}_{row.get('title','')}".lower().encode("utf-8")).hexdigest()
+
+
+def synthetic(n_rows, dup_rate, seed=0):
+    rng = np.random.default_rng(seed)
+    n_unique = int(n_rows * (1 - dup_rate))
+    dates = pd.Timestamp("2022-01-03") + pd.to_timedelta(rng.integers(0, 900 * 24 * 60, n_unique), unit="m")
+    titles = np.array([f"Company {i % 5000} reports quarterly update number {i}" for i in range(n_unique)], dtype=object)
+    pick = np.concatenate([np.arange(n_unique), rng.integers(0, n_unique, n_rows - n_unique)])
+    return pd.DataFrame({"date": dates[pick], "title": titles[pick]})
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    df = synthetic(args.rows, args.dup_rate)
+    half = len(df) // 2
+    print(f"🧪 {len(df)} rows | {args.dup_rate:.0%} duplicates")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy: per-row MD5, set membership, JSON manifest of hex digests
+        legacy_keys, legacy_build = timed(lambda: df.apply(make_hash, axis=1))
+        seen_set = set(legacy_keys[:half])
+        _, legacy_lookup = timed(lambda: ~legacy_keys[half:].isin(seen_set) & ~legacy_keys[half:].duplicated())
+        path = os.path.join(tmp, "manifest.json")
+        _, legacy_save = timed(lambda: json.dump({"hashes": sorted(seen_set)}, open(path, "w")))
+        _, legacy_load = timed(lambda: set(json.load(open(path))["hashes"]))
+        legacy_size = os.path.getsize(path)
+
+        # New: vectorized uint64 keys, sorted .npy store
+        keys, new_build = timed(lambda: row_keys(df))
+        seen = SeenKeys(os.path.join(tmp, "AAPL.keys.npy"))
+        seen.add(keys[:half])
+        _, new_lookup = timed(lambda: ~seen.contains(keys[half:]) & first_occurrence(keys[half:]))
+        _, new_save = timed(seen.save)
+        _, new_load = timed(lambda: SeenKeys(seen.path))
+        new_size = os.path.getsize(seen.path)
+
+    # Both schemes must agree on which rows are duplicates
+    assert (legacy_keys.duplicated().to_numpy() == ~first_occurrence(keys)).all()
+
+    print(f"{'step':12}{'legacy s':>10}{'dedup.py s':>12}{'speedup':>9}")
+    for step, old, new in [("build keys", legacy_build, new_build), ("lookup", legacy_lookup, new_lookup),
+                           ("save", legacy_save, new_save), ("load", legacy_load, new_load)]:
+        print(f"{step:12}{old:>10.2f}{new:>12.3f}{old / max(new, 1e-9):>8.0f}x")
+    print(f"💾 seen-set on disk: {legacy_size / 1e6:.1f} MB JSON ➜ {new_size / 1e6:.1f} MB .npy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_http_cache.py
+#
+# Exercise the HTTP cache against the local mock server (throwaway cache file):
+#   cold        every RSS / FMP news / price request goes to the server
+#   warm        everything is fresh ➜ served from SQLite, no requests
+#   revalidate  news entries expired ➜ conditional GETs answered 304;
+#               closed-day price ranges never expire and stay local
+#   python3 backend/benchmarks/bench_http_cache.py --tickers 200
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+from async_fetcher import AsyncFetcher  # noqa: E402
+from http_cache import HttpCache, cached_get  # noqa: E402
+from mock_news_server import start_server  # noqa: E402
+
+
+def run_pass(name, cache, server, base_url, symbols):
+    before = dict(server.stats)
+    start = time.perf_counter()
+
+    fetcher = AsyncFetcher(concurrency=32, cache=cache)
+    news = [(f"rss:{s}", f"{base_url}/rss/search", {"q": s}) for s in symbols]
+    news += [(f"fmp:{s}", f"{base_url}/api/v4/general_news", {"tickers": s, "limit": 10, "apikey": "demo"}) for s in symbols]
+    results = asyncio.run(fetcher.fetch_all(news))
+    assert all(r.ok for r in results.values())
+
+    # Prices go through the synchronous path used by stock_analysis.py
+    for s in symbols:
+        response = cached_get(f"{base_url}/api/v3/historical-price-full/{s}?from=2024-01-02&to=2024-03-28&apikey=demo", cache=cache)
+        assert response.status_code == 200 and response.json()["historical"]
+
+    seconds = time.perf_counter() - start
+    sent = {k: server.stats[k] - before[k] for k in before}
+    print(f"{name:12}{seconds:>9.2f}{sent['requests']:>10}{sent['not_modified']:>8}{sent['bytes'] / 1e6:>11.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency_ms=args.latency_ms)
+    symbols = [f"T{i:03d}" for i in range(args.tickers)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HttpCache(os.path.join(tmp, "http_cache.sqlite"))
+        print(f"{'pass':12}{'wall s':>9}{'requests':>10}{'304s':>8}{'MB sent':>11}")
+        run_pass("cold", cache, server, base_url, symbols)
+        run_pass("warm", cache, server, base_url, symbols)
+
+        # Age every entry that can expire
+        cache.conn.execute("UPDATE responses SET expires_at = 0 WHERE expires_at IS NOT NULL")
+        cache.conn.commit()
+        run_pass("revalidate", cache, server, base_url, symbols)
+        cache.report()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
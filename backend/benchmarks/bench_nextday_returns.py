@@ -0,0 +1,92 @@
+# benchmarks/bench_nextday_returns.py
+#
+# Next-day returns over a synthetic headline-level merged table: the previous
+# groupby('ticker').apply(shift) over headlines vs the vectorized per-(ticker,
+# trading day) engine in update_nextday_returns.py. Both are checked against a
+# per-day reference; the old one is wrong whenever a day has several headlines.
+#   python3 backend/benchmarks/bench_nextday_returns.py --rows 1000000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+from update_nextday_returns import compute_next_day_returns  # noqa: E402
+
+
+def legacy_next_day_returns(df):
+    """The pre-vectorization implementation, kept here for comparison."""
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values(by=['ticker', 'date'])
+
+    def group_logic(group):
+        group = group.sort_values(by='date')
+        group['nextdayclose'] = group['close'].shift(-1)
+        group['nextdayreturn'] = (group['nextdayclose'] - group['close']) / group['close']
+        return group
+
+    return df.groupby('ticker', group_keys=False).apply(group_logic)
+
+
+def synthetic_merged(n_rows, n_tickers, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2022-01-03", periods=n_days)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_tickers, n_days)), axis=1))
+    t = rng.integers(0, n_tickers, n_rows)
+    d = rng.integers(0, n_days, n_rows)
+    return pd.DataFrame({
+        "ticker": np.array([f"T{i:04d}" for i in range(n_tickers)])[t],
+        "date": days[d] + pd.to_timedelta(rng.integers(9 * 60, 16 * 60, n_rows), unit="m"),
+        "title": "headline",
+        "close": closes[t, d],
+    }), pd.Series(closes.ravel(), index=pd.MultiIndex.from_product([[f"T{i:04d}" for i in range(n_tickers)], days]))
+
+
+def reference_next_close(df, closes):
+    """Next trading day's close among the days that actually have headlines."""
+    seen = pd.DataFrame({"ticker": df["ticker"], "day": pd.to_datetime(df["date"]).dt.normalize()}).drop_duplicates()
+    seen = seen.sort_values(["ticker", "day"])
+    seen["next_day"] = seen.groupby("ticker")["day"].shift(-1)
+    lookup = seen.set_index(["ticker", "day"])["next_day"]
+    next_day = lookup.reindex(pd.MultiIndex.from_arrays([df["ticker"], pd.to_datetime(df["date"]).dt.normalize()]))
+    return closes.reindex(pd.MultiIndex.from_arrays([df["ticker"].to_numpy(), next_day.to_numpy()])).to_numpy()
+
+
+def mismatches(result, expected_by_index):
+    got = result.sort_index()["nextdayclose"].to_numpy()
+    return int((~np.isclose(got, expected_by_index, equal_nan=True)).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--days", type=int, default=500)
+    args = parser.parse_args()
+
+    df, closes = synthetic_merged(args.rows, args.tickers, args.days)
+    expected = reference_next_close(df, closes)
+    print(f"🧪 {len(df)} headline rows | {args.tickers} tickers | {args.days} trading days")
+
+    start = time.perf_counter()
+    legacy = legacy_next_day_returns(df.copy())
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = compute_next_day_returns(df.copy())
+    vectorized_s = time.perf_counter() - start
+
+    print(f"{'engine':12}{'seconds':>10}{'wrong rows':>12}")
+    print(f"{'legacy':12}{legacy_s:>10.2f}{mismatches(legacy, expected):>12}")
+    print(f"{'vectorized':12}{vectorized_s:>10.2f}{mismatches(vectorized, expected):>12}")
+    print(f"⚡ {legacy_s / vectorized_s:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
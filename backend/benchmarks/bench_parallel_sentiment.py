@@ -0,0 +1,61 @@
+# benchmarks/bench_parallel_sentiment.py
+#
+# Wall time of a full sentiment rebuild with 1..N worker processes.
+# Runs on a temporary copy of data/raw_news with the score cache disabled.
+#   python3 backend/benchmarks/bench_parallel_sentiment.py --max-workers 4 --symbols 16
+import argparse
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+os.environ["SENTIMENT_CACHE"] = "0"  # every run pays for every forward pass
+
+import sentiment_analysis as sa  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--symbols", type=int, default=16, help="Number of ticker files to score")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_parallel_")
+    input_dir = os.path.join(work_dir, "raw_news")
+    os.makedirs(input_dir)
+    files = [
+        f for f in sorted(glob.glob("data/raw_news/*_news.csv"))
+        if os.path.basename(f).split("_")[0].upper() in sa.ACTIVE_TICKERS
+    ][:args.symbols]
+    for f in files:
+        shutil.copy(f, input_dir)
+
+    results = []
+    try:
+        for workers in range(1, args.max_workers + 1):
+            start = time.perf_counter()
+            sa.run_sentiment_analysis(
+                incremental=False,
+                workers=workers,
+                input_dirs=[input_dir],
+                output_dir=os.path.join(work_dir, f"out_{workers}"),
+                manifest_dir=os.path.join(work_dir, f"state_{workers}"),
+                publish_parquet=False,
+            )
+            results.append((workers, time.perf_counter() - start))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline = results[0][1]
+    print(f"\n📊 {len(files)} ticker files, {os.cpu_count()} cores")
+    for workers, seconds in results:
+        print(f"  {workers:2d} workers: {seconds:8.2f}s  speedup {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_relevance.py
+#
+# Headline relevance at scale: the old per-headline loops (any() over the
+# keywords, then any() over every ticker symbol) vs the compiled
+# RelevanceClassifier, on synthetic titles. Results must agree exactly.
+#   python3 backend/benchmarks/bench_relevance.py --tickers 10000 --titles 50000
+import argparse
+import os
+import string
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+import relevance  # noqa: E402
+from relevance import SCRAPER_KEYWORDS, RelevanceClassifier  # noqa: E402
+
+WORDS = ["quarterly", "outlook", "rally", "investors", "board", "guidance", "sector", "analyst",
+         "plunge", "record", "holiday", "sales", "weather", "court", "ruling", "team", "season"]
+
+
+def synthetic(n_tickers, n_titles, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(string.ascii_uppercase))
+    symbols = sorted({"".join(rng.choice(letters, rng.integers(3, 6))) for _ in range(n_tickers * 2)})[:n_tickers]
+    vocab = WORDS + ["Inc", "Corp", "Group"]
+    titles = []
+    for _ in range(n_titles):
+        words = list(rng.choice(vocab, rng.integers(5, 12)))
+        roll = rng.random()
+        if roll < 0.1:
+            words.append(str(rng.choice(SCRAPER_KEYWORDS)))
+        elif roll < 0.3:
+            words.insert(0, str(rng.choice(symbols)))
+        titles.append(" ".join(words).capitalize())
+    return symbols, titles
+
+
+def legacy_reason(title, keywords, symbols):
+    title_lower = title.lower()
+    if any(kw in title_lower for kw in keywords):
+        return "keyword"
+    if any(sym.lower() in title_lower for sym in symbols):
+        return "symbol"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=10_000)
+    parser.add_argument("--titles", type=int, default=50_000)
+    parser.add_argument("--legacy-titles", type=int, default=2_000, help="Legacy loop is timed on a sample")
+    args = parser.parse_args()
+
+    symbols, titles = synthetic(args.tickers, args.titles)
+    backend = "pyahocorasick" if relevance.AHOCORASICK_AVAILABLE else "trie regex"
+    print(f"🧪 {len(symbols)} tickers | {len(SCRAPER_KEYWORDS)} keywords | {len(titles)} titles | {backend}")
+
+    start = time.perf_counter()
+    clf = RelevanceClassifier(SCRAPER_KEYWORDS, symbols)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reasons = clf.classify(titles)
+    compiled_s = time.perf_counter() - start
+
+    sample = titles[:args.legacy_titles]
+    start = time.perf_counter()
+    legacy = [legacy_reason(t, SCRAPER_KEYWORDS, symbols) for t in sample]
+    legacy_s = time.perf_counter() - start
+    assert legacy == reasons[:len(sample)], "compiled classifier disagrees with the legacy rules"
+
+    legacy_us = legacy_s / len(sample) * 1e6
+    compiled_us = compiled_s / len(titles) * 1e6
+    print(f"{'engine':12}{'titles':>9}{'seconds':>10}{'µs/title':>10}")
+    print(f"{'legacy':12}{len(sample):>9}{legacy_s:>10.2f}{legacy_us:>10.1f}")
+    print(f"{'compiled':12}{len(titles):>9}{compiled_s:>10.2f}{compiled_us:>10.1f}   (+{build_s:.2f}s build)")
+    print(f"⚡ {legacy_us / compiled_us:.0f}x faster per title | relevant: {sum(r is not None for r in reasons)}/{len(titles)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_sentiment_stream_memory.py
+#
+# Peak RSS of a full sentiment rebuild over a synthetic headline corpus, each
+# mode in its own child process, with a hash-based stand-in for the models
+# (run_sentiment_analysis(scorer=...)) so only ingestion and writing count:
+#   whole-files   chunk_rows=0 (every input file read and scored in one piece)
+#   stream        chunk_rows=--chunk-rows (SentimentWriter, bounded memory)
+# One symbol holds half of the corpus, so "grows with history" is visible.
+#   python3 backend/benchmarks/bench_sentiment_stream_memory.py --rows 5000000
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+os.environ["SENTIMENT_CACHE"] = "0"
+os.environ["NEAR_DEDUP"] = "0"
+
+MODES = ["whole-files", "stream"]
+WORDS = np.array("stock shares rally slump earnings beat miss guidance upgrade downgrade deal merger "
+                 "buyback dividend lawsuit probe launch outage record forecast".split())
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def hash_scorer(titles, source=None):
+    """Deterministic label_/score_ columns per model, without loading any model."""
+    import sentiment_analysis as sa
+    hashed = pd.util.hash_array(pd.Series(titles).astype(str).to_numpy(dtype=object))
+    labels = np.array(["positive", "neutral", "negative"])
+    results = {}
+    for i, model_name in enumerate(sa.MODEL_PIPELINES):
+        h = hashed >> np.uint64(8 * i)
+        results[f"label_{model_name}"] = labels[(h % np.uint64(3)).astype(int)]
+        results[f"score_{model_name}"] = (h % np.uint64(1000)).astype(float) / 1000
+    return pd.DataFrame(results, index=pd.Series(titles).index)
+
+
+def build_corpus(input_dir, symbols, n_rows, files_per_symbol, seed=0):
+    """CSV news files; about 5% of rows repeat an earlier headline of the same symbol."""
+    os.makedirs(input_dir)
+    rng = np.random.default_rng(seed)
+    shares = np.full(len(symbols), 0.5 / max(len(symbols) - 1, 1))
+    shares[0] = 0.5 if len(symbols) > 1 else 1.0
+    for symbol, share in zip(symbols, shares):
+        n = int(n_rows * share)
+        ids = np.arange(n)
+        repeats = rng.random(n) < 0.05
+        ids[repeats] = rng.integers(0, n, repeats.sum())
+        minutes = ids * 7 % (3 * 365 * 24 * 60)
+        dates = pd.Timestamp("2022-01-03") + pd.to_timedelta(minutes, unit="m")
+        titles = (pd.Series(WORDS[ids % len(WORDS)]).str.cat(
+            [pd.Series(WORDS[ids // len(WORDS) % len(WORDS)]), pd.Series(ids.astype(str))], sep=" ")
+            + f" at {symbol}")
+        df = pd.DataFrame({"date": dates, "title": titles, "source": "synthetic", "link": "https://example.com/" + titles.index.astype(str)})
+        for k, part in enumerate(np.array_split(np.arange(n), files_per_symbol)):
+            df.iloc[part].to_csv(os.path.join(input_dir, f"{symbol}_{k}_news.csv"), index=False)
+
+
+def run_child(mode, root, chunk_rows):
+    import sentiment_analysis as sa
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    output_dir = os.path.join(root, f"out_{mode}")
+    sa.run_sentiment_analysis(
+        incremental=False,
+        input_dirs=[os.path.join(root, "raw_news")],
+        output_dir=output_dir,
+        manifest_dir=os.path.join(root, f"state_{mode}"),
+        publish_parquet=False,
+        chunk_rows=chunk_rows if mode == "stream" else 0,
+        scorer=hash_scorer,
+    )
+    seconds, peak = time.perf_counter() - start, peak_rss_mb()
+    rows = sum(len(part) for f in os.listdir(output_dir)
+               for part in pd.read_csv(os.path.join(output_dir, f), usecols=["title"], chunksize=chunk_rows or 100_000))
+    return {"seconds": seconds, "baseline_mb": baseline, "peak_mb": peak, "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--files-per-symbol", type=int, default=4)
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--child", choices=["build"] + MODES)
+    parser.add_argument("--root")
+    args = parser.parse_args()
+
+    if args.child == "build":
+        # Own process: exec'ed children inherit the parent's peak RSS, so the parent stays small
+        import sentiment_analysis as sa
+        symbols = sorted(sa.ACTIVE_TICKERS)[:args.symbols]
+        build_corpus(os.path.join(args.root, "raw_news"), symbols, args.rows, args.files_per_symbol)
+        return
+    if args.child:
+        with open(os.devnull, "w") as quiet:  # keep stdout for the JSON line only
+            stdout, sys.stdout = sys.stdout, quiet
+            try:
+                result = run_child(args.child, args.root, args.chunk_rows)
+            finally:
+                sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    corpus_args = ["--rows", str(args.rows), "--symbols", str(args.symbols),
+                   "--files-per-symbol", str(args.files_per_symbol), "--chunk-rows", str(args.chunk_rows)]
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "build", "--root", root] + corpus_args,
+                       check=True)
+        print(f"🧪 {args.rows} headlines | {args.symbols} symbols × {args.files_per_symbol} files | "
+              f"largest symbol {args.rows // 2 if args.symbols > 1 else args.rows} rows | "
+              f"built in {time.perf_counter() - start:.1f}s")
+        print(f"{'mode':14}{'seconds':>9}{'baseline MB':>13}{'peak MB':>10}{'delta MB':>10}{'rows out':>11}")
+        for mode in MODES:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, "--root", root] + corpus_args,
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{mode:14} failed:\n{proc.stderr}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{mode:14}{r['seconds']:>9.2f}{r['baseline_mb']:>13.0f}{r['peak_mb']:>10.0f}"
+                  f"{r['peak_mb'] - r['baseline_mb']:>10.0f}{r['rows']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_storage.py
+#
+# Compare the legacy unified CSV with the partitioned Parquet dataset:
+# write time, full read, single-ticker read, column-subset read and size on disk.
+# Uses the real merged CSV when present, otherwise synthetic rows.
+#   python3 backend/benchmarks/bench_storage.py --rows 200000 --tickers 50
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import storage  # noqa: E402
+
+
+def synthetic_merged(n_rows, n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    tickers = np.array([f"T{i:03d}" for i in range(n_tickers)])
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n_rows), unit="m")
+    labels = np.array(["positive", "negative", "neutral"])
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "title": [f"Synthetic headline number {i} about the market" for i in range(n_rows)],
+        "source": rng.choice(["Reuters", "Bloomberg", "Yahoo"], n_rows),
+        "label_finbert": rng.choice(labels, n_rows),
+        "score_finbert": rng.random(n_rows),
+        "label_roberta": rng.choice(labels, n_rows),
+        "score_roberta": rng.random(n_rows),
+        "ticker": rng.choice(tickers, n_rows),
+        "close": rng.uniform(10, 500, n_rows).round(2),
+        "nextdayclose": rng.uniform(10, 500, n_rows).round(2),
+        "nextdayreturn": rng.normal(0, 0.02, n_rows),
+    })
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--tickers", type=int, default=50)
+    args = parser.parse_args()
+
+    if not storage.PARQUET_AVAILABLE:
+        print("❌ pyarrow is not installed")
+        return
+
+    real_csv = storage.DATASETS["merged"]["unified_csv"]
+    if os.path.exists(real_csv):
+        df = pd.read_csv(real_csv)
+        print(f"📄 Using {real_csv} ({len(df)} rows)")
+    else:
+        df = synthetic_merged(args.rows, args.tickers)
+        print(f"🧪 Using {len(df)} synthetic rows across {args.tickers} tickers")
+    probe = df["ticker"].iloc[0]
+
+    # Everything below writes relative to a scratch dir, never to outputs/
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+
+        _, csv_write_s = timed(lambda: df.to_csv("merged.csv", index=False))
+        _, csv_read_s = timed(lambda: pd.read_csv("merged.csv"))
+        _, csv_ticker_s = timed(lambda: (lambda d: d[d["ticker"] == probe])(pd.read_csv("merged.csv")))
+        _, csv_cols_s = timed(lambda: pd.read_csv("merged.csv", usecols=["date", "ticker", "score_finbert"]))
+        csv_size = os.path.getsize("merged.csv")
+
+        storage.WRITE_CSV = False
+        _, pq_write_s = timed(lambda: storage.write_table("merged", df))
+        _, pq_read_s = timed(lambda: storage.read_table("merged"))
+        _, pq_ticker_s = timed(lambda: storage.read_table("merged", tickers=[probe]))
+        _, pq_cols_s = timed(lambda: storage.read_table("merged", columns=["date", "ticker", "score_finbert"]))
+        pq_size = dir_size(storage.DATASET_DIR)
+
+        os.chdir(BACKEND_DIR)
+
+    print(f"{'':14}{'CSV':>12}{'Parquet':>12}")
+    for name, a, b in [
+        ("write s", csv_write_s, pq_write_s),
+        ("read all s", csv_read_s, pq_read_s),
+        ("read 1 tkr s", csv_ticker_s, pq_ticker_s),
+        ("read 3 col s", csv_cols_s, pq_cols_s),
+    ]:
+        print(f"{name:14}{a:12.3f}{b:12.3f}")
+    print(f"{'size MB':14}{csv_size / 1e6:12.2f}{pq_size / 1e6:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
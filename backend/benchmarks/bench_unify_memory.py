@@ -0,0 +1,115 @@
+# benchmarks/bench_unify_memory.py
+#
+# Peak RSS of the merged-table steps over a synthetic Parquet dataset, each
+# mode in its own child process:
+#   unify-legacy     read_table("merged") + one big to_csv (previous unifier)
+#   unify-stream     storage.export_unified_csv (one ticker at a time)
+#   nextday-legacy   read everything, compute returns, write_table
+#   nextday-stream   update_nextday_returns.main (per-ticker pass + streamed CSV)
+#   python3 backend/benchmarks/bench_unify_memory.py --tickers 200 --rows-per-ticker 5000
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+MODES = ["unify-legacy", "unify-stream", "nextday-legacy", "nextday-stream"]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_dataset(root, n_tickers, rows_per_ticker, seed=0):
+    import storage
+    os.chdir(root)
+    rng = np.random.default_rng(seed)
+    largest = 0
+    for i in range(n_tickers):
+        # One ticker 5x the others, so "bounded by the largest symbol" is visible
+        n = rows_per_ticker * (5 if i == 0 else 1)
+        days = pd.Timestamp("2022-01-03") + pd.to_timedelta(np.sort(rng.integers(0, 700 * 24 * 60, n)), unit="m")
+        df = pd.DataFrame({
+            "date": days,
+            "title": [f"Headline {j} about T{i:04d} and the market" for j in range(n)],
+            "source": "synthetic",
+            "score_finbert": rng.random(n),
+            "label_finbert": rng.choice(["positive", "neutral", "negative"], n),
+            "close": 100 + rng.normal(0, 5, n).cumsum() / 10,
+        })
+        if i % 2:
+            df["score_vader"] = rng.random(n)  # uneven model columns exercise the union schema
+        storage.write_ticker("merged", f"T{i:04d}", df, write_csv=False)
+        largest = max(largest, df.memory_usage(deep=True).sum())
+    return largest
+
+
+def run_child(mode):
+    import storage
+    import update_nextday_returns as unr
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+
+    if mode == "unify-legacy":
+        storage._write_csv(storage.read_table("merged"), storage.DATASETS["merged"]["unified_csv"])
+    elif mode == "unify-stream":
+        storage.export_unified_csv("merged")
+    elif mode == "nextday-legacy":
+        df = storage.read_table("merged")
+        df, covered = unr.apply_store_returns(df, unr.PriceStore())
+        fallback = ~df["ticker"].isin(covered)
+        df = pd.concat([df[~fallback], unr.compute_next_day_returns(df[fallback].copy())])
+        storage.write_table("merged", df)
+    elif mode == "nextday-stream":
+        unr.main()
+
+    return {"seconds": time.perf_counter() - start, "baseline_mb": baseline, "peak_mb": peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--rows-per-ticker", type=int, default=5000)
+    parser.add_argument("--child", choices=MODES)
+    parser.add_argument("--root")
+    args = parser.parse_args()
+
+    if args.child:
+        os.chdir(args.root)
+        with open(os.devnull, "w") as quiet:  # keep stdout for the JSON line only
+            stdout, sys.stdout = sys.stdout, quiet
+            try:
+                result = run_child(args.child)
+            finally:
+                sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as root:
+        largest = build_dataset(root, args.tickers, args.rows_per_ticker)
+        total_rows = args.rows_per_ticker * (args.tickers + 4)
+        print(f"🧪 {args.tickers} tickers | {total_rows} rows | largest ticker {largest / 1e6:.1f} MB in memory")
+        print(f"{'mode':16}{'seconds':>9}{'baseline MB':>13}{'peak MB':>10}{'delta MB':>10}")
+        for mode in MODES:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, "--root", root],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{mode:16} failed:\n{proc.stderr}")
+                continue
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{mode:16}{r['seconds']:>9.2f}{r['baseline_mb']:>13.0f}{r['peak_mb']:>10.0f}"
+                  f"{r['peak_mb'] - r['baseline_mb']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
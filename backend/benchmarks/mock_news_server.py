@@ -0,0 +1,123 @@
+# benchmarks/mock_news_server.py
+#
+# Local stand-in for Google News RSS and the FMP news / price APIs, with a
+# fixed per-request latency, so fetcher benchmarks don't depend on (or hammer)
+# the real services. Responses carry an ETag and answer If-None-Match with 304.
+#   GET /rss/search?q=...                          ➜ RSS feed with --items entries
+#   GET /api/v4/general_news?...                   ➜ FMP-style JSON list
+#   GET /api/v3/historical-price-full/SYM?from&to  ➜ FMP-style daily prices
+#
+#   python3 backend/benchmarks/mock_news_server.py --port 8799 --latency-ms 80
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+
+def make_handler(latency_s, n_items, stats):
+    class MockNewsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients can reuse connections
+
+        def _send(self, body, content_type):
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                stats["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            stats["bytes"] += len(body)
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            stats["requests"] += 1
+            time.sleep(latency_s)
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            now = datetime(2024, 6, 3, 15, 0, tzinfo=timezone.utc)
+
+            if url.path == "/rss/search":
+                q = query.get("q", [""])[0]
+                items = "".join(
+                    f"<item><title>{escape(q)} shares rise on earnings beat #{i}</title>"
+                    f"<link>https://example.com/{i}</link>"
+                    f"<pubDate>{format_datetime(now - timedelta(hours=i))}</pubDate></item>"
+                    for i in range(n_items)
+                )
+                body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>mock</title>{items}</channel></rss>'
+                return self._send(body.encode("utf-8"), "application/rss+xml")
+
+            if url.path == "/api/v4/general_news":
+                ticker = query.get("tickers", [""])[0]
+                items = [
+                    {"title": f"{ticker} headline #{i}", "publishedDate": (now - timedelta(hours=i)).isoformat()}
+                    for i in range(int(query.get("limit", [10])[0]))
+                ]
+                return self._send(json.dumps(items).encode("utf-8"), "application/json")
+
+            if url.path.startswith("/api/v3/historical-price-full/"):
+                symbol = url.path.rsplit("/", 1)[1]
+                days = [d.date() for d in business_days(query.get("from", ["2024-01-01"])[0], query.get("to", ["2024-01-31"])[0])]
+                historical = [
+                    {"date": d.isoformat(), "open": 100 + i, "high": 101 + i, "low": 99 + i, "close": 100.5 + i}
+                    for i, d in enumerate(reversed(days))
+                ]
+                return self._send(json.dumps({"symbol": symbol, "historical": historical}).encode("utf-8"), "application/json")
+
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockNewsHandler
+
+
+def business_days(start, end):
+    day, last = datetime.fromisoformat(start), datetime.fromisoformat(end)
+    while day <= last:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def start_server(port=0, latency_ms=80, n_items=20):
+    """
+    Start the mock server on a daemon thread; returns (server, base_url).
+    server.stats counts requests, 304 answers and body bytes sent.
+    """
+    stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency_ms / 1000, n_items, stats))
+    server.stats = stats
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--items", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency_ms, args.items)
+    print(f"🧪 Mock news server on {base_url} (latency {args.latency_ms} ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,17 +1,21 @@
 # backend/daily_runner.py
+#
+# Daily pipeline, declared as a DAG (pipeline_dag.py): each stage lists the
+# paths it reads and writes, and stages without a conflicting path run
+# concurrently. The model-heavy stages run in-process so they share imports
+# and loaded models. A JSON run report lands in outputs/logs/pipeline_runs/.
+# Stages whose inputs, code and kwargs are unchanged since their last
+# successful run are skipped (outputs/state/pipeline_stages.json); skips are
+# logged to outputs/logs/skipped_stages.log. The scrapers always run.
+#   python3 daily_runner.py [--max-parallel 4] [--sequential] [--dry-run]
+#                           [--force [STAGE ...]]
+import argparse
 import os
 import sys
-import subprocess
-import traceback
-import time
 from datetime import datetime
 import pytz
 
-from rich.console import Console
-from rich.spinner import Spinner
-from rich.table import Table
-
-console = Console()
+from pipeline_dag import DagRunner, Stage, StageCache
 
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
@@ -28,135 +32,131 @@ def log(msg):
         f.write(f"[{timestamp}] {msg}\n")
     print(f"[{timestamp}] {msg}")
 
-def save_script_log(script_name, output):
-    log_dir = "logs/script_runs"
-    os.makedirs(log_dir, exist_ok=True)
-    filename = f"{script_name}__{datetime.now(local_tz).strftime('%Y-%m-%d_%H-%M-%S')}.log"
-    with open(os.path.join(log_dir, filename), "w") as f:
-        f.write(output)
-
-log(f"\n🧠 NLP Pipeline Start | {datetime.now(local_tz).strftime('%Y-%m-%d %H:%M:%S')}")
 
-# === Core Data Pipeline Scripts ===
-scripts = [
-    "scripts/news_scraper.py",
-    "scripts/fmp_news_scraper.py",
-    "scripts/sentiment_analysis.py",
-    "scripts/stock_analysis.py",
-    "scripts/update_nextday_returns.py"
+SENTIMENT_OUTPUTS = ["outputs/results/sentiment", "outputs/datasets/sentiment", "outputs/state/sentiment"]
+MERGED = ["outputs/results/merged", "outputs/datasets/merged"]
+UNIFIED_CSV = "outputs/results/merged_sentiment_price.csv"
+STORAGE_CODE = ["storage.py"]
+MODELS_CONFIG = "config/models.json"
+# Modules that do the scoring for sentiment_analysis / auto_rescue, and the env overrides they read
+SCORING_CODE = STORAGE_CODE + [
+    "scripts/batch_inference.py", "scripts/model_registry.py", "scripts/inference_backends.py",
+    "scripts/inference_client.py", "scripts/near_dedup.py", "scripts/dedup.py", "scripts/score_cache.py",
+]
+SCORING_ENV = [
+    "SENTIMENT_MODELS_CONFIG", "SENTIMENT_MODELS", "SENTIMENT_BACKENDS", "SENTIMENT_BATCH_SIZES",
+    "NEAR_DEDUP", "NEAR_DEDUP_JACCARD", "STORAGE_FORMAT",
+]
 
+# Declaration order is the old sequential order; it breaks ties between stages touching the same paths
+STAGES = [
+    # === Core data pipeline ===
+    Stage("news_scraper", "scripts/news_scraper.py",
+          inputs=["config/tickers.json", "config/learned_keywords.txt"],
+          outputs=["data/raw_news", "data/skipped_raw_news"],
+          cacheable=False),
+    Stage("fmp_news_scraper", "scripts/fmp_news_scraper.py",
+          inputs=["config/tickers.json"],
+          outputs=["data/fmp_news", "outputs/state/seen/fmp_news"],
+          cacheable=False),
+    Stage("sentiment_analysis", "scripts/sentiment_analysis.py", mode="inprocess",
+          call="sentiment_analysis:run_sentiment_analysis",
+          kwargs={"incremental": True, "workers": int(os.getenv("SENTIMENT_WORKERS", 1))},
+          inputs=["data/raw_news", "data/fmp_news", MODELS_CONFIG],
+          outputs=SENTIMENT_OUTPUTS,
+          code=SCORING_CODE,
+          env=SCORING_ENV),
+    Stage("stock_analysis", "scripts/stock_analysis.py",
+          inputs=SENTIMENT_OUTPUTS,
+          outputs=MERGED + ["outputs/prices"],
+          code=STORAGE_CODE + ["scripts/price_store.py", "scripts/http_cache.py"],
+          cacheable=False),  # fetches new price bars from FMP even when the headlines are unchanged
+    Stage("update_nextday_returns", "scripts/update_nextday_returns.py",
+          inputs=MERGED + ["outputs/prices"],
+          outputs=MERGED + [UNIFIED_CSV],
+          code=STORAGE_CODE + ["scripts/price_store.py"]),
+
+    # === Manual review feedback ===
+    Stage("apply_manual_flags", "validate/apply_manual_flags.py",
+          inputs=["data/manual_review", "data/raw_news"],
+          outputs=["data/raw_news"]),
+    Stage("learn_keywords", "validate/learn_keywords.py",
+          inputs=["data/manual_review"],
+          outputs=["config/learned_keywords.txt", "outputs/state/learned_keywords.json"]),
+    Stage("auto_rescue", "scripts/auto_rescue.py", mode="inprocess",
+          call="auto_rescue:run_auto_rescue",
+          inputs=["data/skipped_validated", MODELS_CONFIG],
+          outputs=SENTIMENT_OUTPUTS + ["logs/rescue_log.csv"],
+          code=SCORING_CODE + ["scripts/sentiment_analysis.py"],
+          env=SCORING_ENV),
+    Stage("keyword_stats", "validate/keyword_stats.py",
+          inputs=["config/learned_keywords.txt", "data/raw_news"],
+          outputs=["outputs/state/keyword_stats.csv", "outputs/state/keyword_stats_files.json"]),
+    Stage("prune_dead_keywords", "validate/prune_dead_keywords.py",
+          inputs=["config/learned_keywords.txt", "outputs/state/keyword_stats.csv"],
+          outputs=["config/learned_keywords.txt"],
+          code=["validate/keyword_stats.py"]),
+
+    # === Validation, checksum, archive, alert ===
+    Stage("validate_csvs", "validate/validate_csvs.py",
+          inputs=["outputs/results/merged"],
+          outputs=["outputs/logs/validation_log.csv"],
+          after=["auto_rescue"]),
+    Stage("generate_checksums_and_rowdiffs", "validate/generate_checksums_and_rowdiffs.py",
+          inputs=["outputs/results/merged"],
+          outputs=["outputs/logs/checksums_*.json", "outputs/logs/rowcounts_*.json", "outputs/logs/rowdiff_*.json"],
+          after=["auto_rescue"]),
+    Stage("archive_merged_csvs", "validate/archive_merged_csvs.py",
+          inputs=["outputs/results/merged"],
+          outputs=["outputs/archives"]),
+    Stage("alert_if_anomalies_email", "validate/alert_if_anomalies_email.py",  # or alert_if_anomalies.py if non-email
+          inputs=["outputs/logs/validation_log.csv", "outputs/logs/rowdiff_*.json"]),
+
+    # === API-facing datasets ===
+    Stage("unify_sentiment_price_csvs", "validate/unify_sentiment_price_csvs.py",
+          inputs=MERGED,
+          outputs=[UNIFIED_CSV],
+          code=STORAGE_CODE),
+    Stage("build_daily_aggregates", "validate/build_daily_aggregates.py",
+          inputs=["outputs/datasets/merged"],
+          outputs=["outputs/datasets/daily", "outputs/results/daily", "outputs/state/daily_aggregates.json"],
+          code=STORAGE_CODE),
 ]
 
-for script in scripts:
-    log(f"▶️ Running {script}")
-    start_time = time.time()
-
-    try:
-        proc = subprocess.run(
-            ["python3", script],
-            capture_output=True,
-            text=True
-        )
-        duration = time.time() - start_time
-
-        # Save log output to file
-        output_log = f"\n--- STDOUT ---\n{proc.stdout}\n--- STDERR ---\n{proc.stderr}\n"
-        log_file = f"logs/script_runs/{os.path.basename(script)}__{datetime.now(local_tz).strftime('%Y-%m-%d_%H-%M-%S')}.log"
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        with open(log_file, "w") as f:
-            f.write(output_log)
-
-        # Display output summary
-        print(output_log)
-
-        if proc.returncode == 0:
-            log(f"✅ Finished {script} in {duration:.2f}s\n")
-        else:
-            log(f"❌ Error running {script} | Exit code: {proc.returncode}\n")
-            sys.exit(1)
-
-    except Exception as e:
-        log(f"❌ Exception in {script}: {e}")
-        traceback.print_exc()
-        sys.exit(1)
 
+def main():
+    parser = argparse.ArgumentParser(description="Run the daily NLP pipeline.")
+    parser.add_argument("--max-parallel", type=int, default=int(os.getenv("PIPELINE_MAX_PARALLEL", 4)),
+                        help="Subprocess stages allowed to run at once")
+    parser.add_argument("--sequential", action="store_true", help="Run one stage at a time")
+    parser.add_argument("--dry-run", action="store_true", help="Print the resolved dependencies and exit")
+    parser.add_argument("--force", nargs="*", metavar="STAGE", default=None,
+                        help="Run stages even if unchanged (all stages when no names are given)")
+    args = parser.parse_args()
+
+    force = False if args.force is None else (set(args.force) or True)
+    unknown = set(args.force or []) - {s.name for s in STAGES}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    runner = DagRunner(STAGES, max_parallel=1 if args.sequential else args.max_parallel, log=log,
+                       cache=StageCache(), force=force)
+    if args.dry_run:
+        for stage in STAGES:
+            print(f"{stage.name:34} ← {', '.join(runner.deps[stage.name]) or '-'}")
+        return
+
+    log(f"\n🧠 NLP Pipeline Start | {datetime.now(local_tz).strftime('%Y-%m-%d %H:%M:%S')}")
+    report = runner.run()
+    if report["status"] != "ok":
+        skipped = [s["stage"] for s in report["stages"] if s["status"] == "skipped"]
+        log(f"❌ Pipeline failed — skipped: {', '.join(skipped) or 'none'}")
+        sys.exit(1)
 
-# === Apply user-flagged skipped headlines ===
-log("\n🧠 Applying user-flagged skipped headlines...")
-try:
-    subprocess.run(["python3", "validate/apply_manual_flags.py"], check=True)
-    log("✅ Manual flag application successful")
-except subprocess.CalledProcessError as e:
-    log(f"❌ Manual flag merge failed: {e}")
-    sys.exit(1)
-
-
-# === Learn new keywords from flagged headlines ===
-log("\n🧠 Learning new keywords from flagged entries...")
-try:
-    subprocess.run(["python3", "validate/learn_keywords.py"], check=True)
-    log("✅ Keyword learning complete")
-except subprocess.CalledProcessError as e:
-    log(f"❌ Keyword learning failed: {e}")
-    sys.exit(1)
-
-
-# === Run Auto-Rescue on Validated Skipped ===
-log("\n🧠 Running auto_rescue.py to reprocess validated skipped headlines...")
-try:
-    subprocess.run(["python3", "scripts/auto_rescue.py"], check=True)
-    log("✅ Auto-rescue completed successfully")
-except subprocess.CalledProcessError as e:
-    log(f"❌ Auto-rescue failed: {e}")
-    sys.exit(1)
-
-
-# === Prune unused learned keywords ===
-log("\n🧹 Pruning unused learned keywords...")
-try:
-    subprocess.run(["python3", "validate/prune_dead_keywords.py"], check=True)
-    log("✅ Keyword pruning complete")
-except subprocess.CalledProcessError as e:
-    log(f"❌ Keyword pruning failed: {e}")
-    sys.exit(1)
-
-
-# === Validation, Checksum, Archive, Alert ===
-validation_scripts = [
-    "validate/validate_csvs.py",
-    "validate/generate_checksums_and_rowdiffs.py",
-    "validate/archive_merged_csvs.py",
-    "validate/alert_if_anomalies_email.py"  # or alert_if_anomalies.py if non-email
-]
+    log(f"\n🏁 Pipeline finished at {datetime.now(local_tz).strftime('%Y-%m-%d %H:%M:%S')} "
+        f"in {report['wall_seconds']:.1f}s (stages total {report['stage_seconds_total']:.1f}s, "
+        f"{len(report['cached_stages'])} unchanged) — All steps ✅\n")
 
-log("\n🔎 Running post-ingestion validation and alert steps...")
-for script in validation_scripts:
-    spinner = console.status(f"Running {script}", spinner="line")
-    with spinner:
-        start_time = time.time()
-        try:
-            proc = subprocess.run(["python3", script], capture_output=True, text=True)
-            duration = time.time() - start_time
-            save_script_log(os.path.basename(script), proc.stdout + "\n" + proc.stderr)
-
-            if proc.returncode == 0:
-                log(f"✔️  Step complete: {script} in {duration:.2f}s")
-            else:
-                log(f"❌ Validation error in {script} | Exit code: {proc.returncode}")
-                sys.exit(1)
-        except Exception as e:
-            log(f"❌ Exception during script: {e}")
-            traceback.print_exc()
-            sys.exit(1)
-
-# === Add this after all script runs ===
-log("\n🧩 Running CSV unifier...")
-try:
-    subprocess.run(["python3", "validate/unify_sentiment_price_csvs.py"], check=True)
-    log("✅ Unifier finished successfully")
-except subprocess.CalledProcessError as e:
-    log(f"❌ Unifier failed: {e}")
-    sys.exit(1)
-
-log(f"\n🏁 Pipeline finished at {datetime.now(local_tz).strftime('%Y-%m-%d %H:%M:%S')} — All steps ✅\n")
 
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,24 @@
 # src/data_loader.py
 
 import pandas as pd
-import os
 
-DATA_PATH = "outputs/results/merged_sentiment_price.csv"
+import storage
+from dataset_cache import MERGED
 
-def load_pipeline_data(ticker: str) -> list:
+DATA_PATH = storage.DATASETS["merged"]["unified_csv"]
+
+def load_pipeline_data(ticker: str, date_from: str = None, date_to: str = None) -> list:
     """
-    Load merged sentiment/price pipeline data from local CSV for a given ticker.
+    Load merged sentiment/price pipeline data for a given ticker, optionally
+    limited to date_from <= date <= date_to, from the cached ticker/date index.
     Returns list of dicts ready for API response.
     """
-    if not os.path.exists(DATA_PATH):
+    if not MERGED.exists():
         print(f"[ERROR] CSV not found at {DATA_PATH}")
         return []
 
     try:
-        df = pd.read_csv(DATA_PATH)
-        df = df.dropna()
-        df = df[df["ticker"] == ticker.upper()]
+        df = MERGED.index().lookup(ticker, date_from, date_to, on="date").dropna()
         df["date"] = pd.to_datetime(df["date"]).astype(str)  # ✅ Ensure it's stringified
         return df.to_dict(orient="records")
     except Exception as e:
@@ -0,0 +1,186 @@
+# dataset_cache.py
+#
+# Process-level cache of the merged and daily datasets for the API routes.
+#
+# A dataset is read once, normalized once (dates rendered as strings, string
+# cells stripped) and shared by every request. Its on-disk signature (mtime +
+# size of the files backing it, see storage.dataset_files) is re-checked at most
+# every DATASET_CACHE_CHECK_SECONDS; when daily_runner.py publishes new data the
+# frame is rebuilt off to the side and swapped in with a single assignment, so
+# requests never see a half-loaded dataset.
+#
+# Every load also builds a TickerDateIndex, so ticker + date-range lookups are
+# a binary search plus a slice instead of a scan over the whole table.
+#
+# Callers must treat the returned frame as read-only (filter / .copy() first).
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+CHECK_INTERVAL = float(os.getenv("DATASET_CACHE_CHECK_SECONDS", "2"))
+
+
+def dataset_signature(name):
+    return storage.files_signature(storage.dataset_files(name))
+
+
+def normalize(df):
+    """One-off cleanup the routes used to redo per request."""
+    df = df.copy()
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].map(lambda x: x.strip() if isinstance(x, str) else x)
+    return df
+
+
+def normalize_ticker(ticker):
+    """BRK-B, brk.b ➜ BRK.B (the form used by config/tickers.json)."""
+    return str(ticker).strip().upper().replace("-", ".")
+
+
+def _as_ns(values):
+    """Parse a date column to UTC-naive int64 nanoseconds; unparseable cells become NaT (int64 min)."""
+    return storage.parse_dates(values).to_numpy().view("int64")
+
+
+def _bound_ns(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.as_unit("ns").value
+
+
+class TickerDateIndex:
+    """
+    Row positions of a frame grouped by normalized ticker and, within each
+    ticker, sorted by each date column. The frame itself keeps its order, so
+    lookups return rows in the same order a boolean filter would.
+    """
+
+    def __init__(self, df, date_columns=("published", "date")):
+        self.frame = df
+        tickers = df["ticker"] if "ticker" in df.columns else pd.Series("", index=df.index)
+        keys = tickers.fillna("").astype(str).str.strip().str.upper().str.replace("-", ".", regex=False).to_numpy(dtype=str)
+
+        self.values = {}   # column ➜ int64 ns per row, in frame order
+        self.orders = {}   # column ➜ positions sorted by (ticker, column)
+        for col in date_columns:
+            if col in df.columns:
+                self.values[col] = _as_ns(df[col])
+                self.orders[col] = np.lexsort((self.values[col], keys))
+        if not self.orders:
+            self.orders[None] = np.argsort(keys, kind="stable")
+
+        sorted_keys = keys[next(iter(self.orders.values()))]
+        self.tickers, self.starts = np.unique(sorted_keys, return_index=True)
+        self.ends = np.append(self.starts[1:], len(sorted_keys)).astype(self.starts.dtype)
+
+    def positions(self, ticker, start=None, end=None, on="published"):
+        """Frame positions for `ticker` with start <= `on` <= end (bounds inclusive, either optional)."""
+        key = normalize_ticker(ticker)
+        i = np.searchsorted(self.tickers, key)
+        if i == len(self.tickers) or self.tickers[i] != key:
+            return np.empty(0, dtype=np.int64)
+        lo, hi = self.starts[i], self.ends[i]
+
+        if on in self.values and (start is not None or end is not None):
+            order = self.orders[on]
+            block = self.values[on][order[lo:hi]]
+            base = lo
+            if start is not None:
+                lo = base + np.searchsorted(block, _bound_ns(start), side="left")
+            if end is not None:
+                hi = base + np.searchsorted(block, _bound_ns(end), side="right")
+            positions = order[lo:hi]
+        else:
+            positions = next(iter(self.orders.values()))[lo:hi]
+        return np.sort(positions)
+
+    def lookup(self, ticker, start=None, end=None, on="published"):
+        return self.frame.iloc[self.positions(ticker, start, end, on)]
+
+    def between(self, start=None, end=None, on="published"):
+        """All tickers: rows with start <= `on` <= end, without re-parsing the column."""
+        if on not in self.values:
+            return self.frame
+        values = self.values[on]
+        mask = values != np.iinfo(np.int64).min
+        if start is not None:
+            mask &= values >= _bound_ns(start)
+        if end is not None:
+            mask &= values <= _bound_ns(end)
+        return self.frame[mask]
+
+
+class DatasetCache:
+    def __init__(self, name="merged", check_interval=CHECK_INTERVAL):
+        self.name = name
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._signature = None
+        self._loaded_at = None
+        self._checked_at = 0.0
+        self._stats = {"hits": 0, "loads": 0, "reloads": 0, "failed_reloads": 0, "last_load_seconds": None, "last_error": None}
+
+    def exists(self):
+        return self._index is not None or storage.table_exists(self.name)
+
+    def index(self):
+        """Current TickerDateIndex; reloads first if the files changed on disk."""
+        if self._index is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self._refresh()
+        self._stats["hits"] += 1
+        return self._index
+
+    def get(self):
+        """Current normalized frame."""
+        return self.index().frame
+
+    def _refresh(self):
+        with self._lock:
+            if self._index is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return  # another request refreshed while we waited
+            signature = dataset_signature(self.name)
+            self._checked_at = time.monotonic()
+            if self._index is not None and signature == self._signature:
+                return
+
+            start = time.perf_counter()
+            try:
+                df = normalize(storage.read_table(self.name, dates_as_str=True))
+                index = TickerDateIndex(df)
+            except Exception as e:
+                # Keep serving the previous version; first load has nothing to fall back on
+                self._stats["failed_reloads"] += 1
+                self._stats["last_error"] = str(e)
+                print(f"❌ Dataset cache reload failed for {self.name}: {e}")
+                if self._index is None:
+                    raise
+                return
+
+            self._stats["reloads" if self._index is not None else "loads"] += 1
+            self._stats["last_load_seconds"] = round(time.perf_counter() - start, 3)
+            self._stats["last_error"] = None
+            # Frame and index travel together, so one assignment publishes both
+            self._index, self._signature, self._loaded_at = index, signature, time.time()
+            print(f"📦 Dataset cache loaded {self.name}: {len(df)} rows in {self._stats['last_load_seconds']}s")
+
+    def stats(self):
+        return {
+            "dataset": self.name,
+            "rows": 0 if self._index is None else len(self._index.frame),
+            "tickers": 0 if self._index is None else len(self._index.tickers),
+            "loaded_at": self._loaded_at,
+            "age_seconds": None if self._loaded_at is None else round(time.time() - self._loaded_at, 1),
+            "signature": self._signature,
+            **self._stats,
+        }
+
+
+MERGED = DatasetCache("merged")
+DAILY = DatasetCache("daily")
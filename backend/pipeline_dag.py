@@ -0,0 +1,392 @@
+# pipeline_dag.py
+#
+# Declarative DAG runner for the daily pipeline (see daily_runner.py).
+#
+# Each Stage names the paths it reads and writes. A stage depends on every
+# stage declared before it that touches an overlapping path in a conflicting
+# way (read-after-write, write-after-read or write-after-write), plus any
+# stages listed in `after`. So declaration order still decides who goes
+# first, but stages that share nothing run at the same time.
+#
+# Execution modes:
+#   subprocess  python3 <script> in its own interpreter; these run concurrently
+#   inprocess   run inside the runner on a single serial lane, sharing imports
+#               and loaded models: `call="module:function"` (module found on
+#               sys.path / the script's folder) or the script via runpy
+# Either way a stage's stdout / stderr go to logs/script_runs/<script>__<time>.log.
+#
+# Stage cache: a cacheable stage is fingerprinted from the content of its
+# inputs, its script (+ any extra `code` files), its kwargs and the values
+# of the environment variables named in `env`. When the
+# fingerprint matches the one recorded after its last successful run and its
+# outputs still exist, the stage is skipped and the existing outputs reused.
+# File digests are memoized by (size, mtime_ns), so only touched files are
+# re-hashed, and a file rewritten with identical content still matches.
+#
+# Every run writes a machine-readable JSON report (per-stage status, start
+# offset, duration, dependencies).
+import fnmatch
+import glob
+import hashlib
+import importlib
+import io
+import threading
+import json
+import os
+import runpy
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+
+REPORT_DIR = "outputs/logs/pipeline_runs"
+SCRIPT_LOG_DIR = "logs/script_runs"
+STAGE_CACHE_PATH = "outputs/state/pipeline_stages.json"
+SKIPPED_LOG_PATH = "outputs/logs/skipped_stages.log"
+DONE = ("ok", "cached")
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    mode: str = "subprocess"      # subprocess | inprocess
+    call: str = None              # inprocess only: "module:function"
+    kwargs: dict = field(default_factory=dict)
+    after: list = field(default_factory=list)
+    code: list = field(default_factory=list)   # extra source/config files that version the stage
+    env: list = field(default_factory=list)    # environment variables that change the stage's results
+    cacheable: bool = True                     # False for stages with outside inputs (network)
+
+
+def _norm(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def paths_overlap(a, b):
+    """Same path, one inside the other (directory prefix), or glob match."""
+    a, b = _norm(a), _norm(b)
+    return (
+        a == b
+        or a.startswith(b + "/") or b.startswith(a + "/")
+        or fnmatch.fnmatch(a, b) or fnmatch.fnmatch(b, a)
+    )
+
+
+def _touches(paths_a, paths_b):
+    return any(paths_overlap(a, b) for a in paths_a for b in paths_b)
+
+
+def resolve_dependencies(stages):
+    """{stage name: [names it waits for]} from path hazards + explicit `after`."""
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique")
+
+    deps = {}
+    for i, stage in enumerate(stages):
+        needed = list(stage.after)
+        for earlier in stages[:i]:
+            if (_touches(stage.inputs, earlier.outputs)       # read after write
+                    or _touches(stage.outputs, earlier.inputs)   # write after read
+                    or _touches(stage.outputs, earlier.outputs)):  # write after write
+                needed.append(earlier.name)
+        unknown = set(needed) - set(names[:i])
+        if unknown:
+            raise ValueError(f"{stage.name}: `after` must name earlier stages, got {sorted(unknown)}")
+        deps[stage.name] = sorted(set(needed), key=names.index)
+    return deps
+
+
+def expand_paths(paths):
+    """Files behind a list of file / directory / glob paths, sorted."""
+    files = set()
+    for path in paths:
+        for match in glob.glob(path) if glob.has_magic(path) else [path]:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    files.update(os.path.join(root, n) for n in names)
+            elif os.path.isfile(match):
+                files.add(match)
+    return sorted(_norm(f) for f in files)
+
+
+class StageCache:
+    def __init__(self, path=STAGE_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        state = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+        self.stages = state.get("stages", {})
+        self.files = state.get("files", {})   # path -> [size, mtime_ns, sha1]
+
+    def file_digest(self, path):
+        st = os.stat(path)
+        with self.lock:
+            known = self.files.get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        with self.lock:
+            self.files[path] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        h = hashlib.sha1()
+        env = {name: os.getenv(name) for name in stage.env}
+        h.update(json.dumps({"script": stage.script, "call": stage.call, "kwargs": stage.kwargs, "env": env},
+                            sort_keys=True, default=str).encode())
+        for path in [stage.script] + list(stage.code) + expand_paths(stage.inputs):
+            if os.path.isfile(path):
+                h.update(f"{path}\0{self.file_digest(path)}\n".encode())
+            else:
+                h.update(f"{path}\0missing\n".encode())
+        return h.hexdigest()
+
+    def is_fresh(self, stage, fingerprint):
+        with self.lock:
+            recorded = self.stages.get(stage.name)
+        return recorded == fingerprint and all(expand_paths([p]) for p in stage.outputs)
+
+    def record(self, name, fingerprint):
+        with self.lock:
+            if fingerprint is None:
+                self.stages.pop(name, None)
+            else:
+                self.stages[name] = fingerprint
+
+    def save(self):
+        with self.lock:
+            # Forget digests of files that no longer exist
+            self.files = {p: v for p, v in self.files.items() if os.path.exists(p)}
+            state = {"stages": self.stages, "files": self.files}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+
+def _log_path(stage, timestamp):
+    return os.path.join(SCRIPT_LOG_DIR, f"{os.path.basename(stage.script)}__{timestamp}.log")
+
+
+def _write_log(log_file, stdout, stderr):
+    os.makedirs(SCRIPT_LOG_DIR, exist_ok=True)
+    with open(log_file, "w") as f:
+        f.write(f"\n--- STDOUT ---\n{stdout}\n--- STDERR ---\n{stderr}\n")
+
+
+def _run_subprocess(stage, timestamp):
+    proc = subprocess.run(["python3", stage.script], capture_output=True, text=True)
+    log_file = _log_path(stage, timestamp)
+    _write_log(log_file, proc.stdout, proc.stderr)
+    return proc.returncode, log_file
+
+
+class _StageOutput:
+    """
+    sys.stdout / sys.stderr while an in-process stage runs: writes from the
+    stage (its lane thread and any thread it starts) go to `buffer`, the
+    runner's own threads (main loop, subprocess pool) keep the console.
+    """
+
+    def __init__(self, console, buffer):
+        self.console = console
+        self.buffer = buffer
+
+    def _target(self):
+        name = threading.current_thread().name
+        return self.console if name == "MainThread" or name.startswith("stage") else self.buffer
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+
+def _run_inprocess(stage, timestamp):
+    script_dir = os.path.dirname(os.path.abspath(stage.script))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    log_file = _log_path(stage, timestamp)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    console = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = _StageOutput(console[0], stdout), _StageOutput(console[1], stderr)
+    try:
+        if stage.call:
+            module_name, func_name = stage.call.split(":")
+            getattr(importlib.import_module(module_name), func_name)(**stage.kwargs)
+        else:
+            runpy.run_path(stage.script, run_name="__main__")
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        return code, log_file
+    except Exception:
+        traceback.print_exc()  # into the stage log; _execute reports it on the console too
+        raise
+    finally:
+        sys.stdout, sys.stderr = console
+        _write_log(log_file, stdout.getvalue(), stderr.getvalue())
+    return 0, log_file
+
+
+class DagRunner:
+    def __init__(self, stages, max_parallel=4, log=print, report_dir=REPORT_DIR, cache=None, force=False):
+        """`cache`: a StageCache (None disables skipping). `force`: True or a set of stage names to always run."""
+        self.stages = {s.name: s for s in stages}
+        self.order = [s.name for s in stages]
+        self.deps = resolve_dependencies(stages)
+        self.max_parallel = max_parallel
+        self.log = log
+        self.report_dir = report_dir
+        self.cache = cache
+        self.force = force
+        self.results = {}
+
+    def _forced(self, name):
+        return self.force is True or (bool(self.force) and name in self.force)
+
+    def _skip_if_unchanged(self, stage, t0):
+        if self.cache is None or not stage.cacheable or self._forced(stage.name):
+            return None
+        fingerprint = self.cache.fingerprint(stage)
+        if not self.cache.is_fresh(stage, fingerprint):
+            return None
+        return {
+            "stage": stage.name,
+            "script": stage.script,
+            "mode": stage.mode,
+            "depends_on": self.deps[stage.name],
+            "status": "cached",
+            "error": None,
+            "returncode": None,
+            "start_offset_seconds": round(time.time() - t0, 3),
+            "seconds": 0.0,
+            "log_file": None,
+            "fingerprint": fingerprint,
+        }
+
+    def _execute(self, stage, t0):
+        cached = self._skip_if_unchanged(stage, t0)
+        if cached is not None:
+            return cached
+
+        self.log(f"▶️ Running {stage.name} ({stage.mode})")
+        started = time.time()
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        try:
+            if stage.mode == "inprocess":
+                returncode, log_file = _run_inprocess(stage, timestamp)
+            else:
+                returncode, log_file = _run_subprocess(stage, timestamp)
+            error = None if returncode == 0 else f"exit code {returncode}"
+        except Exception as e:
+            traceback.print_exc()
+            log_file = _log_path(stage, timestamp) if stage.mode == "inprocess" else None
+            returncode, error = 1, f"{type(e).__name__}: {e}"
+
+        # Fingerprint after the run: stages that rewrite their own inputs settle on that state
+        fingerprint = None
+        if self.cache is not None and stage.cacheable:
+            fingerprint = self.cache.fingerprint(stage) if error is None else None
+            self.cache.record(stage.name, fingerprint)
+        return {
+            "stage": stage.name,
+            "script": stage.script,
+            "mode": stage.mode,
+            "depends_on": self.deps[stage.name],
+            "status": "ok" if error is None else "failed",
+            "error": error,
+            "returncode": returncode,
+            "start_offset_seconds": round(started - t0, 3),
+            "seconds": round(time.time() - started, 3),
+            "log_file": log_file,
+            "fingerprint": fingerprint,
+        }
+
+    def run(self):
+        t0 = time.time()
+        pending = list(self.order)
+        running = {}
+        failed = False
+
+        subprocess_pool = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="stage")
+        inprocess_lane = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inprocess")
+        try:
+            while pending or running:
+                # Launch everything whose dependencies all succeeded (none once something failed)
+                for name in list(pending):
+                    if failed:
+                        break
+                    if all(self.results.get(d, {}).get("status") in DONE for d in self.deps[name]):
+                        stage = self.stages[name]
+                        pool = inprocess_lane if stage.mode == "inprocess" else subprocess_pool
+                        running[pool.submit(self._execute, stage, t0)] = name
+                        pending.remove(name)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result = future.result()
+                    self.results[name] = result
+                    if result["status"] == "cached":
+                        self.log(f"⏭️ Skipped {name} (inputs and code unchanged)")
+                        self._log_skipped(result)
+                    elif result["status"] == "ok":
+                        self.log(f"✅ Finished {name} in {result['seconds']:.2f}s")
+                    else:
+                        self.log(f"❌ {name} failed ({result['error']})")
+                        failed = True
+        finally:
+            subprocess_pool.shutdown(wait=True)
+            inprocess_lane.shutdown(wait=True)
+            if self.cache is not None:
+                self.cache.save()
+
+        for name in pending:
+            self.results[name] = {"stage": name, "script": self.stages[name].script, "mode": self.stages[name].mode,
+                                  "depends_on": self.deps[name], "status": "skipped"}
+        return self.write_report(t0, failed)
+
+    def _log_skipped(self, result):
+        os.makedirs(os.path.dirname(SKIPPED_LOG_PATH), exist_ok=True)
+        with open(SKIPPED_LOG_PATH, "a") as f:
+            f.write(f"{datetime.now().isoformat(timespec='seconds')}\t{result['stage']}\t{result['fingerprint']}\n")
+
+    def write_report(self, t0, failed):
+        report = {
+            "started_at": datetime.fromtimestamp(t0).isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "status": "failed" if failed else "ok",
+            "wall_seconds": round(time.time() - t0, 3),
+            "stage_seconds_total": round(sum(r.get("seconds", 0) for r in self.results.values()), 3),
+            "cached_stages": [n for n in self.order if self.results[n]["status"] == "cached"],
+            "stages": [self.results[name] for name in self.order],
+        }
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f"run_{datetime.fromtimestamp(t0).strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        for target in (path, os.path.join(self.report_dir, "latest.json")):
+            with open(target, "w") as f:
+                json.dump(report, f, indent=2)
+        self.log(f"🧾 Run report ➜ {path}")
+        return report
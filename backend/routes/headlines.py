@@ -5,13 +5,14 @@ import numpy as np
 import pandas as pd
 from typing import Optional
 import traceback
-import os
 import json
 
+import storage
+from dataset_cache import MERGED
 
 router = APIRouter()
 
-CSV_PATH = "outputs/results/merged_sentiment_price.csv"
+CSV_PATH = storage.DATASETS["merged"]["unified_csv"]
 TICKER_PATH = "config/tickers.json"
 
 # 🔄 Normalize tickers like BRK-B -> BRK.B
@@ -30,20 +31,26 @@ def load_valid_tickers() -> set:
 
 valid_tickers = load_valid_tickers()
 
-# 📊 Filter CSV by ticker
-def load_csv(ticker: str) -> pd.DataFrame:
+# 📅 Inclusive bounds for a YYYY-MM-DD range (end covers the whole day)
+def parse_range(start: Optional[str], end: Optional[str]):
+    if not (start and end):
+        return None, None
+    start_date = datetime.strptime(start, "%Y-%m-%d")
+    end_date = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+    return start_date, end_date
+
+# 📊 Rows for one ticker (optionally a published-date range) via the cached index
+def load_csv(ticker: str, start_date=None, end_date=None) -> pd.DataFrame:
     ticker = normalize_ticker(ticker)
     
     if ticker not in valid_tickers:
         raise HTTPException(status_code=400, detail=f"Invalid ticker: {ticker}")
     
-    if not os.path.exists(CSV_PATH):
+    if not MERGED.exists():
         raise HTTPException(status_code=404, detail="Merged CSV not found")
     
     try:
-        df = pd.read_csv(CSV_PATH)
-        df = df[df["ticker"].str.contains(ticker, case=False, na=False, regex=False)]
-        return df
+        return MERGED.index().lookup(ticker, start_date, end_date, on="published").copy()
     except Exception as e:
         print(f"❌ CSV loading or filtering failed: {e}")
         raise HTTPException(status_code=500, detail="Error loading CSV")
@@ -62,18 +69,16 @@ def get_news_table(
     try:
         print(f"🧠 /news-table| Query received: ticker={ticker}, sector={sector}, region={region}, marketCap={marketCap}, type={type}, start={start}, end={end}")
 
-        df = load_csv(ticker)
-        print(f"📄 Loaded CSV with {len(df)} rows")
+        # 🔍 Ticker + published date range come straight from the index
+        start_date, end_date = parse_range(start, end)
+        df = load_csv(ticker, start_date, end_date)
+        print(f"📄 Loaded {len(df)} rows for {normalize_ticker(ticker)}")
+        if start_date:
+            print(f"🗓️ Filtered by published date: {start_date} to {end_date} ➜ {len(df)} rows")
 
         # Filter out rows with missing title/link
         df = df[df["title"].notnull() & df["link"].notnull()]
 
-        # Normalize inputs
-        if ticker:
-            ticker = normalize_ticker(ticker.upper())
-            df = df[df["ticker"].str.upper() == ticker]
-            print(f"🔍 Filtered by ticker = {ticker}: {len(df)} rows")
-
         if sector:
             df = df[df["sector"].astype(str).str.lower() == sector.lower()]
             print(f"🔍 Filtered by sector = {sector}: {len(df)} rows")
@@ -90,21 +95,6 @@ def get_news_table(
             df = df[df["type"].astype(str).str.lower() == type.lower()]
             print(f"🔍 Filtered by type = {type}: {len(df)} rows")
 
-        # 🕒 Filter by date range
-        if start or end:
-            from datetime import datetime
-
-            if start and end:
-                # Use 'published' column — this is the correct datetime field
-                df["published"] = pd.to_datetime(df["published"], errors="coerce")
-
-                start_date = datetime.strptime(start, "%Y-%m-%d")
-                end_date = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-
-                df = df[(df["published"] >= start_date) & (df["published"] <= end_date)]
-                print(f"🗓️ Filtered by published date: {start_date} to {end_date} ➜ {len(df)} rows")
-
-
         print(f"✅ Returning {len(df)} records")
         df.replace([np.inf, -np.inf], np.nan, inplace=True)
         df.dropna(axis=0, how='any', inplace=True)
@@ -135,7 +125,8 @@ def get_extreme_scores(
             print("❌ Invalid ticker")
             raise HTTPException(status_code=400, detail=f"Invalid ticker: {ticker}")
 
-        df = load_csv(ticker)
+        start_dt, end_dt = parse_range(start, end)
+        df = load_csv(ticker, start_dt, end_dt)
         print("✅ Loaded CSV:", df.columns.tolist())
 
         if "score_finbert" not in df.columns:
@@ -148,16 +139,7 @@ def get_extreme_scores(
                 raise HTTPException(status_code=500, detail=f"Missing required column: {col}")
 
         df = df[df["title"].notnull() & df["link"].notnull()]
-        df = df[df["ticker"].str.contains(ticker, case=False, na=False, regex=False)]
-
-        # 🗓️ Date filter (same logic as headlines)
-        if start and end:
-            df["published"] = pd.to_datetime(df["published"], errors="coerce")
-
-            start_dt = datetime.strptime(start, "%Y-%m-%d")
-            end_dt = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
-
-            df = df[(df["published"] >= start_dt) & (df["published"] <= end_dt)]
+        if start_dt:
             print(f"🗓️ Filtered by published date: {start} to {end} ➜ {len(df)} rows")
 
         # 🔻 Filter by extreme sentiment scores
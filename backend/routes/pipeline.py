@@ -19,14 +19,8 @@ def get_pipeline_output(
     Filtered pipeline data for a given ticker, with pagination and sorting.
     """
 
-    # 📦 Load data from CSV or cache
-    data = load_pipeline_data(ticker)  # Must return list[dict]
-
-    # 🕒 Optional date filtering
-    if date_from:
-        data = [row for row in data if row.get("date") and row["date"] >= date_from]
-    if date_to:
-        data = [row for row in data if row.get("date") and row["date"] <= date_to]
+    # 📦 Load data from the cached index (ticker + date range is a binary search)
+    data = load_pipeline_data(ticker, date_from, date_to)  # Must return list[dict]
 
     # 🔃 Optional sorting
     reverse = order.lower() == "desc"
@@ -6,9 +6,12 @@ import pandas as pd
 import json
 import os
 
+import storage
+from dataset_cache import DAILY, MERGED
+
 router = APIRouter()
 
-CSV_PATH = "outputs/results/merged_sentiment_price.csv"
+CSV_PATH = storage.DATASETS["merged"]["unified_csv"]
 TICKER_PATH = "config/tickers.json"
 
 # 🔄 Normalize tickers like BRK-B -> BRK.B
@@ -27,33 +30,6 @@ def load_valid_tickers() -> set:
 
 valid_tickers = load_valid_tickers()
 
-# 📊 Filter CSV by ticker
-def load_csv_filtered_by_ticker(ticker: str):
-    ticker = normalize_ticker(ticker)
-
-    if ticker not in valid_tickers:
-        raise HTTPException(status_code=400, detail=f"Invalid ticker: {ticker}")
-
-    if not os.path.exists(CSV_PATH):
-        raise HTTPException(status_code=404, detail="Merged CSV not found")
-
-    try:
-        print(f"📥 Loading merged CSV from {CSV_PATH}")
-        df = pd.read_csv(CSV_PATH)
-        print("📄 Columns in CSV:", df.columns.tolist())
-
-        df = df[df["ticker"].str.contains(ticker, case=False, na=False, regex=False)]
-        print(f"🔍 Filtered rows for {ticker}: {len(df)}")
-
-        if df.empty:
-            print(f"⚠️ No rows found for ticker: {ticker}")
-
-        return df
-
-    except Exception as e:
-        print(f"❌ CSV loading or filtering failed: {e}")
-        raise HTTPException(status_code=500, detail="Error loading CSV")
-
 # 🚀 Test route for debug
 @router.get("/api/sentiment")
 def get_sentiment(
@@ -62,42 +38,34 @@ def get_sentiment(
     end: Optional[str] = Query(None),
 ):
     try:
-        df = pd.read_csv(CSV_PATH)
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        start_d = datetime.strptime(start or today_str, "%Y-%m-%d")
+        end_d = datetime.strptime(end or today_str, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
 
-        # Clean strings
-        df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
+        # ✅ Ticker + published range via the cached index (strings already stripped)
+        index = MERGED.index()
+        df = index.lookup(ticker, start_d, end_d) if ticker else index.between(start_d, end_d)
         df = df.dropna(subset=["title", "published"])
 
-        # ✅ Ticker filter
-        if ticker:
-            df = df[df["ticker"].str.upper() == ticker.upper()]
-
-        # ✅ Date filter (use datetime for filtering)
-        if "published" in df.columns:
-            df["published"] = pd.to_datetime(df["published"], errors="coerce")
+        return JSONResponse(content=df.to_dict(orient="records"))
 
-            today_str = datetime.now().strftime("%Y-%m-%d")
-            if not start:
-                start = today_str
-            if not end:
-                end = today_str
+    except Exception as e:
+        print("❌ Sentiment route error:", e)
+        return JSONResponse(status_code=500, content={"error": str(e)})
 
-            start_d = datetime.strptime(start, "%Y-%m-%d")
-            end_d = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
 
-            df = df[(df["published"] >= start_d) & (df["published"] <= end_d)]
 
-        # ✅ Convert datetime columns to string **after filtering**
-        for col in ["published", "date"]:
-            if col in df.columns:
-                df[col] = df[col].astype(str)
+# 📆 Per-day aggregates for a ticker (built by validate/build_daily_aggregates.py)
+def load_daily(ticker: str):
+    ticker = normalize_ticker(ticker)
 
-        return JSONResponse(content=df.to_dict(orient="records"))
+    if ticker not in valid_tickers:
+        raise HTTPException(status_code=400, detail=f"Invalid ticker: {ticker}")
 
-    except Exception as e:
-        print("❌ Sentiment route error:", e)
-        return JSONResponse(status_code=500, content={"error": str(e)})
+    if not DAILY.exists():
+        raise HTTPException(status_code=404, detail="Daily aggregates not built (run validate/build_daily_aggregates.py)")
 
+    return DAILY.index().lookup(ticker).copy()
 
 
 # 📈 Aggregated sentiment over time
@@ -106,57 +74,57 @@ def get_sentiment_over_time(ticker: str = Query(...)):
     try:
         ticker = normalize_ticker(ticker)
 
-        df = load_csv_filtered_by_ticker(ticker)
-        print("🐞 DEBUG ➜ Columns in df:", df.columns.tolist())
-
-        df.columns = df.columns.str.lower()
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-        df = df.dropna(subset=["date", "score_finbert", "score_roberta", "close"])
-
-        df_grouped = df.sort_values("date").groupby("date").agg({
-            "score_finbert": "mean",
-            "score_roberta": "mean",
-            "close": "last",  # 🟢 Most recent close price of the day
-        }).reset_index()
-
-        df_grouped["date"] = df_grouped["date"].dt.strftime("%Y-%m-%d")
-        df_grouped["score_finbert"] = df_grouped["score_finbert"].round(4)
-        df_grouped["score_roberta"] = df_grouped["score_roberta"].round(4)
-        df_grouped["close"] = df_grouped["close"].round(2)
-        df_grouped.rename(columns={"close": "price"}, inplace=True)
+        df = load_daily(ticker)
+        df = df.dropna(subset=["date", "score_finbert_mean", "score_roberta_mean", "close"])
 
+        df_grouped = pd.DataFrame({
+            "date": df["date"],
+            "score_finbert": df["score_finbert_mean"].round(4),
+            "score_roberta": df["score_roberta_mean"].round(4),
+            "price": df["close"].round(2),  # 🟢 Most recent close price of the day
+        })
         df_grouped["ticker"] = ticker  # Optional but useful
 
         return df_grouped.to_dict(orient="records")
 
+    except HTTPException:
+        raise
     except Exception as e:
         print("❌ Sentiment Over Time Error:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# 🔍 Model comparison endpoint
+# 🔍 Model comparison endpoint (daily mean score per model)
 @router.get("/api/model-comparison")
 def model_comparison(ticker: str = Query(...)):
     try:
         ticker = normalize_ticker(ticker)
 
-        df = load_csv_filtered_by_ticker(ticker)
-        df = df.dropna(subset=["score_finbert", "score_roberta", "date"])
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = load_daily(ticker)
+        df = df.dropna(subset=["score_finbert_mean", "score_roberta_mean", "date"])
 
-        data = df[["date", "score_finbert", "score_roberta"]].copy()
-        data["score_finbert"] = data["score_finbert"].round(4)
-        data["score_roberta"] = data["score_roberta"].round(4)
+        data = pd.DataFrame({
+            "date": df["date"],
+            "score_finbert": df["score_finbert_mean"].round(4),
+            "score_roberta": df["score_roberta_mean"].round(4),
+            "headlines": df["headlines"],
+        })
         data["ticker"] = ticker  # optional, but helpful for frontend
 
         return data.to_dict(orient="records")
 
+    except HTTPException:
+        raise
     except Exception as e:
         print("❌ Model comparison error:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/api/cache-stats")
+def cache_stats():
+    return {"merged": MERGED.stats(), "daily": DAILY.stats()}
+
+
 @router.get("/api/debug")
 def debug_route():
     try:
@@ -166,7 +134,7 @@ def debug_route():
             data = json.load(f)
             print("📄 Ticker file loaded")
 
-        df = pd.read_csv("outputs/results/merged_sentiment_price.csv")
+        df = MERGED.get()
         print("✅ CSV file loaded")
         print("📊 Columns:", df.columns.tolist())
         print("🧪 Sample rows:", df.head(3).to_dict())
@@ -180,7 +148,8 @@ def debug_route():
         return {
             "status": "✅ all clear",
             "rows": len(df),
-            "columns": df.columns.tolist()
+            "columns": df.columns.tolist(),
+            "cache": MERGED.stats(),
         }
 
     except Exception as e:
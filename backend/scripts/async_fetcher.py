@@ -0,0 +1,159 @@
+# scripts/async_fetcher.py
+#
+# Concurrent HTTP fetching for the news scrapers: one pooled httpx.AsyncClient,
+# a global concurrency bound, per-host request-rate limits, timeouts and
+# retries with exponential backoff (honouring Retry-After on 429/503).
+# With an http_cache.HttpCache, fresh responses skip the network and stale ones
+# are revalidated with conditional requests.
+#
+#   results = fetch_many([(ticker, url, params), ...], rate_limits={"news.google.com": 10})
+#   for key, result in results.items():
+#       if result.ok: parse(result.content)
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import httpx
+
+CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 16))
+TIMEOUT_SECONDS = float(os.getenv("FETCH_TIMEOUT", 15))
+MAX_RETRIES = int(os.getenv("FETCH_RETRIES", 3))
+BACKOFF_SECONDS = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+USER_AGENT = "Mozilla/5.0 (compatible; sentiment-pipeline/1.0)"
+
+
+@dataclass
+class FetchResult:
+    key: object
+    url: str
+    status: int = None
+    content: bytes = b""
+    error: str = None
+    attempts: int = 0
+    seconds: float = 0.0
+    from_cache: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+
+class HostRateLimiter:
+    """Spaces request starts to at most `rate` per second per host (None = unlimited)."""
+
+    def __init__(self, rates=None):
+        self.rates = rates or {}
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        rate = self.rates.get(host)
+        if not rate:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+@dataclass
+class FetchStats:
+    requests: int = 0
+    cached: int = 0
+    retries: int = 0
+    failures: int = 0
+    bytes: int = 0
+    by_status: dict = field(default_factory=dict)
+
+    def report(self, label="Fetch"):
+        print(f"🌐 {label}: {self.requests} requests, {self.cached} served from cache, {self.retries} retries, "
+              f"{self.failures} failed, {self.bytes / 1e6:.1f} MB | statuses {self.by_status}")
+
+
+class AsyncFetcher:
+    def __init__(self, concurrency=CONCURRENCY, rate_limits=None, timeout=TIMEOUT_SECONDS,
+                 retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, headers=None, cache=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.limiter = HostRateLimiter(rate_limits)
+        self.cache = cache
+        self.stats = FetchStats()
+
+    def _retry_delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def _fetch(self, client, semaphore, key, url, params):
+        result = FetchResult(key=key, url=url)
+        host = urlsplit(url).hostname
+        start = time.perf_counter()
+
+        cached = self.cache.prepare(url, params) if self.cache is not None else None
+        if cached is not None and cached.fresh:
+            result.status, result.content, result.from_cache = 200, cached.body, True
+            self.stats.cached += 1
+            return result
+
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                result.attempts = attempt + 1
+                await self.limiter.wait(host)
+                response = None
+                try:
+                    response = await client.get(url, params=params, headers=cached.headers if cached else None)
+                    result.status, result.error = response.status_code, None
+                    if response.status_code not in RETRY_STATUSES:
+                        result.content = response.content
+                        if cached is not None:
+                            result.from_cache = response.status_code == 304
+                            result.status, result.content = self.cache.resolve(
+                                cached, response.status_code, response.content, response.headers
+                            )
+                        if not result.ok:
+                            result.error = f"HTTP {response.status_code}"
+                        break
+                    result.error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    result.error = f"{type(e).__name__}: {e}"
+
+                if attempt < self.retries:
+                    self.stats.retries += 1
+                    await asyncio.sleep(self._retry_delay(attempt, response))
+
+        result.seconds = time.perf_counter() - start
+        self.stats.requests += result.attempts
+        self.stats.bytes += 0 if result.from_cache else len(result.content)
+        self.stats.by_status[result.status] = self.stats.by_status.get(result.status, 0) + 1
+        if not result.ok:
+            self.stats.failures += 1
+        return result
+
+    async def fetch_all(self, requests):
+        """requests: iterable of (key, url, params) ➜ {key: FetchResult}, in input order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, headers=self.headers,
+                                     follow_redirects=True) as client:
+            results = await asyncio.gather(*(
+                self._fetch(client, semaphore, key, url, params) for key, url, params in requests
+            ))
+        return {r.key: r for r in results}
+
+
+def fetch_many(requests, **kwargs):
+    """Synchronous entry point for the scripts: runs AsyncFetcher.fetch_all to completion."""
+    fetcher = AsyncFetcher(**kwargs)
+    results = asyncio.run(fetcher.fetch_all(list(requests)))
+    fetcher.stats.report()
+    return results
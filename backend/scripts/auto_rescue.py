@@ -1,20 +1,22 @@
 import os
 import pandas as pd
 from datetime import datetime
-from sentiment_analysis import analyze_all_models
-import hashlib
+from batch_inference import INFERENCE_STATS, report_inference_stats
+from dedup import row_keys
+import near_dedup
+from sentiment_analysis import (
+    CHUNK_ROWS, DEFAULT_CHUNK_ROWS, MODEL_PIPELINES, SCORE_CACHE, SentimentWriter, analyze_titles_batched,
+    load_manifest, save_manifest,
+)
 
 # === Directories ===
 INPUT_DIR = "data/skipped_validated"
 OUTPUT_DIR = "outputs/results/sentiment"
 LOG_FILE = "logs/rescue_log.csv"
+RESCUE_CHUNK_ROWS = CHUNK_ROWS or DEFAULT_CHUNK_ROWS
 os.makedirs("logs", exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# === Create hash for deduplication
-def make_hash(row):
-    return hashlib.md5(f"{row.get('date','')}_{row.get('title','')}".lower().encode("utf-8")).hexdigest()
-
 # === Load + update rescue log
 def log_rescue(symbol, row):
     log_row = {
@@ -30,6 +32,8 @@ def log_rescue(symbol, row):
 # === Main logic ===
 def run_auto_rescue():
     print("🚨 Running auto-rescue on validated skipped headlines...")
+    near_dedup.STATS.clear()
+    INFERENCE_STATS.clear()
 
     for filename in os.listdir(INPUT_DIR):
         if not filename.endswith("_skipped.csv"):
@@ -37,44 +41,53 @@ def run_auto_rescue():
 
         symbol = filename.split("_")[0].upper()
         file_path = os.path.join(INPUT_DIR, filename)
+        manifest, writer = None, None
         try:
-            df = pd.read_csv(file_path)
-            if "is_validated" not in df.columns or df["is_validated"].sum() == 0:
-                continue
+            # Read, score and append RESCUE_CHUNK_ROWS rows at a time
+            for df in pd.read_csv(file_path, chunksize=RESCUE_CHUNK_ROWS):
+                if "is_validated" not in df.columns:
+                    break
 
-            df = df[df["is_validated"] == True].copy()
-            df["title"] = df["title"].astype(str).str.strip()
-            df = df[df["title"] != ""]
-            if df.empty:
-                continue
+                df = df[df["is_validated"] == True].copy()
+                df["title"] = df["title"].astype(str).str.strip()
+                df = df[df["title"] != ""]
+                if df.empty:
+                    continue
 
-            # Run sentiment models
-            model_outputs = df["title"].apply(analyze_all_models).apply(pd.Series)
-            df = pd.concat([df.reset_index(drop=True), model_outputs.reset_index(drop=True)], axis=1)
+                # Drop headlines already in the symbol's sentiment output before scoring
+                if writer is None:
+                    manifest = load_manifest(symbol, OUTPUT_DIR)
+                    writer = SentimentWriter(symbol, OUTPUT_DIR, manifest["seen"], chunk_rows=RESCUE_CHUNK_ROWS)
+                keys = row_keys(df)
+                keep = writer.unseen(keys)
+                df, keys = df[keep], keys[keep]
+                if df.empty:
+                    continue
 
-            df["rescued"] = True
-            df["__hash"] = df.apply(make_hash, axis=1)
+                # Run sentiment models
+                model_outputs = analyze_titles_batched(df["title"], source=os.path.basename(INPUT_DIR))
+                df = pd.concat([df.reset_index(drop=True), model_outputs.reset_index(drop=True)], axis=1)
 
-            # Load existing output
-            output_path = os.path.join(OUTPUT_DIR, f"{symbol}_sentiment.csv")
-            if os.path.exists(output_path):
-                existing_df = pd.read_csv(output_path)
-                existing_df["__hash"] = existing_df.apply(make_hash, axis=1)
-                combined_df = pd.concat([existing_df, df], ignore_index=True)
-                combined_df = combined_df.drop_duplicates(subset="__hash").drop(columns="__hash")
-            else:
-                combined_df = df.drop(columns="__hash")
+                df["rescued"] = True
 
-            # Save final result
-            combined_df.to_csv(output_path, index=False)
-            print(f"✅ Rescued {len(df)} headlines ➜ {output_path}")
+                # Append the new rows and mark them as processed
+                writer.write(df, keys)
 
-            # Log each rescue
-            for _, row in df.iterrows():
-                log_rescue(symbol, row)
+                # Log each rescue
+                for _, row in df.iterrows():
+                    log_rescue(symbol, row)
 
         except Exception as e:
             print(f"❌ Failed processing {filename}: {e}")
 
+        if writer is not None and writer.close():
+            save_manifest(symbol, manifest)
+            print(f"✅ Rescued {writer.rows} headlines ➜ {writer.output_path}")
+
+    if SCORE_CACHE is not None:
+        SCORE_CACHE.report()
+    near_dedup.report(n_models=len(MODEL_PIPELINES))
+    report_inference_stats()
+
 if __name__ == "__main__":
     run_auto_rescue()
@@ -0,0 +1,256 @@
+# scripts/batch_inference.py
+#
+# Batched scoring: titles are tokenized once per tokenizer family (models
+# sharing a tokenizer reuse the encodings), truncated on tokens, and grouped
+# into batches of similar token length so little of each batch is padding.
+# Results come back in input order. This is the one scoring loop every
+# model goes through (per-row, batched, rescue, inference server).
+# INFERENCE_STATS records rows, time and padding efficiency per model;
+# report_inference_stats() prints them and appends them to MODEL_COST_LOG.
+import csv
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from score_cache import model_revision, title_hash
+
+DEFAULT_BATCH_SIZE = 16
+MAX_TOKENS = 512
+MODEL_COST_LOG = "outputs/logs/model_costs.csv"
+
+# model name ➜ Counter(rows, batches, seconds, real_tokens, padded_tokens);
+# "tokenize:<family>" entries hold (texts, seconds) of the shared encoding passes
+INFERENCE_STATS = defaultdict(Counter)
+
+
+# === Split any iterable (list, Series, generator) into fixed-size lists ===
+def iter_chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def intra_op_threads(threads):
+    """Run torch with `threads` intra-op threads inside the block (None = unchanged)."""
+    if not threads:
+        yield
+        return
+    import torch
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+# === Tokenization, shared by every model with the same tokenizer ===
+def tokenizer_family(pipe):
+    tokenizer = pipe.tokenizer
+    max_length = min(tokenizer.model_max_length, MAX_TOKENS)
+    return f"{type(tokenizer).__name__}:{getattr(tokenizer, 'name_or_path', '')}:{len(tokenizer)}:{max_length}"
+
+
+def encode_texts(pipe, texts):
+    """Unpadded encodings (one dict of token lists per text), truncated to the model's max tokens."""
+    max_length = min(pipe.tokenizer.model_max_length, MAX_TOKENS)
+    encoded = pipe.tokenizer(list(texts), truncation=True, max_length=max_length, padding=False)
+    fields = list(encoded.keys())
+    return [{field: encoded[field][i] for field in fields} for i in range(len(texts))]
+
+
+def length_batches(lengths, batch_size):
+    """Positions grouped into batches of similar token length, longest first (OOMs show up early)."""
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+# === One padded forward pass for a batch of encodings ===
+def score_encoded(pipe, encodings):
+    """
+    Pad `encodings` to the longest one in the batch, run a single forward
+    pass and return ([(label, score) per text], real tokens, padded tokens).
+    Mirrors what the HF sentiment pipeline returns for one input.
+    """
+    import torch
+
+    encoded = pipe.tokenizer.pad(encodings, padding=True, return_tensors="pt")
+    attention = encoded["attention_mask"]
+    encoded = {k: v.to(pipe.device) for k, v in encoded.items()}
+
+    with torch.no_grad():
+        logits = pipe.model(**encoded).logits
+
+    probs = torch.softmax(logits, dim=-1)
+    scores, label_ids = probs.max(dim=-1)
+    id2label = pipe.model.config.id2label
+    outputs = [(id2label[int(i)], float(s)) for i, s in zip(label_ids, scores)]
+    return outputs, int(attention.sum()), attention.numel()
+
+
+def score_batch(pipe, texts):
+    """Tokenize and score one batch of raw texts ➜ (label, score) per text."""
+    return score_encoded(pipe, encode_texts(pipe, texts))[0]
+
+
+# === Score a whole column of titles with every model ===
+def analyze_titles(titles, pipelines, batch_sizes=None, cache=None, verbose=False, threads=None):
+    """
+    Score every title with every pipeline in `pipelines`, batching per model.
+    Returns a DataFrame with label_<model>/score_<model> columns, aligned to
+    the index of `titles` when it is a Series. `threads` maps a model name
+    to its torch intra-op thread count.
+
+    Repeated titles are scored once. When a ScoreCache is given, cached
+    scores are reused and only the misses go through the model. Each
+    tokenizer family encodes a title at most once per call.
+    """
+    index = titles.index if isinstance(titles, pd.Series) else None
+    texts = [str(t) for t in titles]
+    keys = [title_hash(t) for t in texts]
+    batch_sizes = batch_sizes or {}
+    threads = threads or {}
+    encodings = {}  # tokenizer family ➜ {title key: encoding}
+
+    results = {}
+    for model_name, pipe in pipelines.items():
+        batch_size = batch_sizes.get(model_name, DEFAULT_BATCH_SIZE)
+
+        known = {}
+        if cache is not None:
+            revision = model_revision(pipe)
+            cache.ensure_revision(model_name, revision)
+            known = cache.get_many(model_name, revision, keys)
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in known:
+                pending.setdefault(key, text)
+
+        scored = {}
+        encoded = {}
+        if pending:
+            try:
+                encoded = _encode_pending(pipe, pending, encodings)
+            except Exception as e:
+                scored = {k: ("ERROR", 0.0) for k in pending}
+                if verbose:
+                    tqdm.write(f"  ❌ {model_name} tokenization failed ➜ {e}")
+
+        pending_keys = [k for k in pending if k in encoded]
+        stats = INFERENCE_STATS[model_name]
+        with intra_op_threads(threads.get(model_name)):
+            for positions in length_batches([len(encoded[k]["input_ids"]) for k in pending_keys], batch_size):
+                batch_keys = [pending_keys[i] for i in positions]
+                start = time.perf_counter()
+                try:
+                    outputs, real_tokens, padded_tokens = score_encoded(pipe, [encoded[k] for k in batch_keys])
+                    stats.update(real_tokens=real_tokens, padded_tokens=padded_tokens)
+                except Exception as e:
+                    outputs = [("ERROR", 0.0)] * len(batch_keys)
+                    if verbose:
+                        tqdm.write(f"  ❌ {model_name} batch of {len(batch_keys)} failed ➜ {e}")
+                stats.update(rows=len(batch_keys), batches=1)
+                stats["seconds"] += time.perf_counter() - start
+                scored.update(zip(batch_keys, outputs))
+
+        if cache is not None:
+            cache.put_many(model_name, revision, [(k, label, score) for k, (label, score) in scored.items()])
+
+        known.update(scored)
+        results[f"label_{model_name}"] = [known[k][0] for k in keys]
+        results[f"score_{model_name}"] = [known[k][1] for k in keys]
+        if verbose:
+            tqdm.write(f"  ✅ {model_name} ➜ scored {len(scored)} new / {len(texts)} titles (batch size {batch_size})")
+
+    return pd.DataFrame(results, index=index)
+
+
+def _encode_pending(pipe, pending, encodings):
+    """Encodings for every pending title, tokenizing only those this tokenizer family has not seen."""
+    family = tokenizer_family(pipe)
+    encoded = encodings.setdefault(family, {})
+    missing = [k for k in pending if k not in encoded]
+    if missing:
+        start = time.perf_counter()
+        encoded.update(zip(missing, encode_texts(pipe, [pending[k] for k in missing])))
+        stats = INFERENCE_STATS[f"tokenize:{family}"]
+        stats["texts"] += len(missing)
+        stats["seconds"] += time.perf_counter() - start
+    return encoded
+
+
+def inference_stats_since(snapshot):
+    """Per-model stats accumulated since `snapshot` (a deep copy of INFERENCE_STATS)."""
+    return {name: stats - snapshot.get(name, Counter()) for name, stats in INFERENCE_STATS.items()}
+
+
+def merge_inference_stats(delta):
+    for name, stats in delta.items():
+        INFERENCE_STATS[name].update(stats)
+
+
+def model_costs(stats=INFERENCE_STATS):
+    """One cost row per model that scored anything: rows, time, throughput, latency, padding."""
+    rows = []
+    for name, s in sorted(stats.items()):
+        if name.startswith("tokenize:") or not s["rows"]:
+            continue
+        rows.append({
+            "model": name,
+            "rows": s["rows"],
+            "batches": s["batches"],
+            "seconds": round(s["seconds"], 3),
+            "rows_per_second": round(s["rows"] / s["seconds"], 1) if s["seconds"] else 0.0,
+            "ms_per_row": round(1000 * s["seconds"] / s["rows"], 3),
+            "ms_per_batch": round(1000 * s["seconds"] / s["batches"], 1),
+            "padding_efficiency": round(s["real_tokens"] / s["padded_tokens"], 4) if s["padded_tokens"] else 0.0,
+        })
+    return rows
+
+
+def report_inference_stats(stats=INFERENCE_STATS, log_path=MODEL_COST_LOG):
+    """Print tokenization and per-model costs; append the model rows to `log_path` (None = print only)."""
+    for name, s in sorted(stats.items()):
+        if name.startswith("tokenize:") and s["texts"]:
+            rate = s["texts"] / s["seconds"] if s["seconds"] else 0.0
+            print(f"🔤 {name[len('tokenize:'):]}: {s['texts']} texts tokenized in {s['seconds']:.2f}s ({rate:.0f}/s)")
+
+    costs = model_costs(stats)
+    for c in costs:
+        print(f"📏 {c['model']}: {c['rows']} rows in {c['batches']} batches, {c['seconds']:.2f}s "
+              f"({c['rows_per_second']:.1f} rows/s, {c['ms_per_row']:.2f} ms/row, {c['ms_per_batch']:.0f} ms/batch) "
+              f"| padding efficiency {c['padding_efficiency']:.1%}")
+    if not costs or not log_path:
+        return
+
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    new_file = not os.path.exists(log_path)
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    with open(log_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["timestamp"] + list(costs[0]))
+        if new_file:
+            writer.writeheader()
+        writer.writerows({"timestamp": timestamp, **c} for c in costs)
+
+
+# === Score an unbounded stream of titles chunk by chunk ===
+def analyze_title_stream(titles, pipelines, chunk_size=1024, batch_sizes=None, cache=None, verbose=False, threads=None):
+    """
+    Generator version of analyze_titles for iterables that should not be
+    materialized at once. Yields one DataFrame per `chunk_size` titles.
+    """
+    for chunk in iter_chunks(titles, chunk_size):
+        yield analyze_titles(chunk, pipelines, batch_sizes=batch_sizes, cache=cache, verbose=verbose, threads=threads)
@@ -0,0 +1,117 @@
+# scripts/compare_backends.py
+#
+# Accuracy + latency report for every inference backend of every model.
+# fp32 PyTorch labels on a stored headline sample are the reference.
+#
+#   python3 scripts/compare_backends.py
+#   python3 scripts/compare_backends.py --models roberta --backends torch,onnx-int8
+import argparse
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from batch_inference import analyze_titles
+from inference_backends import BACKENDS, build_pipeline
+from model_registry import MODEL_SPECS, MODELS
+from sentiment_analysis import BATCH_SIZES
+
+SAMPLE_PATH = "data/eval/backend_sample.csv"
+REPORT_PATH = "outputs/benchmarks/backend_report.json"
+SAMPLE_SIZE = 500
+
+console = Console()
+
+
+def load_or_create_sample(refresh=False):
+    """The sample is stored so every comparison runs on the same headlines."""
+    if os.path.exists(SAMPLE_PATH) and not refresh:
+        return pd.read_csv(SAMPLE_PATH)["title"].astype(str)
+
+    titles = []
+    for path in sorted(glob.glob("data/raw_news/*_news.csv")):
+        df = pd.read_csv(path)
+        df.columns = [col.strip().lower() for col in df.columns]
+        if "title" in df.columns:
+            titles.extend(df["title"].dropna().astype(str).tolist())
+
+    sample = pd.Series(titles, name="title").drop_duplicates()
+    sample = sample.sample(n=min(SAMPLE_SIZE, len(sample)), random_state=42)
+    os.makedirs(os.path.dirname(SAMPLE_PATH), exist_ok=True)
+    sample.to_frame().to_csv(SAMPLE_PATH, index=False)
+    print(f"🧪 Stored {len(sample)} sample headlines ➜ {SAMPLE_PATH}")
+    return sample.reset_index(drop=True)
+
+
+def evaluate(model_name, backend, titles):
+    start = time.perf_counter()
+    spec = MODELS[model_name]
+    pipe = build_pipeline(spec.model_id, backend, revision=spec.revision)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scored = analyze_titles(titles, {model_name: pipe}, batch_sizes=BATCH_SIZES)
+    score_s = time.perf_counter() - start
+
+    return scored, {
+        "model": model_name,
+        "backend": backend,
+        "load_seconds": round(load_s, 2),
+        "score_seconds": round(score_s, 2),
+        "rows_per_second": round(len(titles) / score_s, 1),
+        "ms_per_row": round(1000 * score_s / len(titles), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference backends against fp32 PyTorch.")
+    parser.add_argument("--models", default=",".join(MODEL_SPECS))
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--refresh-sample", action="store_true")
+    args = parser.parse_args()
+
+    titles = load_or_create_sample(args.refresh_sample)
+    backends = [b for b in args.backends.split(",") if b]
+    report = []
+
+    for model_name in args.models.split(","):
+        reference, fp32_stats = evaluate(model_name, "torch", titles)
+        label_col, score_col = f"label_{model_name}", f"score_{model_name}"
+
+        for backend in backends:
+            if backend == "torch":
+                scored, stats = reference, fp32_stats
+            else:
+                try:
+                    scored, stats = evaluate(model_name, backend, titles)
+                except Exception as e:
+                    print(f"❌ {model_name} / {backend} failed ➜ {e}")
+                    continue
+
+            stats["label_agreement"] = round(float((scored[label_col] == reference[label_col]).mean()), 4)
+            stats["mean_abs_score_diff"] = round(float((scored[score_col] - reference[score_col]).abs().mean()), 4)
+            stats["speedup_vs_fp32"] = round(fp32_stats["score_seconds"] / stats["score_seconds"], 2)
+            report.append(stats)
+
+    table = Table(title=f"Inference backends on {len(titles)} headlines")
+    for col in ["model", "backend", "rows/s", "ms/row", "speedup", "label agreement", "mean |Δscore|", "load s"]:
+        table.add_column(col)
+    for r in report:
+        table.add_row(
+            r["model"], r["backend"], f"{r['rows_per_second']}", f"{r['ms_per_row']}",
+            f"{r['speedup_vs_fp32']}x", f"{r['label_agreement']:.1%}", f"{r['mean_abs_score_diff']}", f"{r['load_seconds']}",
+        )
+    console.print(table)
+
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📁 Report saved to: {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# scripts/dedup.py
+#
+# Row-level dedup keys shared by sentiment_analysis.py, auto_rescue.py and
+# fmp_news_scraper.py.
+#
+# A key is a stable 64-bit hash (pandas' keyed SipHash, identical across
+# processes and runs, unlike the salted builtin hash()) of the normalized
+# (date, title) pair: the date parsed to UTC-naive nanoseconds, the title
+# lowercased with whitespace collapsed. Keys are computed for a whole column
+# at once instead of one Python call per row.
+#
+# SeenKeys keeps a symbol's already-processed keys as a sorted uint64 .npy
+# file, so a stage can drop known rows before scoring or rewriting anything.
+#
+#   seen = SeenKeys("outputs/state/sentiment/AAPL.keys.npy")
+#   keys = row_keys(df)
+#   fresh = df[~seen.contains(keys) & first_occurrence(keys)]
+#   seen.add(keys); seen.save()
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+SEEN_DIR = "outputs/state/seen"
+
+
+def _date_ns(values):
+    """Dates ➜ UTC-naive int64 nanoseconds; unparseable / missing ➜ int64 min."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values if values.dt.tz is None else values.dt.tz_convert("UTC").dt.tz_localize(None)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # "could not infer format" for mixed columns
+            parsed = pd.to_datetime(values, errors="coerce", utc=True)
+        retry = parsed.isna() & values.notna()
+        if retry.any():
+            parsed[retry] = pd.to_datetime(values[retry], errors="coerce", utc=True, format="mixed")
+        parsed = parsed.dt.tz_localize(None)
+    return parsed.astype("datetime64[ns]").to_numpy().view("int64")
+
+
+def normalize_titles(values):
+    titles = pd.Series(values).fillna("").astype(str).str.lower().str.strip()
+    # Collapsing whitespace is the slow part; only rewrite the titles that need it
+    messy = titles.str.contains(r"\s\s|[^\S ]", regex=True)
+    if messy.any():
+        titles = titles.copy()
+        titles[messy] = titles[messy].str.replace(r"\s+", " ", regex=True)
+    return titles
+
+
+def row_keys(df, date_col="date", title_col="title"):
+    """uint64 key per row of `df` over its normalized (date, title); a missing date column hashes as NaT."""
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    dates = _date_ns(df[date_col]) if date_col in df.columns else np.full(len(df), np.iinfo(np.int64).min)
+    title_hash = pd.util.hash_array(normalize_titles(df[title_col]).to_numpy(dtype=object))
+    date_hash = pd.util.hash_array(dates)
+    # Mix the two column hashes (rotate one so (a, b) and (b, a) differ) and hash again
+    mixed = title_hash ^ ((date_hash << np.uint64(1)) | (date_hash >> np.uint64(63)))
+    return pd.util.hash_array(mixed)
+
+
+def first_occurrence(keys):
+    """Boolean mask keeping the first row of every key."""
+    return ~pd.Series(keys).duplicated().to_numpy()
+
+
+class SeenKeys:
+    """Sorted, persistent set of uint64 row keys for one symbol."""
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = np.load(path) if os.path.exists(path) else np.empty(0, dtype=np.uint64)
+
+    @classmethod
+    def for_symbol(cls, stage, symbol, root=SEEN_DIR):
+        return cls(os.path.join(root, stage, f"{symbol}.npy"))
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def contains(self, keys):
+        keys = np.asarray(keys, dtype=np.uint64)
+        if not len(self.keys) or not len(keys):
+            return np.zeros(len(keys), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return self.keys[pos] == keys
+
+    def clear(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+
+    def add(self, keys):
+        # Merge into the sorted array in O(n + m) instead of re-sorting the union (called once per chunk)
+        keys = np.unique(np.asarray(keys, dtype=np.uint64))
+        keys = keys[~self.contains(keys)]
+        if len(keys):
+            self.keys = np.insert(self.keys, np.searchsorted(self.keys, keys), keys)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npy"
+        np.save(tmp_path, self.keys)
+        os.replace(tmp_path, self.path)
@@ -1,10 +1,13 @@
 import os
-import requests
 import pandas as pd
-from datetime import datetime, timedelta
 import json
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
+from async_fetcher import fetch_many
+from dedup import SeenKeys, first_occurrence, row_keys
+from http_cache import HTTP_CACHE, cached_get
+
 load_dotenv()
 
 # === CONFIG ===
@@ -17,34 +20,58 @@ TICKERS = [entry["ticker"] for entry in tickers_json]
 
 NEWS_LIMIT = 10  # Number of news items per stock
 OUTPUT_DIR = "data/fmp_news"
+FMP_NEWS_URL = os.getenv("FMP_NEWS_URL", "https://financialmodelingprep.com/api/v4/general_news")
+FMP_RPS = float(os.getenv("FMP_RPS", 5))  # per-host request rate limit (free tier ≈ 300/min)
 
 # === Ensure output directory exists ===
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def fetch_news(ticker):
-    url = "https://financialmodelingprep.com/api/v4/general_news"
-    params = {
+def news_params(ticker):
+    return {
         "tickers": ticker,
         "limit": NEWS_LIMIT,
         "apikey": FMP_API_KEY
     }
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        news_items = response.json()
 
-        if not news_items:
-            print(f"⚠️ No news returned for {ticker}")
-            return pd.DataFrame()
+def news_frame(ticker, news_items):
+    if not news_items:
+        print(f"⚠️ No news returned for {ticker}")
+        return pd.DataFrame()
+
+    df = pd.DataFrame(news_items)
+    df["ticker"] = ticker
+    return df
 
-        df = pd.DataFrame(news_items)
-        df["ticker"] = ticker
-        return df
+def fetch_news(ticker):
+    try:
+        response = cached_get(FMP_NEWS_URL, params=news_params(ticker))
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return news_frame(ticker, response.json())
 
     except Exception as e:
         print(f"❌ Error fetching news for {ticker}: {e}")
         return pd.DataFrame()
 
+def fetch_all_news(tickers):
+    """Fetch every ticker concurrently over one pooled, rate-limited client ➜ {ticker: DataFrame}."""
+    fetched = fetch_many(
+        [(ticker, FMP_NEWS_URL, news_params(ticker)) for ticker in tickers],
+        rate_limits={urlsplit(FMP_NEWS_URL).hostname: FMP_RPS},
+        cache=HTTP_CACHE,
+    )
+    frames = {}
+    for ticker in tickers:
+        result = fetched[ticker]
+        try:
+            if not result.ok:
+                raise RuntimeError(f"{result.error} after {result.attempts} attempts")
+            frames[ticker] = news_frame(ticker, json.loads(result.content))
+        except Exception as e:
+            print(f"❌ Error fetching news for {ticker}: {e}")
+            frames[ticker] = pd.DataFrame()
+    return frames
+
 def clean_and_save(df, ticker):
     if df.empty:
         return
@@ -57,29 +84,45 @@ def clean_and_save(df, ticker):
     df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
     df = df.dropna()
 
-    # === Deduplication key ===
-    df["__hash__"] = df.apply(lambda x: hash((x["date"], x["headline"])), axis=1)
-
     output_path = os.path.join(OUTPUT_DIR, f"{ticker}_news.csv")
 
+    # === Deduplication: (date, headline) keys of the articles already saved ===
+    seen = SeenKeys.for_symbol("fmp_news", ticker)
+    if not os.path.exists(output_path):
+        seen.clear()
+    elif not seen.exists():
+        saved = pd.read_csv(output_path, usecols=lambda col: col in ("date", "headline"))
+        if not saved.empty:
+            seen.add(row_keys(saved, title_col="headline"))
+
+    keys = row_keys(df, title_col="headline")
+    fresh = ~seen.contains(keys) & first_occurrence(keys)
+    if not fresh.any():
+        seen.save()
+        print(f"⏭️ No new articles for {ticker} ➜ {output_path} unchanged")
+        return
+    df = df[fresh]
+
     if os.path.exists(output_path):
         existing_df = pd.read_csv(output_path)
         if not existing_df.empty:
-            existing_df["__hash__"] = existing_df.apply(lambda x: hash((x["date"], x["headline"])), axis=1)
             df = pd.concat([existing_df, df], ignore_index=True)
-            df = df.drop_duplicates(subset="__hash__")
+            df = df[first_occurrence(row_keys(df, title_col="headline"))]
 
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df = df.drop(columns=["__hash__"])
     df = df.sort_values("date")
 
     # === Save ===
     df.to_csv(output_path, index=False)
-    print(f"✅ Saved ({len(df)}) total articles for {ticker} ➜ {output_path}")
+    seen.add(keys[fresh])
+    seen.save()
+    print(f"✅ Saved ({len(df)}) total articles for {ticker} ({fresh.sum()} new) ➜ {output_path}")
 
 
 # === MAIN SCRAPER LOOP ===
 if __name__ == "__main__":
-    for ticker in TICKERS:
-        df = fetch_news(ticker)
+    for ticker, df in fetch_all_news(TICKERS).items():
         clean_and_save(df, ticker)
+
+    if HTTP_CACHE is not None:
+        HTTP_CACHE.report()
@@ -0,0 +1,198 @@
+# scripts/http_cache.py
+#
+# Persistent HTTP response cache shared by the news and price fetchers.
+#
+# Responses are stored with their ETag / Last-Modified validators. A fresh
+# entry is served without touching the network; a stale one is revalidated
+# with a conditional GET (If-None-Match / If-Modified-Since) and a 304 reuses
+# the stored body. Freshness is per endpoint (ENDPOINT_TTLS); price history
+# whose range ends before today (New York time) covers closed trading days
+# only and never expires.
+#
+# The API key is never part of the cache key, so rotating it keeps the cache.
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from zoneinfo import ZoneInfo
+
+import requests
+
+CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "outputs/cache/http_cache.sqlite")
+MARKET_TZ = ZoneInfo("America/New_York")
+SECRET_PARAMS = {"apikey"}
+
+RSS_TTL = int(os.getenv("HTTP_CACHE_RSS_TTL", 30 * 60))
+NEWS_TTL = int(os.getenv("HTTP_CACHE_NEWS_TTL", 15 * 60))
+OPEN_PRICES_TTL = int(os.getenv("HTTP_CACHE_PRICES_TTL", 60 * 60))
+NEVER = None
+
+
+def price_ttl(query):
+    """Ranges ending before today only cover closed trading days: cache forever."""
+    try:
+        end = date.fromisoformat(query.get("to", ""))
+    except ValueError:
+        return OPEN_PRICES_TTL
+    return NEVER if end < datetime.now(MARKET_TZ).date() else OPEN_PRICES_TTL
+
+
+# === Per-endpoint freshness: (name, path fragment, query ➜ TTL seconds or NEVER) ===
+ENDPOINT_TTLS = [
+    ("google_rss", "/rss/search", lambda query: RSS_TTL),
+    ("fmp_news", "/general_news", lambda query: NEWS_TTL),
+    ("fmp_prices", "/historical-price-full/", price_ttl),
+]
+DEFAULT_ENDPOINT = ("other", lambda query: 0)  # always revalidate
+
+
+def canonical_url(url, params=None):
+    """URL + params with sorted query args and secrets removed."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + list((params or {}).items())
+    query = sorted((k, str(v)) for k, v in query if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def endpoint_for(url):
+    path = urlsplit(url).path
+    for name, fragment, ttl in ENDPOINT_TTLS:
+        if fragment in path:
+            return name, ttl
+    return DEFAULT_ENDPOINT
+
+
+@dataclass
+class CacheRequest:
+    key: str
+    endpoint: str
+    ttl: object
+    body: bytes = None
+    fresh: bool = False
+    headers: dict = None
+
+
+@dataclass
+class CachedResponse:
+    """The subset of requests.Response the fetchers use."""
+    status_code: int
+    content: bytes
+    from_cache: bool = False
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL
+            )"""
+        )
+        self.conn.commit()
+
+        self.hits = Counter()         # served fresh from the cache, no request
+        self.revalidated = Counter()  # conditional request answered 304
+        self.misses = Counter()
+        self.bytes_saved = Counter()
+
+    def prepare(self, url, params=None):
+        """Look `url` up: fresh entries are served as-is, stale ones get conditional headers."""
+        key = canonical_url(url, params)
+        endpoint, ttl = endpoint_for(url)
+        request = CacheRequest(key=key, endpoint=endpoint, ttl=ttl(dict(parse_qsl(urlsplit(key).query))), headers={})
+
+        row = self.conn.execute(
+            "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return request
+
+        request.body, etag, last_modified, expires_at = row
+        if expires_at is None or expires_at > time.time():
+            request.fresh = True
+            self.hits[endpoint] += 1
+            self.bytes_saved[endpoint] += len(request.body)
+        else:
+            if etag:
+                request.headers["If-None-Match"] = etag
+            if last_modified:
+                request.headers["If-Modified-Since"] = last_modified
+        return request
+
+    def resolve(self, request, status, content, headers):
+        """Record the network answer to `request` ➜ (status, body) to hand to the caller."""
+        if status == 304 and request.body is not None:
+            self.revalidated[request.endpoint] += 1
+            self.bytes_saved[request.endpoint] += len(request.body)
+            self._store(request, request.body, headers)
+            return 200, request.body
+
+        self.misses[request.endpoint] += 1
+        # FMP reports bad keys / limits as a 200 JSON error object: never cache those
+        if status == 200 and not content.lstrip().startswith(b'{"Error Message"'):
+            self._store(request, content, headers)
+        return status, content
+
+    def _store(self, request, body, headers):
+        now = time.time()
+        expires_at = None if request.ttl is NEVER else now + request.ttl
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (request.key, request.endpoint, body, headers.get("ETag"), headers.get("Last-Modified"), now, expires_at),
+        )
+        self.conn.commit()
+
+    def stats(self):
+        endpoints = sorted(set(self.hits) | set(self.revalidated) | set(self.misses))
+        return {
+            endpoint: {
+                "hits": self.hits[endpoint],
+                "revalidated": self.revalidated[endpoint],
+                "misses": self.misses[endpoint],
+                "bytes_saved": self.bytes_saved[endpoint],
+            }
+            for endpoint in endpoints
+        }
+
+    def report(self):
+        for endpoint, s in self.stats().items():
+            print(f"🗃️ HTTP cache [{endpoint}]: {s['hits']} hits, {s['revalidated']} revalidated (304), "
+                  f"{s['misses']} misses | {s['bytes_saved'] / 1e6:.2f} MB saved")
+
+
+HTTP_CACHE = HttpCache() if os.getenv("HTTP_CACHE", "1") != "0" else None
+
+
+def cached_get(url, params=None, cache=HTTP_CACHE, session=None, timeout=30):
+    """requests.get through the cache; returns a CachedResponse."""
+    http = session or requests
+    if cache is None:
+        response = http.get(url, params=params, timeout=timeout)
+        return CachedResponse(response.status_code, response.content)
+
+    request = cache.prepare(url, params)
+    if request.fresh:
+        return CachedResponse(200, request.body, from_cache=True)
+    response = http.get(url, params=params, headers=request.headers, timeout=timeout)
+    status, body = cache.resolve(request, response.status_code, response.content, response.headers)
+    return CachedResponse(status, body, from_cache=response.status_code == 304)
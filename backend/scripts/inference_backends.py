@@ -0,0 +1,85 @@
+# scripts/inference_backends.py
+#
+# CPU inference backends for the sentiment models:
+#   torch       full-precision PyTorch (default)
+#   torch-int8  PyTorch with dynamic int8 quantization of every nn.Linear
+#   onnx        ONNX Runtime on an exported fp32 graph
+#   onnx-int8   ONNX Runtime on a dynamically int8-quantized graph
+#
+# The ONNX backends need `pip install optimum[onnxruntime]`.
+import os
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+ONNX_EXPORT_DIR = os.getenv("ONNX_EXPORT_DIR", "outputs/models/onnx")
+QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def _require_optimum():
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError as e:
+        raise RuntimeError("❌ ONNX backends need optimum[onnxruntime] (pip install 'optimum[onnxruntime]')") from e
+    return ORTModelForSequenceClassification, ORTQuantizer, AutoQuantizationConfig
+
+
+def export_onnx(model_id, quantize=False, revision=None):
+    """
+    Export `model_id` (at `revision`) to ONNX once (and optionally quantize
+    it) under ONNX_EXPORT_DIR; later calls reuse the files on disk.
+    Returns (model_dir, onnx_file_name).
+    """
+    ORTModel, ORTQuantizer, AutoQuantizationConfig = _require_optimum()
+    from transformers import AutoTokenizer
+
+    fp32_dir = os.path.join(ONNX_EXPORT_DIR, model_id.replace("/", "__") + (f"@{revision}" if revision else ""))
+    if not os.path.exists(os.path.join(fp32_dir, "model.onnx")):
+        print(f"📦 Exporting {model_id} to ONNX ➜ {fp32_dir}")
+        ORTModel.from_pretrained(model_id, export=True, revision=revision).save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(model_id, revision=revision).save_pretrained(fp32_dir)
+
+    if not quantize:
+        return fp32_dir, "model.onnx"
+
+    int8_dir = fp32_dir + "__int8"
+    if not os.path.exists(os.path.join(int8_dir, QUANTIZED_FILE)):
+        print(f"🗜️ Quantizing {model_id} (dynamic int8) ➜ {int8_dir}")
+        quantizer = ORTQuantizer.from_pretrained(fp32_dir)
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=int8_dir, quantization_config=qconfig)
+        AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(int8_dir)
+    return int8_dir, QUANTIZED_FILE
+
+
+def build_pipeline(model_id, backend="torch", revision=None):
+    """
+    Build a HF sentiment pipeline for `model_id` on the requested backend,
+    pinned to `revision` (Hub commit / tag) when given.
+    Non-default backends tag the pipeline with `cache_revision` so their
+    scores are cached separately from the fp32 ones.
+    """
+    from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}' (expected one of {BACKENDS})")
+
+    if backend == "torch":
+        return pipeline("sentiment-analysis", model=model_id, revision=revision)
+
+    if backend == "torch-int8":
+        import torch
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_id, revision=revision)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        tokenizer = AutoTokenizer.from_pretrained(model_id, revision=revision)
+        pipe = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+    else:
+        ORTModel, _, _ = _require_optimum()
+        model_dir, file_name = export_onnx(model_id, quantize=backend == "onnx-int8", revision=revision)
+        model = ORTModel.from_pretrained(model_dir, file_name=file_name)
+        pipe = pipeline("sentiment-analysis", model=model, tokenizer=AutoTokenizer.from_pretrained(model_dir))
+
+    config = AutoConfig.from_pretrained(model_id, revision=revision)
+    base_revision = getattr(config, "_commit_hash", None) or revision or model_id
+    pipe.cache_revision = f"{base_revision}+{backend}"
+    return pipe
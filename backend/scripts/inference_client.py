@@ -0,0 +1,38 @@
+# scripts/inference_client.py
+import json
+import os
+from urllib import request
+
+import pandas as pd
+
+SERVER_URL = os.getenv("SENTIMENT_SERVER_URL")  # e.g. http://127.0.0.1:8765
+TIMEOUT_SECONDS = float(os.getenv("SENTIMENT_SERVER_TIMEOUT", 600))
+
+
+def _post(url, payload):
+    req = request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with request.urlopen(req, timeout=TIMEOUT_SECONDS) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def score_remote(titles, server_url=SERVER_URL, use_cache=True, source=None):
+    """
+    Score titles on a running inference_server.py. Returns the same
+    label_<model>/score_<model> DataFrame as analyze_titles_batched
+    (only the models configured for `source`, when given).
+    Raises OSError when the server cannot be reached.
+    """
+    index = titles.index if isinstance(titles, pd.Series) else None
+    payload = {"titles": [str(t) for t in titles], "use_cache": use_cache, "source": source}
+    body = _post(f"{server_url.rstrip('/')}/score", payload)
+    return pd.DataFrame(body["results"], columns=body["columns"], index=index)
+
+
+def server_health(server_url=SERVER_URL):
+    with request.urlopen(f"{server_url.rstrip('/')}/health", timeout=5) as resp:
+        return json.loads(resp.read().decode("utf-8"))
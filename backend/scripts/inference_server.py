@@ -0,0 +1,100 @@
+# scripts/inference_server.py
+#
+# Long-lived local scoring worker: loads the sentiment models once and serves
+# them to every pipeline script / API process on the host.
+#
+#   python3 scripts/inference_server.py --port 8765
+#   export SENTIMENT_SERVER_URL=http://127.0.0.1:8765
+#
+# Endpoints:
+#   GET  /health  ➜ loaded models, uptime, request count
+#   GET  /models  ➜ configured models (config/models.json) and their costs so far
+#   POST /score   ➜ {"titles": [...], "use_cache": true, "source": "raw_news"}
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dataclasses import asdict
+
+from batch_inference import model_costs
+from model_registry import MODEL_SPECS, MODELS, get_pipeline, loaded_models
+from sentiment_analysis import SCORE_CACHE, analyze_titles_local
+
+# One forward pass at a time: torch already uses every core for a batch
+_score_lock = threading.Lock()
+_started_at = time.time()
+_stats = {"requests": 0, "titles": 0}
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/models":
+            costs = {c["model"]: c for c in model_costs()}
+            return self._send_json(200, {
+                "models": [{**asdict(spec), "costs": costs.get(name)} for name, spec in MODELS.items()],
+            })
+        if self.path != "/health":
+            return self._send_json(404, {"error": "not found"})
+        self._send_json(200, {
+            "status": "ok",
+            "models": list(MODEL_SPECS),
+            "loaded": loaded_models(),
+            "uptime_seconds": round(time.time() - _started_at, 1),
+            "cache": SCORE_CACHE.stats() if SCORE_CACHE is not None else None,
+            **_stats,
+        })
+
+    def do_POST(self):
+        if self.path != "/score":
+            return self._send_json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            titles = payload.get("titles", [])
+            with _score_lock:
+                results = analyze_titles_local(titles, use_cache=payload.get("use_cache", True),
+                                               source=payload.get("source"))
+            _stats["requests"] += 1
+            _stats["titles"] += len(titles)
+            self._send_json(200, {"columns": results.columns.tolist(), "results": results.to_dict(orient="list")})
+        except Exception as e:
+            print(f"❌ /score failed ➜ {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass  # keep stdout for pipeline-style progress lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the sentiment models over localhost HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--no-preload", action="store_true", help="Load models on first request instead of at startup")
+    args = parser.parse_args()
+
+    if not args.no_preload:
+        for name in MODEL_SPECS:
+            get_pipeline(name)
+
+    server = ThreadingHTTPServer((args.host, args.port), InferenceHandler)
+    print(f"🚀 Inference server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 Inference server stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
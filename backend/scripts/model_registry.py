@@ -0,0 +1,138 @@
+# scripts/model_registry.py
+#
+# Sentiment model registry, configured in config/models.json
+# (SENTIMENT_MODELS_CONFIG points elsewhere):
+#
+#   {"models": [{"name": "finbert", "model_id": "yiyanghkust/finbert-tone",
+#                "revision": null, "backend": "torch", "batch_size": 32,
+#                "threads": null, "enabled": true, "sources": ["*"]}]}
+#
+#   revision    Hub commit / tag to pin the weights (null = latest)
+#   backend     one of inference_backends.BACKENDS
+#   threads     torch intra-op threads while this model runs (null = unchanged)
+#   sources     input datasets the model scores, fnmatch patterns over
+#               "raw_news", "fmp_news", "skipped_validated"
+#
+# Every enabled model runs through batch_inference.analyze_titles, which
+# records its rows, time and padding per run (INFERENCE_STATS).
+# Environment overrides: SENTIMENT_MODELS="finbert" (the enabled set),
+# SENTIMENT_BACKENDS="roberta=onnx-int8".
+import fnmatch
+import json
+import os
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
+
+from inference_backends import BACKENDS, build_pipeline
+
+MODELS_CONFIG = os.getenv("SENTIMENT_MODELS_CONFIG", "config/models.json")
+
+
+@dataclass
+class ModelSpec:
+    name: str
+    model_id: str
+    revision: str = None
+    backend: str = "torch"
+    batch_size: int = 16
+    threads: int = None
+    enabled: bool = True
+    sources: list = field(default_factory=lambda: ["*"])
+
+    def applies_to(self, source):
+        return source is None or any(fnmatch.fnmatch(source, pattern) for pattern in self.sources)
+
+
+# Used when the config file is missing
+DEFAULT_MODELS = [
+    ModelSpec("finbert", "yiyanghkust/finbert-tone", batch_size=32),
+    ModelSpec("roberta", "siebert/sentiment-roberta-large-english", batch_size=8),
+]
+
+
+def load_models(path=MODELS_CONFIG):
+    """name ➜ ModelSpec for every configured model (enabled or not), environment overrides applied."""
+    if os.path.exists(path):
+        with open(path) as f:
+            specs = [ModelSpec(**entry) for entry in json.load(f)["models"]]
+    else:
+        specs = [replace(spec) for spec in DEFAULT_MODELS]
+    models = {spec.name: spec for spec in specs}
+
+    for item in filter(None, os.getenv("SENTIMENT_BACKENDS", "").split(",")):
+        name, _, backend = item.partition("=")
+        if name.strip() in models:
+            models[name.strip()].backend = backend.strip()
+
+    enabled = {name.strip() for name in os.getenv("SENTIMENT_MODELS", "").split(",") if name.strip()}
+    if enabled:
+        unknown = enabled - set(models)
+        if unknown:
+            raise ValueError(f"SENTIMENT_MODELS names unknown models {sorted(unknown)} (configured: {sorted(models)})")
+        for spec in models.values():
+            spec.enabled = spec.name in enabled
+
+    for spec in models.values():
+        if spec.backend not in BACKENDS:
+            raise ValueError(f"Model '{spec.name}': unknown backend '{spec.backend}' (expected one of {BACKENDS})")
+    return models
+
+
+MODELS = load_models()
+
+# === Enabled models: name ➜ Hugging Face model id / backend / batch size / threads ===
+MODEL_SPECS = {name: spec.model_id for name, spec in MODELS.items() if spec.enabled}
+MODEL_BACKENDS = {name: MODELS[name].backend for name in MODEL_SPECS}
+MODEL_BATCH_SIZES = {name: MODELS[name].batch_size for name in MODEL_SPECS}
+MODEL_THREADS = {name: MODELS[name].threads for name in MODEL_SPECS if MODELS[name].threads}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def get_pipeline(name, backend=None):
+    """Load the named model on first use; later calls return the same pipeline."""
+    spec = MODELS[name]
+    backend = backend or spec.backend
+    with _lock:
+        if (name, backend) not in _loaded:
+            pinned = f"@{spec.revision}" if spec.revision else ""
+            print(f"⏳ Loading {name} ({spec.model_id}{pinned}, {backend})...")
+            _loaded[(name, backend)] = build_pipeline(spec.model_id, backend, revision=spec.revision)
+            print(f"✅ {name} loaded.")
+        return _loaded[(name, backend)]
+
+
+def loaded_models():
+    return sorted(f"{name}:{backend}" for name, backend in _loaded)
+
+
+class LazyPipelines(Mapping):
+    """
+    Read-only dict of name ➜ pipeline that loads each model only when it is
+    first accessed, so importing a script no longer pays for every model.
+    Covers every enabled model unless `names` narrows it.
+    """
+
+    def __init__(self, names=None):
+        self.names = list(MODEL_SPECS) if names is None else list(names)
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(name)
+        return get_pipeline(name)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def pipelines_for(source=None):
+    """Enabled models that score rows from `source` (None = every enabled model)."""
+    return LazyPipelines([name for name in MODEL_SPECS if MODELS[name].applies_to(source)])
+
+
+MODEL_PIPELINES = LazyPipelines()
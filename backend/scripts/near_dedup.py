@@ -0,0 +1,153 @@
+# scripts/near_dedup.py
+#
+# Near-duplicate headline clustering ahead of sentiment scoring.
+#
+# Google News / FMP repeat the same story with different publisher suffixes
+# (" - Yahoo Finance", " | TipRanks") and cosmetic differences. Titles are
+# normalized (lowercased, punctuation dropped, a trailing " - ..." clause
+# stripped only when MIN_TOKENS words remain, so "Nvidia - Shares plunge..."
+# keeps its clause) and grouped:
+#   1. identical normalized titles form one cluster outright;
+#   2. the remaining distinct titles are MinHashed over their word sets and
+#      banded (LSH); titles sharing a band are merged when their exact word
+#      Jaccard similarity is >= NEAR_DEDUP_JACCARD.
+# Only the first title of each cluster is scored; its scores are copied to
+# the other members. STATS accumulates how many inference calls that saved.
+#
+#   reps = representatives(titles)   # position of each title's representative
+import csv
+import os
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+NEAR_DEDUP = os.getenv("NEAR_DEDUP", "1") != "0"
+JACCARD_THRESHOLD = float(os.getenv("NEAR_DEDUP_JACCARD", 0.9))
+MIN_TOKENS = 4          # shorter titles only cluster on an exact normalized match
+BANDS, ROWS = 8, 4      # 32 MinHash values; J=0.9 pairs collide in some band with p ≈ 0.9998
+MAX_BUCKET_PAIRS = 64   # members of a larger LSH bucket are only compared to its first title
+REPORT_LOG = "outputs/logs/near_dedup_runs.csv"
+
+PUBLISHER_SUFFIX = r"\s+[-|–—]\s+[^-|–—]{1,60}$"
+_SEEDS = np.random.default_rng(20240101).integers(1, 2**63, BANDS * ROWS, dtype=np.uint64)
+
+STATS = Counter()
+
+
+def _words(text):
+    return text.str.lower().str.replace(r"[^\w]+", " ", regex=True).str.strip()
+
+
+def normalize_titles(titles):
+    """
+    Lowercase, keep only letters/digits, single spaces; a trailing publisher
+    clause is dropped only when at least MIN_TOKENS words remain without it.
+    """
+    text = pd.Series(titles).fillna("").astype(str)
+    full = _words(text)
+    stripped = _words(text.str.replace(PUBLISHER_SUFFIX, "", regex=True))
+    long_enough = stripped.str.split().str.len() >= MIN_TOKENS
+    return stripped.where(long_enough, full)
+
+
+def _mix(x):
+    """splitmix64 finalizer (uint64 arithmetic wraps)."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _band_keys(token_sets):
+    """(BANDS, n) uint64 LSH bucket keys, one row per band."""
+    lengths = np.array([len(s) for s in token_sets])
+    tokens = np.array([tok for s in token_sets for tok in s], dtype=object)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    base = pd.util.hash_array(tokens)
+    with np.errstate(over="ignore"):
+        keys = np.empty((BANDS, len(token_sets)), dtype=np.uint64)
+        for band in range(BANDS):
+            key = np.zeros(len(token_sets), dtype=np.uint64)
+            for seed in _SEEDS[band * ROWS:(band + 1) * ROWS]:
+                minhash = np.minimum.reduceat(_mix(base ^ seed), starts)
+                key = _mix(key ^ minhash)
+            keys[band] = key
+    return keys
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _cluster_distinct(token_sets, threshold):
+    """Union-find root per distinct normalized title (roots are the smallest member index)."""
+    n = len(token_sets)
+    parent = np.arange(n)
+    eligible = np.array([len(s) >= MIN_TOKENS for s in token_sets])
+    idx = np.flatnonzero(eligible)
+    if len(idx) < 2:
+        return parent
+
+    for band_key in _band_keys([token_sets[i] for i in idx]):
+        order = np.argsort(band_key, kind="stable")
+        sorted_keys = band_key[order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for bucket in np.split(order, bounds):
+            if len(bucket) < 2:
+                continue
+            members = idx[bucket]
+            pairs = (
+                [(a, b) for k, a in enumerate(members) for b in members[k + 1:]]
+                if len(members) * (len(members) - 1) // 2 <= MAX_BUCKET_PAIRS
+                else [(members[0], b) for b in members[1:]]
+            )
+            for a, b in pairs:
+                ra, rb = _find(parent, a), _find(parent, b)
+                if ra == rb:
+                    continue
+                sa, sb = token_sets[a], token_sets[b]
+                if len(sa & sb) >= threshold * len(sa | sb):
+                    parent[max(ra, rb)] = min(ra, rb)
+    return np.array([_find(parent, i) for i in range(n)])
+
+
+def representatives(titles, threshold=JACCARD_THRESHOLD):
+    """Position (0..n-1) of the representative title for each title; representatives map to themselves."""
+    normalized = normalize_titles(titles)
+    codes, distinct = pd.factorize(normalized)
+    token_sets = [frozenset(t.split()) for t in distinct]
+    roots = _cluster_distinct(token_sets, threshold)
+
+    # Representative = first title (in input order) of each cluster
+    cluster = roots[codes]
+    first_pos = pd.Series(np.arange(len(cluster))).groupby(cluster).transform("min").to_numpy()
+
+    STATS["titles"] += len(cluster)
+    STATS["distinct_titles"] += pd.Series(titles).astype(str).nunique()
+    STATS["clusters"] += len(np.unique(cluster))
+    return first_pos
+
+
+def report(stats=STATS, n_models=1):
+    """Print and log (REPORT_LOG) the inference calls saved since `stats` was last reset."""
+    if not stats["titles"]:
+        return
+    saved_titles = stats["distinct_titles"] - stats["clusters"]
+    saved_calls = saved_titles * n_models
+    print(f"🧬 Near-dup: {stats['titles']} titles ➜ {stats['distinct_titles']} distinct ➜ "
+          f"{stats['clusters']} clusters | saved {saved_titles} titles × {n_models} models = {saved_calls} inference calls")
+
+    os.makedirs(os.path.dirname(REPORT_LOG), exist_ok=True)
+    new_file = not os.path.exists(REPORT_LOG)
+    with open(REPORT_LOG, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["timestamp", "titles", "distinct_titles", "clusters", "models", "inference_calls_saved"])
+        writer.writerow([datetime.now().isoformat(timespec="seconds"), stats["titles"], stats["distinct_titles"],
+                         stats["clusters"], n_models, saved_calls])
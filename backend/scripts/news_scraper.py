@@ -4,7 +4,14 @@ import os
 import json
 import feedparser
 from datetime import datetime
-from urllib.parse import quote_plus  # ✅ NEW
+from urllib.parse import quote_plus, urlsplit  # ✅ NEW
+
+from async_fetcher import fetch_many
+from http_cache import HTTP_CACHE, cached_get
+from relevance import SCRAPER_KEYWORDS, RelevanceClassifier, load_learned_keywords
+
+GOOGLE_NEWS_RSS_URL = os.getenv("GOOGLE_NEWS_RSS_URL", "https://news.google.com/rss/search")
+GOOGLE_NEWS_RPS = float(os.getenv("GOOGLE_NEWS_RPS", 10))  # per-host request rate limit
 
 # === Output folder setup ===
 os.makedirs("data/raw_news", exist_ok=True)
@@ -16,17 +23,28 @@ with open("config/tickers.json") as f:
 
 tickers = {entry["ticker"].upper(): entry["query"] for entry in tickers_json}
 
-# === Scraper function ===
-def scrape_google_news(query, max_entries=100):
+# Static + learned keywords, then ticker symbols, compiled once for every feed
+relevance = RelevanceClassifier(SCRAPER_KEYWORDS + load_learned_keywords(), tickers.keys())
+
+# === Scraper functions ===
+def google_news_url(query):
     safe_query = quote_plus(query)  # ✅ Properly encode query string
-    url = f"https://news.google.com/rss/search?q=({safe_query})+stock+OR+earnings+OR+market+OR+company+OR+finance+OR+shares&hl=en-US&gl=US&ceid=US:en"
-    feed = feedparser.parse(url)
+    return f"{GOOGLE_NEWS_RSS_URL}?q=({safe_query})+stock+OR+earnings+OR+market+OR+company+OR+finance+OR+shares&hl=en-US&gl=US&ceid=US:en"
 
+def scrape_google_news(query, max_entries=100):
+    response = cached_get(google_news_url(query))
+    feed = feedparser.parse(response.content if response.status_code == 200 else b"")
+    return classify_feed(feed, query, max_entries)
+
+def classify_feed(feed, query, max_entries=100):
+    """Split a parsed feed into (relevant, skipped) headline DataFrames."""
     relevant_data = []
     skipped_data = []
 
-    for entry in feed.entries[:max_entries]:
-        title_lower = entry.title.lower()
+    entries = feed.entries[:max_entries]
+    reasons = relevance.classify([entry.title for entry in entries], query)
+
+    for entry, reason in zip(entries, reasons):
         published_raw = entry.get("published", "")
         published_dt = pd.to_datetime(published_raw, errors="coerce", utc=True)
 
@@ -38,35 +56,34 @@ def scrape_google_news(query, max_entries=100):
             "source": "Google"
         }
 
-        # === Classify based on relevance ===
-        keywords = [
-            "stock", "share", "company", "automotive", "motors", "market",
-            "ipo", "acquisition", "earnings", "forecast", "results", "trading",
-            "dividend", "price", "merger", "bond", "buyback", "equity", "capital",
-            "profit", "loss", "revenue", "cloud", "ai", "data", "aws", "summit",
-            "product", "launch", "airbnb"
-        ]
-
-        # First: keyword match
-        if any(kw in title_lower for kw in keywords):
-            relevant_data.append(row)
-        # Rescue: if symbol like 'AMZN' or 'AAPL' is mentioned in title
-        elif any(sym.lower() in title_lower for sym in tickers.keys()):
+        # === Classify based on relevance: keyword, then symbol rescue, then query rescue ===
+        if reason == "symbol":
             print(f"🛟 Rescued headline for symbol match ➜ {entry.title}")
-            relevant_data.append(row)
-        # (Optional) Rescue: query string (e.g. "McDonald's") in title
-        elif query.lower() in title_lower:
+        elif reason == "query":
             print(f"🔄 Rescued by full name match ➜ {entry.title}")
-            relevant_data.append(row)
-        else:
+
+        if reason is None:
             skipped_data.append(row)
+        else:
+            relevant_data.append(row)
 
     return pd.DataFrame(relevant_data), pd.DataFrame(skipped_data)
 
 # === Main loop ===
 if __name__ == "__main__":
+    # Fetch every feed concurrently, then parse/classify/save in ticker order
+    fetched = fetch_many(
+        [(symbol, google_news_url(query), None) for symbol, query in tickers.items()],
+        rate_limits={urlsplit(GOOGLE_NEWS_RSS_URL).hostname: GOOGLE_NEWS_RPS},
+        cache=HTTP_CACHE,
+    )
+
     for symbol, query in tickers.items():
-        df_relevant, df_skipped = scrape_google_news(query)
+        result = fetched[symbol]
+        if not result.ok:
+            print(f"❌ Fetch failed for {symbol} after {result.attempts} attempts ➜ {result.error} (keeping previous files)")
+            continue
+        df_relevant, df_skipped = classify_feed(feedparser.parse(result.content), query)
 
         # Save relevant
         relevant_path = f"data/raw_news/{symbol}_news.csv"
@@ -76,4 +93,7 @@ if __name__ == "__main__":
         # Save skipped
         skipped_path = f"data/skipped_raw_news/{symbol}_skipped.csv"
         df_skipped.to_csv(skipped_path, index=False)
-        print(f"⚠️  Saved {len(df_skipped)} skipped (irrelevant) headlines to {skipped_path}")
\ No newline at end of file
+        print(f"⚠️  Saved {len(df_skipped)} skipped (irrelevant) headlines to {skipped_path}")
+
+    if HTTP_CACHE is not None:
+        HTTP_CACHE.report()
\ No newline at end of file
@@ -0,0 +1,169 @@
+# scripts/price_store.py
+#
+# Local daily OHLC store (SQLite) for every symbol the pipeline merges.
+#
+# `coverage` records the contiguous calendar range already fetched for each
+# symbol, so a request only downloads the days before / after it. Days are
+# only marked covered once they are closed (before today, New York time), so
+# today's partial bar is fetched again on the next run. Daily price I/O is
+# O(new days × tickers) instead of the full history every run.
+#
+#   store = PriceStore()
+#   store.ensure(symbol, start, end)      # fetch missing days from FMP
+#   store.daily_returns(symbol, start, end)
+import os
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from http_cache import cached_get
+
+STORE_PATH = os.getenv("PRICE_STORE_PATH", "outputs/prices/prices.sqlite")
+FMP_PRICES_URL = os.getenv("FMP_PRICES_URL", "https://financialmodelingprep.com/api/v3/historical-price-full")
+MARKET_TZ = ZoneInfo("America/New_York")
+PRICE_COLUMNS = ["open", "high", "low", "close", "adjclose", "volume"]
+
+
+def last_closed_day():
+    return datetime.now(MARKET_TZ).date() - timedelta(days=1)
+
+
+def fetch_fmp_history(symbol, start, end):
+    """Daily bars for start..end (inclusive) from FMP ➜ DataFrame[date, open, ..., volume]."""
+    response = cached_get(
+        f"{FMP_PRICES_URL}/{symbol}",
+        params={"from": start.isoformat(), "to": end.isoformat(), "apikey": os.getenv("FMP_API_KEY")},
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"❌ FMP request failed: {response.text}")
+
+    # Rate limits and bad keys come back as 200 with an "Error Message" body: never read that as "no bars"
+    payload = response.json()
+    if not isinstance(payload, dict) or "Error Message" in payload or "historical" not in payload:
+        raise RuntimeError(f"❌ FMP returned no price history for {symbol}: {response.text[:200]}")
+
+    df = pd.DataFrame(payload["historical"])
+    if df.empty:
+        return pd.DataFrame(columns=["date"] + PRICE_COLUMNS)
+    df.columns = [col.strip().lower() for col in df.columns]
+    return df.reindex(columns=["date"] + PRICE_COLUMNS)
+
+
+def _as_date(value):
+    return pd.Timestamp(value).date()
+
+
+class PriceStore:
+    def __init__(self, path=STORE_PATH, fetch=fetch_fmp_history):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.fetch = fetch
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS prices (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                {", ".join(f"{col} REAL" for col in PRICE_COLUMNS)},
+                PRIMARY KEY (symbol, date)
+            )"""
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage (symbol TEXT PRIMARY KEY, start TEXT NOT NULL, end TEXT NOT NULL)"
+        )
+        self.conn.commit()
+        self.fetched_days = 0
+        self.fetch_calls = 0
+
+    def coverage(self, symbol):
+        row = self.conn.execute("SELECT start, end FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+        return (date.fromisoformat(row[0]), date.fromisoformat(row[1])) if row else None
+
+    def missing_ranges(self, symbol, start, end):
+        """
+        Unfetched calendar ranges needed to cover start..end. Each range runs
+        up to the edge of the covered one, so a request far from it also
+        fetches the gap and coverage stays a single contiguous range.
+        """
+        covered = self.coverage(symbol)
+        if covered is None:
+            return [(start, end)] if start <= end else []
+        ranges = []
+        if start < covered[0]:
+            ranges.append((start, covered[0] - timedelta(days=1)))
+        if end > covered[1]:
+            ranges.append((covered[1] + timedelta(days=1), end))
+        return [(a, b) for a, b in ranges if a <= b]
+
+    def ensure(self, symbol, start, end):
+        """Fetch whatever part of start..end is not stored yet; returns the number of new bars."""
+        start, end = _as_date(start), _as_date(end)
+        added = 0
+        for lo, hi in self.missing_ranges(symbol, start, end):
+            print(f"🔍 Fetching {symbol} prices {lo} ➜ {hi}")
+            bars = self.fetch(symbol, lo, hi)  # raises on an error payload, before coverage is extended
+            self.fetch_calls += 1
+            added += self._upsert(symbol, bars)
+            self._extend_coverage(symbol, lo, min(hi, last_closed_day()))
+        self.fetched_days += added
+        return added
+
+    def _upsert(self, symbol, bars):
+        if bars.empty:
+            return 0
+        bars = bars.assign(date=pd.to_datetime(bars["date"]).dt.strftime("%Y-%m-%d"))
+        rows = [
+            (symbol, d, *(None if pd.isna(v) else float(v) for v in values))
+            for d, *values in bars[["date"] + PRICE_COLUMNS].itertuples(index=False)
+        ]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO prices VALUES (?, ?, {', '.join('?' * len(PRICE_COLUMNS))})", rows
+        )
+        self.conn.commit()
+        return len(rows)
+
+    def _extend_coverage(self, symbol, start, end):
+        if start > end:
+            return  # only today (still open) was fetched
+        covered = self.coverage(symbol)
+        if covered is not None:
+            # Ranges from missing_ranges() end at (or start right after) the covered one: the union is contiguous
+            start, end = min(start, covered[0]), max(end, covered[1])
+        self.conn.execute(
+            "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?)", (symbol, start.isoformat(), end.isoformat())
+        )
+        self.conn.commit()
+
+    def load(self, symbol, start=None, end=None):
+        """Stored bars for `symbol` (optionally start..end) ➜ DataFrame sorted by date."""
+        query, args = "SELECT * FROM prices WHERE symbol = ?", [symbol]
+        if start is not None:
+            query, args = query + " AND date >= ?", args + [_as_date(start).isoformat()]
+        if end is not None:
+            query, args = query + " AND date <= ?", args + [_as_date(end).isoformat()]
+        df = pd.read_sql_query(query + " ORDER BY date", self.conn, params=args)
+        df["date"] = pd.to_datetime(df["date"])
+        return df.drop(columns=["symbol"])
+
+    def daily_returns(self, symbol, start=None, end=None):
+        """date, close, nextdayclose, nextdayreturn per trading day (next = next stored bar)."""
+        df = self.load(symbol, start, end)[["date", "close"]]
+        df["nextdayclose"] = df["close"].shift(-1)
+        df["nextdayreturn"] = (df["nextdayclose"] / df["close"]) - 1
+        return df
+
+    def symbols(self):
+        return [row[0] for row in self.conn.execute("SELECT symbol FROM coverage ORDER BY symbol")]
+
+    def report(self):
+        print(f"💾 Price store: {self.fetch_calls} fetches, {self.fetched_days} new bars "
+              f"({len(self.symbols())} symbols in {self.path})")
+
+
+if __name__ == "__main__":
+    store = PriceStore()
+    for symbol in sys.argv[1:] or store.symbols():
+        print(symbol, store.coverage(symbol))
@@ -0,0 +1,121 @@
+# scripts/relevance.py
+#
+# Headline relevance classification shared by news_scraper.py and
+# validate_skipped.py.
+#
+# Same rules as the old per-headline loops: a headline is relevant when a
+# keyword, or failing that a ticker symbol, occurs anywhere in the lowercased
+# title (plain substring match, no word boundaries). Each word list is
+# compiled once into a single matcher: an Aho-Corasick automaton when
+# pyahocorasick is installed, otherwise one regex built from a prefix trie.
+# Either way a title is scanned once per list instead of once per word.
+#
+#   clf = RelevanceClassifier(SCRAPER_KEYWORDS + load_learned_keywords(), tickers)
+#   reasons = clf.classify(titles, query="McDonald's")   # "keyword" | "symbol" | "query" | None
+import os
+import re
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+LEARNED_KEYWORDS_PATH = "config/learned_keywords.txt"
+
+SCRAPER_KEYWORDS = [
+    "stock", "share", "company", "automotive", "motors", "market",
+    "ipo", "acquisition", "earnings", "forecast", "results", "trading",
+    "dividend", "price", "merger", "bond", "buyback", "equity", "capital",
+    "profit", "loss", "revenue", "cloud", "ai", "data", "aws", "summit",
+    "product", "launch", "airbnb"
+]
+
+VALIDATION_KEYWORDS = [
+    "stock", "share", "ipo", "company", "acquisition", "earnings", "forecast",
+    "results", "trading", "dividend", "price", "merger", "buyback", "equity",
+    "capital", "ceo", "profit", "loss", "revenue", "cloud", "ai", "aws",
+    "summit", "product", "launch", "report", "announcement"
+]
+
+
+def load_learned_keywords(path=LEARNED_KEYWORDS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+
+def trie_pattern(words):
+    """
+    One regex matching any of `words` as a substring. Words sharing a prefix
+    share a branch, and a word that extends another is dropped (the shorter
+    one already matches), so the regex engine never backtracks through the
+    whole list at each position.
+    """
+    trie = {}
+    for word in sorted(set(words), key=len):
+        node = trie
+        for ch in word:
+            if node.get("") is True:
+                break  # a prefix of this word is already a word
+            node = node.setdefault(ch, {})
+        else:
+            node.clear()
+            node[""] = True
+
+    def build(node):
+        if node.get("") is True:
+            return ""
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie) if trie else None
+
+
+class SubstringMatcher:
+    """`matcher.search(text)` is True when any word occurs in text."""
+
+    def __init__(self, words):
+        words = sorted({w.lower() for w in words if w})
+        self.size = len(words)
+        self.automaton = None
+        self.regex = None
+        if not words:
+            return
+        if AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for word in words:
+                self.automaton.add_word(word, word)
+            self.automaton.make_automaton()
+        else:
+            self.regex = re.compile(trie_pattern(words))
+
+    def search(self, text):
+        if self.automaton is not None:
+            return next(self.automaton.iter(text), None) is not None
+        return self.regex is not None and self.regex.search(text) is not None
+
+
+class RelevanceClassifier:
+    def __init__(self, keywords, symbols=()):
+        self.keywords = SubstringMatcher(keywords)
+        self.symbols = SubstringMatcher(symbols)
+
+    def reason(self, title, query=None):
+        """Why a title counts as relevant ("keyword", "symbol", "query") or None."""
+        title_lower = str(title).lower()
+        if self.keywords.search(title_lower):
+            return "keyword"
+        if self.symbols.search(title_lower):
+            return "symbol"
+        if query and query.lower() in title_lower:
+            return "query"
+        return None
+
+    def classify(self, titles, query=None):
+        """One reason (or None) per title."""
+        return [self.reason(title, query) for title in titles]
+
+    def is_relevant(self, titles, query=None):
+        return [reason is not None for reason in self.classify(titles, query)]
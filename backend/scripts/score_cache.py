@@ -0,0 +1,137 @@
+# scripts/score_cache.py
+import hashlib
+import os
+import re
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "outputs/cache/sentiment_scores.sqlite")
+SQLITE_MAX_PARAMS = 500
+
+
+# === Cache keys ===
+# Only whitespace is normalized: the models are case-sensitive, so
+# "Apple beats" and "APPLE BEATS" must not share a score.
+def normalize_title(text):
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+def title_hash(text):
+    return hashlib.sha256(normalize_title(text).encode("utf-8")).hexdigest()
+
+
+def revision_backend(revision):
+    """Inference backend encoded in a cache revision ("<commit>+onnx-int8"); plain revisions are fp32 torch."""
+    return revision.rsplit("+", 1)[1] if "+" in revision else "torch"
+
+
+def model_revision(pipe):
+    """
+    Best-effort identifier of the exact weights behind a pipeline:
+    the Hub commit hash when available, else the model path/name.
+    Quantized/ONNX pipelines carry their own `cache_revision`.
+    """
+    if getattr(pipe, "cache_revision", None):
+        return pipe.cache_revision
+    config = pipe.model.config
+    return getattr(config, "_commit_hash", None) or config.name_or_path
+
+
+class ScoreCache:
+    """
+    Persistent (model, revision, title hash) ➜ (label, score) store.
+    Entries for a model are dropped as soon as a different revision of it is
+    seen on the same backend; other backends' scores (e.g. fp32 while an
+    onnx-int8 comparison runs) are kept.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS scores (
+                model TEXT NOT NULL,
+                revision TEXT NOT NULL,
+                title_hash TEXT NOT NULL,
+                label TEXT NOT NULL,
+                score REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (model, revision, title_hash)
+            )"""
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS model_revisions (model TEXT PRIMARY KEY, revision TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self.invalidated = Counter()
+        self._checked = {}
+
+    def ensure_revision(self, model, revision):
+        """Invalidate cached scores of `model` produced by another revision on the same backend."""
+        if self._checked.get(model) == revision:
+            return
+        backend = revision_backend(revision)
+        stale = [
+            old for (old,) in self.conn.execute("SELECT DISTINCT revision FROM scores WHERE model = ?", (model,))
+            if old != revision and revision_backend(old) == backend
+        ]
+        deleted = 0
+        for old in stale:
+            deleted += self.conn.execute("DELETE FROM scores WHERE model = ? AND revision = ?", (model, old)).rowcount
+        self.conn.execute(
+            "INSERT OR REPLACE INTO model_revisions (model, revision) VALUES (?, ?)", (model, revision)
+        )
+        self.conn.commit()
+        if deleted:
+            self.invalidated[model] += deleted
+            print(f"♻️ {model}: revision changed ➜ invalidated {deleted} cached scores")
+        self._checked[model] = revision
+
+    def get_many(self, model, revision, hashes):
+        """Return {title_hash: (label, score)} for the hashes already cached."""
+        wanted = list(dict.fromkeys(hashes))
+        found = {}
+        for start in range(0, len(wanted), SQLITE_MAX_PARAMS):
+            chunk = wanted[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT title_hash, label, score FROM scores "
+                f"WHERE model = ? AND revision = ? AND title_hash IN ({placeholders})",
+                (model, revision, *chunk),
+            )
+            found.update((h, (label, score)) for h, label, score in rows)
+
+        self.hits[model] += len(found)
+        self.misses[model] += len(wanted) - len(found)
+        return found
+
+    def put_many(self, model, revision, entries):
+        """Store (title_hash, label, score) tuples. ERROR results are never cached."""
+        now = datetime.utcnow().isoformat()
+        rows = [(model, revision, h, label, float(score), now) for h, label, score in entries if label != "ERROR"]
+        if not rows:
+            return
+        self.conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def stats(self):
+        models = sorted(set(self.hits) | set(self.misses))
+        return {
+            model: {
+                "hits": self.hits[model],
+                "misses": self.misses[model],
+                "hit_rate": round(self.hits[model] / max(self.hits[model] + self.misses[model], 1), 4),
+                "invalidated": self.invalidated[model],
+            }
+            for model in models
+        }
+
+    def report(self):
+        for model, s in self.stats().items():
+            print(f"🗃️ Score cache [{model}]: {s['hits']} hits / {s['misses']} misses ({s['hit_rate']:.1%} hit rate)")
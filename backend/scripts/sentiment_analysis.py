@@ -1,63 +1,481 @@
-from transformers import pipeline
 from tqdm import tqdm
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+import argparse
+import multiprocessing
 import os
+import sys
 import json
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from batch_inference import (
+    INFERENCE_STATS, analyze_titles, inference_stats_since, merge_inference_stats, report_inference_stats,
+)
+from dedup import SeenKeys, first_occurrence, row_keys
+import near_dedup
+from inference_client import SERVER_URL, score_remote
+from model_registry import MODEL_BATCH_SIZES, MODEL_PIPELINES, MODEL_THREADS, pipelines_for
+from score_cache import ScoreCache
+
 # === Load Tickers from JSON ===
 with open("config/tickers.json") as f:
     tickers_json = json.load(f)
 ACTIVE_TICKERS = set(entry["ticker"].upper() for entry in tickers_json)
 
-# === Define Multiple Sentiment Models ===
-print("⏳ Loading FinBERT...")
-finbert_model = pipeline("sentiment-analysis", model="yiyanghkust/finbert-tone")
+# === Sentiment Models ===
+# The enabled models, their batch sizes, threads and sources come from
+# config/models.json (see model_registry.py); MODEL_PIPELINES loads each
+# model on first use. With SENTIMENT_SERVER_URL set, batched scoring goes to
+# inference_server.py instead and no model is loaded in this process.
+
+# === Per-model batch sizes (override with SENTIMENT_BATCH_SIZES="finbert=32,roberta=8") ===
+BATCH_SIZES = dict(MODEL_BATCH_SIZES)
+for item in filter(None, os.getenv("SENTIMENT_BATCH_SIZES", "").split(",")):
+    name, _, size = item.partition("=")
+    BATCH_SIZES[name.strip()] = int(size)
+
+# === Streaming ingestion (SENTIMENT_CHUNK_ROWS / --chunk-rows; 0 = read whole files) ===
+CHUNK_ROWS = int(os.getenv("SENTIMENT_CHUNK_ROWS", 0))
+DEFAULT_CHUNK_ROWS = 50_000
+
+# === Persistent score cache (disable with SENTIMENT_CACHE=0) ===
+SCORE_CACHE = ScoreCache() if os.getenv("SENTIMENT_CACHE", "1") != "0" else None
+
+def analyze_all_models(text, verbose=False, use_cache=True, source=None):
+    """Score one title with every enabled model ➜ {label_<model>: ..., score_<model>: ...}."""
+    return analyze_titles_local([text], verbose=verbose, use_cache=use_cache, source=source).iloc[0].to_dict()
+
+
+def analyze_titles_local(titles, verbose=False, use_cache=True, source=None):
+    """Score titles in this process with the enabled models that apply to `source`."""
+    cache = SCORE_CACHE if use_cache else None
+    pipelines = MODEL_PIPELINES if source is None else pipelines_for(source)
+    return analyze_titles(titles, pipelines, batch_sizes=BATCH_SIZES, cache=cache, verbose=verbose,
+                          threads=MODEL_THREADS)
+
+
+def analyze_titles_batched(titles, verbose=False, use_cache=True, source=None):
+    """
+    Batched equivalent of `titles.apply(analyze_all_models).apply(pd.Series)`.
+    Near-duplicate titles (near_dedup.py) are scored once and share the
+    representative's scores. `source` (input dataset name, e.g. "raw_news")
+    limits scoring to the models configured for it. Uses the shared
+    inference server when SENTIMENT_SERVER_URL is set.
+    """
+    titles = pd.Series(titles)
+    if not near_dedup.NEAR_DEDUP or titles.empty:
+        return score_titles(titles, verbose=verbose, use_cache=use_cache, source=source)
+
+    reps = near_dedup.representatives(titles)
+    unique_reps = np.unique(reps)
+    scored = score_titles(titles.iloc[unique_reps], verbose=verbose, use_cache=use_cache, source=source)
+    results = scored.iloc[np.searchsorted(unique_reps, reps)]
+    results.index = titles.index
+    return results
+
+
+def score_titles(titles, verbose=False, use_cache=True, source=None):
+    """Score every title as given (remote server when configured, else local models)."""
+    if SERVER_URL:
+        try:
+            return score_remote(titles, use_cache=use_cache, source=source)
+        except OSError as e:
+            print(f"⚠️ Inference server {SERVER_URL} unreachable ({e}); scoring locally")
+    return analyze_titles_local(titles, verbose=verbose, use_cache=use_cache, source=source)
+
+
+def input_source(path):
+    """Source name of an input file for per-model `sources`: its directory name ("raw_news", "fmp_news")."""
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+# === Incremental state ===
+# One manifest per symbol: fingerprints of the input files already consumed
+# ({symbol}.json) and the dedup keys (dedup.row_keys) of every row already in
+# the output file ({symbol}.keys.npy).
+MANIFEST_DIR = "outputs/state/sentiment"
+
+
+def keys_path(symbol, manifest_dir=MANIFEST_DIR):
+    return os.path.join(manifest_dir, f"{symbol}.keys.npy")
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_manifest(symbol, output_dir, manifest_dir=MANIFEST_DIR):
+    manifest_path = os.path.join(manifest_dir, f"{symbol}.json")
+    output_path = os.path.join(output_dir, f"{symbol}_sentiment.csv")
+    seen = SeenKeys(keys_path(symbol, manifest_dir))
+    if os.path.exists(manifest_path) and os.path.exists(output_path) and seen.exists():
+        with open(manifest_path) as f:
+            data = json.load(f)
+        return {"files": data.get("files", {}), "seen": seen}
+
+    # First incremental run (output deleted, or an older manifest without keys): seed from the existing output
+    seen.clear()
+    manifest = {"files": {}, "seen": seen}
+    if os.path.exists(output_path):
+        existing_df = pd.read_csv(output_path, usecols=lambda col: col in ("date", "title"))
+        if not existing_df.empty and "title" in existing_df.columns:
+            seen.add(row_keys(existing_df))
+        tqdm.write(f"🧭 {symbol}: seeded manifest with {len(seen)} rows from {output_path}")
+    return manifest
+
+
+def save_manifest(symbol, manifest, manifest_dir=MANIFEST_DIR):
+    os.makedirs(manifest_dir, exist_ok=True)
+    manifest_path = os.path.join(manifest_dir, f"{symbol}.json")
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"files": manifest["files"]}, f)
+    os.replace(tmp_path, manifest_path)
+    manifest["seen"].save()
+
+
+def append_to_output(output_path, new_df):
+    """
+    Append new rows to an existing sentiment CSV when the columns line up,
+    otherwise fall back to a full merge + rewrite (sorted newest first).
+    Appended rows stay at the end of the file, so only a full rebuild keeps
+    the CSV itself newest-first; storage.read_ticker("sentiment", ...)
+    returns the rows newest-first either way.
+    """
+    if os.path.exists(output_path):
+        existing_cols = pd.read_csv(output_path, nrows=0).columns.tolist()
+        if set(new_df.columns) <= set(existing_cols):
+            new_df.reindex(columns=existing_cols).to_csv(output_path, mode="a", header=False, index=False)
+            return
+
+        existing_df = pd.read_csv(output_path)
+        existing_df["date"] = pd.to_datetime(existing_df["date"], errors="coerce")
+        new_df = pd.concat([existing_df, new_df], ignore_index=True).sort_values("date", ascending=False)
+
+    new_df.to_csv(output_path, index=False)
+
+
+def publish_sentiment(symbol, output_path, new_rows=None, replace=False):
+    """Mirror a {symbol}_sentiment.csv update into the Parquet sentiment dataset."""
+    if not storage.parquet_enabled():
+        return
+    if replace:
+        storage.write_ticker("sentiment", symbol, new_rows, write_csv=False)
+    elif not storage.has_ticker("sentiment", symbol):
+        # First publish for this symbol: mirror the whole CSV (already holds new_rows)
+        if os.path.exists(output_path):
+            storage.write_ticker("sentiment", symbol, pd.read_csv(output_path), write_csv=False)
+    elif new_rows is not None and not new_rows.empty:
+        storage.write_ticker("sentiment", symbol, new_rows, append=True, write_csv=False)
+
+
+class SentimentWriter:
+    """
+    Dedup-aware, append-only writer for one symbol's {symbol}_sentiment.csv.
+
+    unseen(keys) masks the rows not yet in the output (nor repeated within
+    the chunk); write(df, keys) appends those rows to the CSV, records their
+    keys in `seen` (saved to disk right away when appending to the live
+    output), then mirrors them into the Parquet sentiment dataset. Memory is
+    one chunk at a time: a chunk bringing new columns widens the CSV by
+    rewriting it chunk by chunk. replace=True builds a new output in a
+    temporary file that close() swaps in, and only if rows were written; a
+    killed rebuild leaves the old output untouched and simply starts over.
+
+    Not transactional: a hard kill between the CSV append and the key save
+    re-appends that one chunk on the next run, and a kill before the Parquet
+    write leaves that chunk missing from the dataset. Either way at most
+    one chunk is affected.
+    """
+
+    def __init__(self, symbol, output_dir, seen, replace=False, publish_parquet=True, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.symbol = symbol
+        self.output_path = os.path.join(output_dir, f"{symbol}_sentiment.csv")
+        self.path = f"{self.output_path}.tmp" if replace else self.output_path
+        self.seen = seen
+        self.replace = replace
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.columns = None
+        self.publish = publish_parquet and storage.parquet_enabled()
+        # Incremental first publish: mirror the existing CSV before the new rows
+        self.mirror_existing = self.publish and not replace and not storage.has_ticker("sentiment", symbol)
+
+        if replace:
+            seen.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        elif os.path.exists(self.path):
+            self.columns = pd.read_csv(self.path, nrows=0).columns.tolist()
+
+    def unseen(self, keys):
+        return ~self.seen.contains(keys) & first_occurrence(keys)
+
+    def write(self, df, keys):
+        """Append rows already filtered with unseen(keys); returns the number written."""
+        if df.empty:
+            return 0
+        if self.columns is None:
+            df.to_csv(self.path, index=False)
+            self.columns = df.columns.tolist()
+        else:
+            extra = [col for col in df.columns if col not in self.columns]
+            if extra:
+                self._widen(self.columns + extra)
+            df.reindex(columns=self.columns).to_csv(self.path, mode="a", header=False, index=False)
+        self.seen.add(keys)
+        if not self.replace:
+            self.seen.save()  # the CSV already holds these rows: never score / append them again
+        self._publish(df)
+        self.rows += len(df)
+        return len(df)
+
+    def close(self):
+        """Finish the output; True when rows were written."""
+        if self.replace:
+            if not self.rows:
+                return False
+            os.replace(self.path, self.output_path)
+        return self.rows > 0
 
-print("⏳ Loading RoBERTa...")
-roberta_model = pipeline("sentiment-analysis", model="siebert/sentiment-roberta-large-english")
-    # Add more as needed (e.g., "deberta": ..., "llama": ...)
+    def _widen(self, columns):
+        tmp_path = f"{self.path}.widen"
+        pd.DataFrame(columns=columns).to_csv(tmp_path, index=False)
+        for part in pd.read_csv(self.path, chunksize=self.chunk_rows):
+            part.reindex(columns=columns).to_csv(tmp_path, mode="a", header=False, index=False)
+        os.replace(tmp_path, self.path)
+        self.columns = columns
 
+    def _publish(self, df):
+        if not self.publish:
+            return
+        if self.mirror_existing:
+            if os.path.exists(self.output_path):
+                for part in pd.read_csv(self.output_path, chunksize=self.chunk_rows):
+                    storage.write_ticker("sentiment", self.symbol, part, append=True, write_csv=False)
+            self.mirror_existing = False
+        # A replacing writer swaps the symbol's partition on its first chunk, then appends
+        first_replace = self.replace and not self.rows
+        storage.write_ticker("sentiment", self.symbol, df, append=not first_replace, write_csv=False)
 
-MODEL_PIPELINES = {
-    "finbert": finbert_model,
-    "roberta": roberta_model,
-}
-print("✅ All models loaded.")
 
-def analyze_all_models(text, verbose=False):
-    text = text[:512]  # Truncate
-    results = {}
-    for model_name, pipe in MODEL_PIPELINES.items():
+def read_news_chunks(path, chunk_rows):
+    """Cleaned chunks of one news CSV (lowercased columns, titled rows, parsed dates)."""
+    for df in pd.read_csv(path, parse_dates=["date"], encoding="utf-8", chunksize=chunk_rows):
+        df.columns = [col.strip().lower() for col in df.columns]
+        if "title" not in df.columns:
+            print(f"⚠️ Skipping {os.path.basename(path)}; no 'title' column.")
+            return
+        df = df[df["title"].notnull()].copy()
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        if not df.empty:
+            yield df
+
+
+def stream_symbol(symbol, input_paths, output_dir, incremental, manifest_dir=MANIFEST_DIR,
+                  chunk_rows=DEFAULT_CHUNK_ROWS, publish_parquet=True, scorer=None):
+    """
+    Streaming counterpart of score_symbol's whole-file path: every input is
+    read `chunk_rows` rows at a time, rows already in the output are dropped
+    before scoring and the rest go straight to a SentimentWriter. Memory is
+    bounded by the chunk size plus the symbol's dedup keys (8 bytes a row),
+    not by its history. Rows land in input order (a full rebuild is not
+    re-sorted by date). Returns {input_path: fingerprint} of the files read.
+    """
+    scorer = scorer or analyze_titles_batched
+    if incremental:
+        manifest = load_manifest(symbol, output_dir, manifest_dir)
+    else:
+        manifest = {"files": {}, "seen": SeenKeys(keys_path(symbol, manifest_dir))}
+    writer = SentimentWriter(symbol, output_dir, manifest["seen"], replace=not incremental,
+                             publish_parquet=publish_parquet, chunk_rows=chunk_rows)
+    seen_files = {}
+
+    for input_path in input_paths:
+        filename = os.path.basename(input_path)
+        fingerprint = file_fingerprint(input_path)
+        if incremental and manifest["files"].get(input_path) == fingerprint:
+            seen_files[input_path] = fingerprint
+            continue
+
+        written = 0
         try:
-            result = pipe(text)[0]
-            label = result["label"]
-            score = result["score"]
-            results[f"label_{model_name}"] = label
-            results[f"score_{model_name}"] = score
-            if verbose:
-                tqdm.write(f"  ✅ {model_name} ➜ {label.upper()} ({score * 100:.1f}%)")
+            for df in read_news_chunks(input_path, chunk_rows):
+                keys = row_keys(df)
+                keep = writer.unseen(keys)
+                if not keep.any():
+                    continue
+                df, keys = df[keep], keys[keep]
+                model_results = scorer(df["title"], source=input_source(input_path))
+                df = pd.concat([df.reset_index(drop=True), model_results.reset_index(drop=True)], axis=1)
+                written += writer.write(df, keys)
+            seen_files[input_path] = fingerprint
+            tqdm.write(f"✅ {symbol}: Streamed {written} new rows from {filename}")
         except Exception as e:
-            results[f"label_{model_name}"] = "ERROR"
-            results[f"score_{model_name}"] = 0.0
-            if verbose:
-                tqdm.write(f"  ❌ {model_name} failed ➜ {e}")
-    return results
+            print(f"❌ Error processing {filename}: {e}")
 
+        # The writer saves `seen` after every appended chunk, so an error or retry skips rows already written
+        if incremental:
+            manifest["files"].update(seen_files)
+            save_manifest(symbol, manifest, manifest_dir)
 
+    if writer.close() and not incremental:
+        manifest["files"].update(seen_files)
+        save_manifest(symbol, manifest, manifest_dir)
+        print(f"✅ {symbol}: {len(input_paths)} source files ➜ {writer.rows} unique rows ➜ {writer.output_path}")
+    return seen_files
 
-def run_sentiment_analysis():
-    import hashlib
 
-    input_dirs = ["data/raw_news", "data/fmp_news"]
-    output_dir = "outputs/results/sentiment"
-    os.makedirs(output_dir, exist_ok=True)
+# === Per-symbol scoring (runs in the parent or in a pool worker) ===
+def score_symbol(symbol, input_paths, output_dir, incremental, manifest_dir=MANIFEST_DIR,
+                 chunk_rows=0, publish_parquet=True, scorer=None):
+    """
+    Read and score every input file of one symbol.
+    Returns (symbol, scored frames, manifest, {input_path: fingerprint},
+    (cache hits, cache misses, near-dup stats, inference stats)).
+    With chunk_rows > 0 the symbol is streamed (stream_symbol) and written
+    here; scored frames and manifest are then None.
+    """
+    scorer = scorer or analyze_titles_batched
+    hits_before = Counter(SCORE_CACHE.hits) if SCORE_CACHE is not None else Counter()
+    misses_before = Counter(SCORE_CACHE.misses) if SCORE_CACHE is not None else Counter()
+    near_dup_before = Counter(near_dedup.STATS)
+    inference_before = {name: Counter(stats) for name, stats in INFERENCE_STATS.items()}
+
+    if chunk_rows:
+        dfs, manifest = None, None
+        seen_files = stream_symbol(symbol, input_paths, output_dir, incremental, manifest_dir,
+                                   chunk_rows, publish_parquet, scorer)
+    else:
+        dfs, manifest, seen_files = _read_symbol(symbol, input_paths, output_dir, incremental, manifest_dir, scorer)
+
+    near_dup_delta = near_dedup.STATS - near_dup_before
+    inference_delta = inference_stats_since(inference_before)
+    cache_delta = (Counter(), Counter(), near_dup_delta, inference_delta)
+    if SCORE_CACHE is not None:
+        cache_delta = (SCORE_CACHE.hits - hits_before, SCORE_CACHE.misses - misses_before, near_dup_delta, inference_delta)
+    return symbol, dfs, manifest, seen_files, cache_delta
+
+
+def _read_symbol(symbol, input_paths, output_dir, incremental, manifest_dir, scorer):
+    """Whole-file path: every changed input is read and scored in one piece."""
+    manifest = load_manifest(symbol, output_dir, manifest_dir) if incremental else None
+    seen_files = {}
+    dfs = []
+
+    for input_path in input_paths:
+        filename = os.path.basename(input_path)
+        fingerprint = file_fingerprint(input_path)
+        if incremental and manifest["files"].get(input_path) == fingerprint:
+            seen_files[input_path] = fingerprint
+            continue
+
+        try:
+            df = pd.read_csv(input_path, parse_dates=["date"], encoding="utf-8")
+            df.columns = [col.strip().lower() for col in df.columns]
+            seen_files[input_path] = fingerprint
+            if "title" not in df.columns or df.empty:
+                print(f"⚠️ Skipping {filename}; no 'title' column or empty.")
+                continue
+
+            df = df[df["title"].notnull()].copy()
+            if "date" in df.columns:
+                df["date"] = pd.to_datetime(df["date"], errors="coerce")
+
+            # Only rows that are not in the output yet
+            if incremental and not df.empty:
+                keys = row_keys(df)
+                df = df[~manifest["seen"].contains(keys) & first_occurrence(keys)]
+            if df.empty:
+                continue
+
+            # Run sentiment models
+            model_results = scorer(df["title"], source=input_source(input_path))
+            df = pd.concat([df.reset_index(drop=True), model_results.reset_index(drop=True)], axis=1)
+
+            dfs.append(df)
+            tqdm.write(f"✅ {symbol}: Processed {len(df)} rows from {filename}")
+
+        except Exception as e:
+            print(f"❌ Error processing {filename}: {e}")
+            seen_files.pop(input_path, None)
+
+    return dfs, manifest, seen_files
+
+
+def _score_symbol_task(task):
+    return score_symbol(*task)
+
+
+def _init_worker(threads):
+    # One intra-op thread pool per worker, sized so workers × threads ≈ cores
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if not SERVER_URL:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+def iter_scored_symbols(tasks, workers, threads_per_worker=None):
+    """
+    Yield score_symbol results in task order. workers > 1 shards the
+    symbols across a process pool; each worker loads its own models (or
+    uses the inference server when SENTIMENT_SERVER_URL is set).
+    """
+    if workers <= 1:
+        for task in tqdm(tasks, desc="🔄 Scoring symbols"):
+            yield score_symbol(*task)
+        return
+
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    print(f"🧵 Scoring {len(tasks)} symbols on {workers} workers × {threads} threads")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        # map() returns results in submission order ➜ deterministic merge
+        yield from tqdm(pool.map(_score_symbol_task, tasks), total=len(tasks), desc="🔄 Scoring symbols")
 
-    # Tracks all results per ticker
-    from collections import defaultdict
-    combined_by_symbol = defaultdict(list)
 
+def run_sentiment_analysis(
+    incremental=True,
+    workers=1,
+    threads_per_worker=None,
+    input_dirs=("data/raw_news", "data/fmp_news"),
+    output_dir="outputs/results/sentiment",
+    manifest_dir=MANIFEST_DIR,
+    publish_parquet=True,
+    chunk_rows=CHUNK_ROWS,
+    scorer=None,
+):
+    """
+    Score every news CSV and write one sentiment file per symbol.
+
+    incremental=True (default) only reads input files that changed since the
+    last run, only scores rows whose (date, title) hash is not in the symbol's
+    manifest, and appends them to the existing output. incremental=False
+    rebuilds every output from scratch (sorted newest first) and refreshes
+    the manifests. workers > 1 scores symbols in parallel processes.
+    Every update is mirrored into the Parquet sentiment dataset (storage.py)
+    unless publish_parquet=False. chunk_rows > 0 streams each input in
+    chunks of that many rows through a SentimentWriter (bounded memory);
+    scorer replaces analyze_titles_batched ((titles, source=) ➜ label_/score_ frame).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Group input files by symbol (input_dirs order, then filename)
+    files_by_symbol = defaultdict(list)
     for input_dir in input_dirs:
-        for filename in tqdm(os.listdir(input_dir), desc=f"🔄 {input_dir}"):
+        for filename in sorted(os.listdir(input_dir)):
             if not filename.endswith(".csv"):
                 continue
             if "_skipped" in filename:
@@ -67,50 +485,78 @@ def run_sentiment_analysis():
             if symbol not in ACTIVE_TICKERS:
                 print(f"⚠️ Skipping {filename}: '{symbol}' not in ACTIVE_TICKERS")
                 continue
+            files_by_symbol[symbol].append(os.path.join(input_dir, filename))
 
-            input_path = os.path.join(input_dir, filename)
-
-            try:
-                df = pd.read_csv(input_path, parse_dates=["date"], encoding="utf-8")
-                df.columns = [col.strip().lower() for col in df.columns]
-                if "title" not in df.columns or df.empty:
-                    print(f"⚠️ Skipping {filename}; no 'title' column or empty.")
-                    continue
-
-                # Run sentiment models
-                df = df[df["title"].notnull()]
-                model_results = df["title"].apply(analyze_all_models).apply(pd.Series)
-                df = pd.concat([df.reset_index(drop=True), model_results.reset_index(drop=True)], axis=1)
+    tasks = [
+        (symbol, files_by_symbol[symbol], output_dir, incremental, manifest_dir, chunk_rows, publish_parquet, scorer)
+        for symbol in sorted(files_by_symbol)
+    ]
 
-                combined_by_symbol[symbol].append(df)
-                tqdm.write(f"✅ {symbol}: Processed {len(df)} rows from {filename}")
+    print("🔁 Scoring, deduping, and saving per-symbol sentiment files...")
 
+    near_dedup.STATS.clear()
+    INFERENCE_STATS.clear()
+    for symbol, dfs, manifest, seen_files, (hits, misses, near_dup, inference) in iter_scored_symbols(tasks, workers, threads_per_worker):
+        if workers > 1:
+            near_dedup.STATS.update(near_dup)
+            merge_inference_stats(inference)
+            if SCORE_CACHE is not None:
+                SCORE_CACHE.hits.update(hits)
+                SCORE_CACHE.misses.update(misses)
+        if dfs is None:
+            continue  # streamed: already written by stream_symbol
 
-            except Exception as e:
-                print(f"❌ Error processing {filename}: {e}")
+        output_path = os.path.join(output_dir, f"{symbol}_sentiment.csv")
+        deduped_df = None
 
-    print("🔁 Merging, deduping, and saving final per-symbol sentiment files...")
+        if dfs:
+            merged_df = pd.concat(dfs, ignore_index=True)
 
-    for symbol, dfs in combined_by_symbol.items():
-        merged_df = pd.concat(dfs, ignore_index=True)
+            # Deduplicate across the symbol's input files
+            keys = row_keys(merged_df)
+            keep = first_occurrence(keys)
+            deduped_df = merged_df[keep]
+            new_keys = keys[keep]
 
-        # Create hash for deduplication
-        def make_hash(row):
-            return hashlib.md5(f"{row.get('date','')}_{row.get('title','')}".lower().encode("utf-8")).hexdigest()
+            if "date" in deduped_df.columns:
+                deduped_df = deduped_df.sort_values("date", ascending=False)
 
-        merged_df["__hash"] = merged_df.apply(make_hash, axis=1)
-        deduped_df = merged_df.drop_duplicates(subset="__hash").drop(columns="__hash")
+            if incremental:
+                append_to_output(output_path, deduped_df)
+                manifest["seen"].add(new_keys)
+                print(f"✅ {symbol}: {len(deduped_df)} new rows ➜ {output_path}")
+            else:
+                deduped_df.to_csv(output_path, index=False)
+                manifest = {"files": {}, "seen": SeenKeys(keys_path(symbol, manifest_dir))}
+                manifest["seen"].clear()
+                manifest["seen"].add(new_keys)
+                print(f"✅ {symbol}: {len(dfs)} source files ➜ {len(deduped_df)} unique rows ➜ {output_path}")
 
-        if "date" in deduped_df.columns:
-            deduped_df["date"] = pd.to_datetime(deduped_df["date"], errors="coerce")
-            deduped_df = deduped_df.sort_values("date", ascending=False)
+        if publish_parquet and (incremental or deduped_df is not None):
+            publish_sentiment(symbol, output_path, deduped_df, replace=not incremental)
 
-        output_path = os.path.join(output_dir, f"{symbol}_sentiment.csv")
-        deduped_df.to_csv(output_path, index=False)
+        # Persist the manifest, including symbols whose changed inputs held no new rows
+        if manifest is not None:
+            manifest["files"].update(seen_files)
+            save_manifest(symbol, manifest, manifest_dir)
 
-        print(f"✅ {symbol}: {len(dfs)} source files ➜ {len(deduped_df)} unique rows ➜ {output_path}")
+    if SCORE_CACHE is not None:
+        SCORE_CACHE.report()
+    near_dedup.report(n_models=len(MODEL_PIPELINES))
+    report_inference_stats()
 
 
 
 if __name__ == "__main__":
-    run_sentiment_analysis()
+    parser = argparse.ArgumentParser(description="Score news headlines with every sentiment model.")
+    parser.add_argument("--full", action="store_true", help="Rebuild all sentiment outputs instead of appending new rows")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SENTIMENT_WORKERS", 1)),
+                        help="Worker processes to shard symbols across (default: SENTIMENT_WORKERS or 1)")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Intra-op threads per worker (default: cores // workers)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="Stream inputs this many rows at a time (default: SENTIMENT_CHUNK_ROWS or 0 = whole files)")
+    args = parser.parse_args()
+
+    run_sentiment_analysis(incremental=not args.full, workers=args.workers, threads_per_worker=args.threads_per_worker,
+                           chunk_rows=args.chunk_rows)
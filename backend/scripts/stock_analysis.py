@@ -1,9 +1,14 @@
 import pandas as pd
 import os
-import requests
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from http_cache import HTTP_CACHE
+from price_store import PriceStore
+
 load_dotenv()
 
 # === Paths ===
@@ -11,57 +16,39 @@ FMP_API_KEY = os.getenv("FMP_API_KEY")
 if not FMP_API_KEY:
     raise EnvironmentError("❌ Missing FMP_API_KEY in .env")
 
-input_dir = "outputs/results/sentiment"
-output_dir = "outputs/results/merged"
-os.makedirs(output_dir, exist_ok=True)
+# Sentiment input and merged output go through storage.py
+# (Parquet dataset + legacy outputs/results/merged/merged_{SYMBOL}.csv)
+
+# Daily bars live in the local price store; only days it doesn't hold yet are fetched
+PRICE_STORE = PriceStore()
 
-# === Fetch FMP Price Data ===
+# === Load Price Data (fetching only missing days from FMP) ===
 def get_fmp_stock_data(symbol, start_date, end_date):
     # Add a 3-day buffer to increase chance of valid nextdayclose
     buffered_end_date = min(end_date + pd.Timedelta(days=3), datetime.today().date())
 
-    url = (
-        f"https://financialmodelingprep.com/api/v3/historical-price-full/{symbol}"
-        f"?from={start_date}&to={buffered_end_date}&apikey={FMP_API_KEY}"
-    )
-
-    print(f"🔍 Fetching FMP data for {symbol} from {start_date} to {buffered_end_date}")
-    print(f"🌐 URL: {url}")
-
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise RuntimeError(f"❌ FMP request failed: {response.text}")
-
-    raw_data = response.json().get("historical", [])
-    if not raw_data:
-        print(f"⚠️ No stock data returned for {symbol} (empty response).")
+    PRICE_STORE.ensure(symbol, start_date, buffered_end_date)
+    df = PRICE_STORE.load(symbol, start_date, buffered_end_date)
+    if df.empty:
+        print(f"⚠️ No stock data for {symbol} between {start_date} and {buffered_end_date}.")
         return pd.DataFrame()
 
-    # Build DataFrame
-    df = pd.DataFrame(raw_data)
-    df.columns = [col.strip().lower() for col in df.columns]
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date").reset_index(drop=True)
-
-    print(f"✅ Fetched {len(df)} rows of price data for {symbol}")
+    print(f"✅ Loaded {len(df)} rows of price data for {symbol}")
     return df
 
 
 # === Merge Sentiment + Price Data ===
-for filename in os.listdir(input_dir):
-    if not filename.endswith("sentiment.csv"):
-        continue
-
-    symbol = filename.split("_")[0].upper()
+for sentiment_ticker in storage.list_tickers("sentiment"):
+    symbol = sentiment_ticker.upper()
     if symbol in ["BRK-A", "BRK.A"]:
         symbol = "BRK-A"
     elif symbol in ["BRK-B", "BRK.B"]:
         symbol = "BRK-B"
 
-    sentiment_path = os.path.join(input_dir, filename)
+    filename = f"{sentiment_ticker}_sentiment"
 
     try:
-        sentiment_df = pd.read_csv(sentiment_path)
+        sentiment_df = storage.read_ticker("sentiment", sentiment_ticker)
         sentiment_df.columns = [col.strip().lower() for col in sentiment_df.columns]
 
         if "date" not in sentiment_df.columns:
@@ -92,9 +79,12 @@ for filename in os.listdir(input_dir):
         if missing_count > 0:
             print(f"⚠️ {symbol} has {missing_count} rows with missing return data.")
 
-        merged_path = os.path.join(output_dir, f"merged_{symbol}.csv")
-        merged_df.to_csv(merged_path, index=False)
-        print(f"✅ Merged and saved: {merged_path}")
+        storage.write_ticker("merged", symbol, merged_df)
+        print(f"✅ Merged and saved: {storage.ticker_csv_path('merged', symbol)}")
 
     except Exception as e:
         print(f"❌ Failed for {filename} ➜ {e}")
+
+PRICE_STORE.report()
+if HTTP_CACHE is not None:
+    HTTP_CACHE.report()
@@ -2,31 +2,86 @@
 
 import pandas as pd
 import os
+import sys
 
-INPUT_PATH = "outputs/results/merged_sentiment_price.csv"
-OUTPUT_PATH = "outputs/results/merged_sentiment_price.csv"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from price_store import PriceStore
+
+# Reads and rewrites the "merged" dataset (Parquet + legacy unified CSV)
+OUTPUT_PATH = storage.DATASETS["merged"]["unified_csv"]
+
+def daily_price_frame(df):
+    """One close per (ticker, trading day): the last close seen that day. Days without a close are skipped."""
+    prices = pd.DataFrame({'ticker': df['ticker'], 'day': df['date'].dt.normalize(), 'close': df['close']})
+    prices = prices.dropna(subset=['close']).sort_values(['ticker', 'day'], kind='stable')
+    return prices.drop_duplicates(['ticker', 'day'], keep='last').reset_index(drop=True)
 
 def compute_next_day_returns(df):
+    """
+    nextdayclose / nextdayreturn per headline row, computed once per
+    (ticker, trading day) on the deduplicated price frame and broadcast
+    back, so repeated per-headline closes don't count as trading days.
+    """
     df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values(by=['ticker', 'date'])
+    prices = daily_price_frame(df)
+    prices['nextdayclose'] = prices.groupby('ticker', sort=False)['close'].shift(-1)
+    prices['nextdayreturn'] = (prices['nextdayclose'] - prices['close']) / prices['close']
 
-    def group_logic(group):
-        group = group.sort_values(by='date')
-        group['nextdayclose'] = group['close'].shift(-1)
-        group['nextdayreturn'] = (group['nextdayclose'] - group['close']) / group['close']
-        return group
-
-    df = df.groupby('ticker', group_keys=False).apply(group_logic)
+    keys = pd.MultiIndex.from_arrays([df['ticker'], df['date'].dt.normalize()])
+    per_day = prices.set_index(['ticker', 'day'])
+    for col in ['nextdayclose', 'nextdayreturn']:
+        df[col] = per_day[col].reindex(keys).to_numpy()
     return df
 
+def apply_store_returns(df, store):
+    """
+    Refresh close / nextdayclose / nextdayreturn from the local price store
+    (trading-day based, no network). Returns (df, tickers the store covered).
+    """
+    df['date'] = pd.to_datetime(df['date'])
+    day = df['date'].dt.normalize()
+    covered = []
+    for ticker, idx in df.groupby('ticker').groups.items():
+        prices = store.daily_returns(ticker, day[idx].min(), day[idx].max() + pd.Timedelta(days=7))
+        if prices.empty:
+            continue
+        prices = prices.set_index('date')
+        for col in ['close', 'nextdayclose', 'nextdayreturn']:
+            df.loc[idx, col] = day[idx].map(prices[col]).to_numpy()
+        covered.append(ticker)
+    return df, covered
+
+def update_ticker(ticker, store):
+    """Refresh one ticker's merged rows in place. Returns True when the price store covered it."""
+    df = storage.read_ticker("merged", ticker)
+    if df.empty:
+        return False
+    df["ticker"] = ticker
+    df, covered = apply_store_returns(df, store)
+    if not covered:
+        df = compute_next_day_returns(df)
+    # Without Parquet the per-ticker CSVs are the dataset, so they are rewritten too
+    storage.write_ticker("merged", ticker, df, write_csv=not storage.parquet_enabled())
+    return bool(covered)
+
 def main():
-    if not os.path.exists(INPUT_PATH):
-        raise FileNotFoundError(f"Input CSV not found at {INPUT_PATH}")
+    tickers = storage.list_tickers("merged")
+    if not tickers:
+        raise FileNotFoundError(f"Merged dataset not found (looked for {storage.DATASET_DIR}/merged and {storage.DATASETS['merged']['ticker_csv']})")
+
+    # Pass 1: one ticker in memory at a time. Tickers in the price store get
+    # returns from their daily bars; the rest fall back to row closes
+    store = PriceStore()
+    covered = sum(update_ticker(ticker, store) for ticker in tickers)
+    print(f"📈 {covered} tickers from the price store, {len(tickers) - covered} from row closes")
 
-    df = pd.read_csv(INPUT_PATH)
-    updated_df = compute_next_day_returns(df)
-    updated_df.to_csv(OUTPUT_PATH, index=False)
-    print(f"✅ nextdayclose and nextdayreturn added successfully to: {OUTPUT_PATH}")
+    # Pass 2: stream the legacy unified CSV from the rewritten partitions
+    if storage.WRITE_CSV or not storage.parquet_enabled():
+        rows = storage.export_unified_csv("merged")
+        print(f"✅ nextdayclose and nextdayreturn added successfully to: {OUTPUT_PATH} ({rows} rows)")
+    else:
+        print(f"✅ nextdayclose and nextdayreturn updated for {len(tickers)} tickers")
 
 if __name__ == "__main__":
     main()
@@ -2,28 +2,20 @@ import os
 import pandas as pd
 import json
 
+from relevance import VALIDATION_KEYWORDS, RelevanceClassifier, load_learned_keywords
+
 # === Load tickers and queries ===
 with open("config/tickers.json") as f:
     tickers_json = json.load(f)
 
 tickers = [entry["ticker"].lower() for entry in tickers_json]
 
-# === Smart keyword rules ===
-validation_keywords = [
-    "stock", "share", "ipo", "company", "acquisition", "earnings", "forecast",
-    "results", "trading", "dividend", "price", "merger", "buyback", "equity",
-    "capital", "ceo", "profit", "loss", "revenue", "cloud", "ai", "aws",
-    "summit", "product", "launch", "report", "announcement"
-]
+# === Smart keyword rules (static + learned keywords, ticker symbols), compiled once ===
+relevance = RelevanceClassifier(VALIDATION_KEYWORDS + load_learned_keywords(), tickers)
 
 # === Validation logic ===
 def is_valid_headline(title):
-    title_lower = str(title).lower()
-    if any(kw in title_lower for kw in validation_keywords):
-        return True
-    if any(sym.lower() in title_lower for sym in tickers):
-        return True
-    return False
+    return relevance.reason(title) is not None
 
 # === Process skipped CSVs ===
 input_dir = "data/skipped_raw_news"
@@ -42,7 +34,7 @@ for filename in os.listdir(input_dir):
         continue
 
     # Apply smart validation
-    df["is_validated"] = df["title"].apply(is_valid_headline)
+    df["is_validated"] = relevance.is_relevant(df["title"])
 
     # Save validated output
     output_path = os.path.join(output_dir, filename)
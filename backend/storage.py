@@ -0,0 +1,356 @@
+# storage.py
+#
+# Dataset storage for the pipeline outputs.
+#
+# Each dataset is a Parquet dataset partitioned by ticker and month
+#   outputs/datasets/<name>/ticker=<TICKER>/month=<YYYY-MM>/part-*.parquet
+# with a fixed column schema. The legacy CSV files are still exported for
+# consumers that read them directly (validation scripts, CI commit step).
+# Without pyarrow (or with STORAGE_FORMAT=csv) everything falls back to CSV.
+import glob
+import os
+import shutil
+import time
+import uuid
+import warnings
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+DATASET_DIR = "outputs/datasets"
+STORAGE_FORMAT = os.getenv("STORAGE_FORMAT", "parquet")  # parquet | csv
+WRITE_CSV = os.getenv("STORAGE_WRITE_CSV", "1") != "0"
+
+# === Datasets and their legacy CSV locations ===
+# "newest_first": read_ticker returns rows sorted by date, newest first. The
+# sentiment CSVs are appended to, so their on-disk order is only newest-first
+# up to the last full rebuild.
+DATASETS = {
+    "sentiment": {
+        "ticker_csv": "outputs/results/sentiment/{ticker}_sentiment.csv",
+        "newest_first": True,
+    },
+    "merged": {
+        "ticker_csv": "outputs/results/merged/merged_{ticker}.csv",
+        "unified_csv": "outputs/results/merged_sentiment_price.csv",
+    },
+    # Per-ticker, per-day aggregates built by validate/build_daily_aggregates.py
+    "daily": {
+        "ticker_csv": "outputs/results/daily/daily_{ticker}.csv",
+    },
+}
+
+# === Fixed schema ===
+# label_<model> / score_<model> columns follow the string / float rules below;
+# *_count columns are integers.
+DATETIME_COLUMNS = ["date"]
+FLOAT_COLUMNS = ["close", "nextdayclose", "nextdayreturn"]
+INT_COLUMNS = ["headlines"]
+BOOL_COLUMNS = ["rescued", "is_validated"]
+PARTITION_COLUMNS = ["ticker", "month"]
+
+
+def parquet_enabled():
+    return PARQUET_AVAILABLE and STORAGE_FORMAT == "parquet"
+
+
+def column_kind(col):
+    if col in DATETIME_COLUMNS:
+        return "datetime"
+    if col in INT_COLUMNS or col.endswith("_count"):
+        return "int"
+    if col in FLOAT_COLUMNS or col.startswith("score_"):
+        return "float"
+    if col in BOOL_COLUMNS:
+        return "bool"
+    return "string"
+
+
+def parse_dates(values):
+    """
+    Dates ➜ UTC-naive datetime64[ns] Series; unparseable cells become NaT.
+    The vectorized pass assumes the first value's format, so the cells it
+    gives up on are re-parsed with format="mixed" (appended CSVs mix
+    "2025-07-01" and "2025-07-01 10:00:00").
+    """
+    values = pd.Series(values)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # "could not infer format" for mixed columns
+        parsed = pd.to_datetime(values, errors="coerce", utc=True)
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors="coerce", utc=True, format="mixed")
+    return parsed.dt.tz_localize(None).astype("datetime64[ns]")
+
+
+def apply_schema(df):
+    """Coerce every column to its schema type (datetime / int / float / bool / string)."""
+    df = df.copy()
+    for col in df.columns:
+        kind = column_kind(col)
+        if kind == "datetime":
+            df[col] = parse_dates(df[col])
+        elif kind == "float":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif kind == "int":
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+        elif kind == "bool":
+            flags = df[col].astype(str).str.strip().str.lower().isin(["true", "1", "1.0"])
+            df[col] = flags.astype("boolean").where(df[col].notna(), pd.NA)
+        else:
+            df[col] = df[col].astype(str).where(df[col].notna(), None)
+    return df
+
+
+def arrow_schema(df):
+    types = {"datetime": pa.timestamp("ns"), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(), "string": pa.string()}
+    return pa.schema([(col, types[column_kind(col)]) for col in df.columns])
+
+
+def _month(dates):
+    return dates.dt.strftime("%Y-%m").fillna("unknown")
+
+
+def _write_csv(df, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def ticker_dir(name, ticker):
+    return os.path.join(DATASET_DIR, name, f"ticker={ticker}")
+
+
+def ticker_csv_path(name, ticker):
+    return DATASETS[name]["ticker_csv"].format(ticker=ticker)
+
+
+def has_ticker(name, ticker):
+    if parquet_enabled():
+        return os.path.isdir(ticker_dir(name, ticker))
+    return os.path.exists(ticker_csv_path(name, ticker))
+
+
+def dataset_files(name, ticker=None):
+    """Files currently backing a dataset (or one ticker of it) in the active format."""
+    if parquet_enabled() and os.path.isdir(os.path.join(DATASET_DIR, name)):
+        root = ticker_dir(name, ticker) if ticker else os.path.join(DATASET_DIR, name)
+        files = glob.glob(os.path.join(root, "**", "*.parquet"), recursive=True)
+        files = [f for f in files if ".tmp" not in f]
+        if files or not ticker:
+            return sorted(files)
+    if ticker:
+        path = ticker_csv_path(name, ticker)
+        return [path] if os.path.exists(path) else []
+    unified_csv = DATASETS[name].get("unified_csv")
+    if unified_csv:
+        return [unified_csv] if os.path.exists(unified_csv) else []
+    return sorted(glob.glob(ticker_csv_path(name, "*")))
+
+
+def files_signature(paths):
+    """Cheap change detector: (file count, newest mtime_ns, total size)."""
+    mtime, size, count = 0, 0, 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue  # swapped out mid-scan; the next check will see the new files
+        mtime, size, count = max(mtime, st.st_mtime_ns), size + st.st_size, count + 1
+    return (count, mtime, size)
+
+
+def list_tickers(name):
+    """Tickers with a Parquet partition or a legacy CSV (read_ticker falls back to the CSV)."""
+    tickers = set()
+    if parquet_enabled() and os.path.isdir(os.path.join(DATASET_DIR, name)):
+        tickers.update(
+            d.split("=", 1)[1]
+            for d in os.listdir(os.path.join(DATASET_DIR, name))
+            if d.startswith("ticker=") and not d.endswith(".tmp")
+        )
+    pattern = ticker_csv_path(name, "*")
+    prefix, suffix = pattern.split("*")
+    tickers.update(path[len(prefix):-len(suffix)] for path in glob.glob(pattern))
+    return sorted(tickers)
+
+
+# === Writes ===
+def write_ticker(name, ticker, df, append=False, write_csv=WRITE_CSV):
+    """
+    Write one ticker's rows. append=False atomically replaces the ticker's
+    partition; append=True adds new part files next to the existing ones.
+    The per-ticker legacy CSV is rewritten unless write_csv=False.
+    """
+    df = apply_schema(df.drop(columns=PARTITION_COLUMNS, errors="ignore"))
+
+    if parquet_enabled():
+        target = ticker_dir(name, ticker)
+        staging = target if append else f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+        months = _month(df["date"]) if "date" in df.columns else pd.Series("unknown", index=df.index)
+        table_schema = arrow_schema(df)
+        part_name = f"part-{time.time_ns()}.parquet"
+        for month, part in df.groupby(months, sort=True):
+            month_dir = os.path.join(staging, f"month={month}")
+            os.makedirs(month_dir, exist_ok=True)
+            table = pa.Table.from_pandas(part, schema=table_schema, preserve_index=False)
+            pq.write_table(table, os.path.join(month_dir, part_name))
+
+        if not append:
+            os.makedirs(staging, exist_ok=True)
+            retired = f"{target}.{uuid.uuid4().hex[:8]}.old.tmp"
+            if os.path.exists(target):
+                os.replace(target, retired)
+            os.replace(staging, target)
+            shutil.rmtree(retired, ignore_errors=True)
+
+    if write_csv or not parquet_enabled():
+        _write_csv(df, ticker_csv_path(name, ticker))
+
+
+def write_table(name, df):
+    """
+    Replace every ticker present in `df` (which must have a 'ticker' column)
+    and re-export the dataset's unified CSV when it has one.
+    """
+    unified_csv = DATASETS[name].get("unified_csv")
+    if parquet_enabled() or not unified_csv:
+        for ticker, group in df.groupby("ticker", sort=True):
+            write_ticker(name, ticker, group, write_csv=not unified_csv and WRITE_CSV)
+    if unified_csv and (WRITE_CSV or not parquet_enabled()):
+        _write_csv(df, unified_csv)
+
+
+# === Reads ===
+def _read_parquet(path, tickers=None, columns=None):
+    files = glob.glob(os.path.join(path, "**", "*.parquet"), recursive=True)
+    files = [f for f in files if ".tmp" not in f]
+    if not files:
+        return pd.DataFrame()
+
+    # Unify schemas so tickers written with different model columns still load together
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files])
+    for col in PARTITION_COLUMNS:
+        schema = schema.append(pa.field(col, pa.string()))
+    partitioning = ds.partitioning(pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor="hive")
+    dataset = ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning, partition_base_dir=path)
+
+    filter_expr = ds.field("ticker").isin(list(tickers)) if tickers else None
+    if columns is not None:
+        columns = [c for c in columns if c in schema.names]
+    table = dataset.to_table(columns=columns, filter=filter_expr)
+    df = table.to_pandas()
+    return df.drop(columns=["month"], errors="ignore")
+
+
+def _newest_first(name, df):
+    if not DATASETS[name].get("newest_first") or "date" not in df.columns:
+        return df
+    dates = parse_dates(df["date"]).reset_index(drop=True)
+    order = dates.sort_values(ascending=False, kind="stable", na_position="last").index
+    return df.iloc[order].reset_index(drop=True)
+
+
+def read_ticker(name, ticker, columns=None):
+    if parquet_enabled() and has_ticker(name, ticker):
+        # Same columns as the per-ticker CSV: the ticker lives in the partition path
+        df = _read_parquet(ticker_dir(name, ticker), columns=columns).drop(columns=["ticker"], errors="ignore")
+        df = _newest_first(name, df)
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    path = ticker_csv_path(name, ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    df = pd.read_csv(path)
+    df.columns = [col.strip().lower() for col in df.columns]
+    df = _newest_first(name, df)
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+def table_exists(name):
+    if parquet_enabled() and os.path.isdir(os.path.join(DATASET_DIR, name)):
+        return True
+    unified_csv = DATASETS[name].get("unified_csv")
+    return os.path.exists(unified_csv) if unified_csv else bool(list_tickers(name))
+
+
+def read_table(name, tickers=None, columns=None, dates_as_str=False):
+    """
+    Read a whole dataset (optionally only some tickers / columns).
+    dates_as_str=True renders datetime columns the way the legacy CSV did,
+    for callers that serialize rows straight to JSON.
+    """
+    if parquet_enabled() and os.path.isdir(os.path.join(DATASET_DIR, name)):
+        df = _read_parquet(os.path.join(DATASET_DIR, name), tickers=tickers, columns=columns)
+    elif DATASETS[name].get("unified_csv"):
+        df = pd.read_csv(DATASETS[name]["unified_csv"])
+        if tickers:
+            df = df[df["ticker"].isin(tickers)]
+        if columns:
+            df = df[[c for c in columns if c in df.columns]]
+        return df
+    else:
+        frames = [read_ticker(name, t, columns).assign(ticker=t) for t in (tickers or list_tickers(name))]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    if dates_as_str:
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                only_dates = (df[col].dropna() == df[col].dropna().dt.normalize()).all()
+                df[col] = df[col].dt.strftime("%Y-%m-%d" if only_dates else "%Y-%m-%d %H:%M:%S")
+    return df
+
+
+def ticker_columns(name, ticker):
+    """A ticker's column names (without partition columns), from file metadata only."""
+    if parquet_enabled() and has_ticker(name, ticker):
+        columns = []
+        for path in dataset_files(name, ticker):
+            columns += [c for c in pq.read_schema(path).names if c not in columns and c not in PARTITION_COLUMNS]
+        return columns
+    path = ticker_csv_path(name, ticker)
+    if not os.path.exists(path):
+        return []
+    return [col.strip().lower() for col in pd.read_csv(path, nrows=0).columns if col.strip().lower() != "ticker"]
+
+
+def iter_tickers(name, tickers=None, columns=None):
+    """Yield (ticker, rows with a 'ticker' column) one ticker at a time."""
+    for ticker in tickers or list_tickers(name):
+        df = read_ticker(name, ticker, columns)
+        if not df.empty:
+            yield ticker, df.assign(ticker=ticker)
+
+
+def export_unified_csv(name="merged"):
+    """
+    Stream the dataset's legacy unified CSV from the per-ticker data: one
+    ticker in memory at a time, every chunk aligned to the union of all
+    tickers' columns (ticker last). Returns the number of rows written.
+    """
+    path = DATASETS[name]["unified_csv"]
+    tickers = list_tickers(name)
+    columns = []
+    for ticker in tickers:
+        columns += [c for c in ticker_columns(name, ticker) if c not in columns]
+    columns.append("ticker")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    with open(tmp_path, "w", newline="") as f:
+        pd.DataFrame(columns=columns).to_csv(f, index=False)
+        for _, df in iter_tickers(name, tickers):
+            # Fixed date format: chunks must not switch to date-only output on their own
+            df.reindex(columns=columns).to_csv(f, header=False, index=False, date_format="%Y-%m-%d %H:%M:%S")
+            rows += len(df)
+    os.replace(tmp_path, path)
+    return rows
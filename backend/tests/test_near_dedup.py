@@ -0,0 +1,30 @@
+# tests/test_near_dedup.py
+#   python -m pytest backend/tests
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import near_dedup  # noqa: E402
+
+
+def test_opposite_headlines_sharing_a_prefix_are_not_merged():
+    titles = [
+        "Nvidia - Shares plunge on China export ban",
+        "Nvidia - Shares soar on record data center sales",
+    ]
+    assert list(near_dedup.representatives(titles)) == [0, 1]
+
+
+def test_publisher_suffix_variants_are_merged():
+    titles = [
+        "Apple beats quarterly earnings estimates - Reuters",
+        "Apple beats quarterly earnings estimates | Yahoo Finance",
+        "Apple misses quarterly revenue estimates - Reuters",
+    ]
+    assert list(near_dedup.representatives(titles)) == [0, 0, 2]
+
+
+def test_short_title_keeps_its_suffix():
+    normalized = near_dedup.normalize_titles(["Nvidia - Shares plunge", "Stocks rally on jobs data - CNBC"])
+    assert list(normalized) == ["nvidia shares plunge", "stocks rally on jobs data"]
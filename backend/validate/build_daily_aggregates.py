@@ -0,0 +1,93 @@
+# validate/build_daily_aggregates.py
+#
+# Materialize per-ticker, per-day sentiment aggregates from the merged dataset:
+#   headlines, score_<model>_{mean,min,max,count}, last close, last next-day return
+# Served by /api/sentiment-over-time and /api/model-comparison.
+#
+# Incremental: a ticker is only re-aggregated when the files backing its merged
+# rows changed since the last run (signature stored in STATE_PATH).
+#   python3 validate/build_daily_aggregates.py [--full]
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+
+STATE_PATH = "outputs/state/daily_aggregates.json"
+
+
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH, "r") as f:
+        return json.load(f)
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp_path = f"{STATE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def aggregate_daily(df):
+    """One row per calendar day of `df` (a single ticker's merged rows)."""
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"]).sort_values("date", kind="stable")
+    df["day"] = df["date"].dt.normalize()
+
+    score_cols = sorted(c for c in df.columns if c.startswith("score_"))
+    for col in score_cols + ["close", "nextdayreturn"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    spec = {"headlines": ("date", "size")}
+    for col in score_cols:
+        for stat in ("mean", "min", "max", "count"):
+            spec[f"{col}_{stat}"] = (col, stat)
+    # "last" skips NaN, so a day keeps its most recent known close / return
+    for col in ("close", "nextdayreturn"):
+        if col in df.columns:
+            spec[col] = (col, "last")
+
+    daily = df.groupby("day", sort=True).agg(**spec).reset_index().rename(columns={"day": "date"})
+    return daily
+
+
+def build_daily_aggregates(full=False):
+    state = {} if full else load_state()
+    tickers = storage.list_tickers("merged")
+    updated, skipped = 0, 0
+
+    for ticker in tickers:
+        signature = list(storage.files_signature(storage.dataset_files("merged", ticker)))
+        if state.get(ticker) == signature and storage.has_ticker("daily", ticker):
+            skipped += 1
+            continue
+
+        rows = storage.read_ticker("merged", ticker)
+        if rows.empty or "date" not in rows.columns:
+            print(f"⚠️ No merged rows for {ticker}")
+            continue
+
+        daily = aggregate_daily(rows)
+        storage.write_ticker("daily", ticker, daily)
+        state[ticker] = signature
+        updated += 1
+        print(f"📊 {ticker}: {len(rows)} rows ➜ {len(daily)} days")
+
+    save_state(state)
+    print(f"✅ Daily aggregates: {updated} tickers rebuilt, {skipped} unchanged")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-ticker daily sentiment aggregates.")
+    parser.add_argument("--full", action="store_true", help="Rebuild every ticker, ignoring the saved state")
+    args = parser.parse_args()
+    build_daily_aggregates(full=args.full)
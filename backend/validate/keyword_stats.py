@@ -0,0 +1,144 @@
+# validate/keyword_stats.py
+#
+# Per-keyword usage statistics over data/raw_news for prune_dead_keywords.py:
+#   keyword, hits (substring occurrences in titles), last_seen (latest headline date)
+#
+# Each news file is tokenized once into word counts + last-seen dates, cached
+# by file signature in FILES_STATE_PATH, so a run only re-reads files that
+# changed. Keyword hits are then resolved against the (much smaller) merged
+# vocabulary in one pass per keyword. Keywords are matched inside words, which
+# for word-character keywords (everything learn_keywords.py produces) gives
+# exactly the old " ".join(titles).count(kw) numbers.
+#   python3 validate/keyword_stats.py [--full]
+import argparse
+import json
+import os
+import re
+from bisect import bisect_right
+from collections import Counter
+
+import pandas as pd
+
+KEYWORDS_FILE = "config/learned_keywords.txt"
+NEWS_DIR = "data/raw_news"
+FILES_STATE_PATH = "outputs/state/keyword_stats_files.json"
+STATS_PATH = "outputs/state/keyword_stats.csv"
+WORD_RE = re.compile(r"\w+")
+
+
+def load_keywords():
+    if not os.path.exists(KEYWORDS_FILE):
+        return []
+    with open(KEYWORDS_FILE, "r") as f:
+        return [kw.strip().lower() for kw in f.readlines() if kw.strip()]
+
+
+def load_state():
+    if not os.path.exists(FILES_STATE_PATH):
+        return {}
+    with open(FILES_STATE_PATH, "r") as f:
+        return json.load(f)
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(FILES_STATE_PATH), exist_ok=True)
+    tmp_path = f"{FILES_STATE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, FILES_STATE_PATH)
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def tokenize_file(path):
+    """{word: [occurrences, last_seen]} for one news CSV (last_seen is YYYY-MM-DD or "")."""
+    df = pd.read_csv(path, usecols=lambda c: c in ("title", "date"))
+    if "title" not in df.columns:
+        return {}
+    titles = df["title"].dropna()
+    dates = df["date"].reindex(titles.index).fillna("").astype(str).str[:10] if "date" in df.columns else None
+
+    tokens = {}
+    for i, title in titles.astype(str).items():
+        seen = "" if dates is None else dates[i]
+        for word, count in Counter(WORD_RE.findall(title.lower())).items():
+            entry = tokens.get(word)
+            if entry is None:
+                tokens[word] = [count, seen]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], seen)
+    return tokens
+
+
+def update_file_stats(full=False):
+    """Refresh the per-file token cache; returns (state, files re-read)."""
+    state = {} if full else load_state()
+    files = sorted(f for f in os.listdir(NEWS_DIR) if f.endswith("_news.csv")) if os.path.isdir(NEWS_DIR) else []
+    reread = 0
+    for file in files:
+        path = os.path.join(NEWS_DIR, file)
+        signature = file_signature(path)
+        if state.get(file, {}).get("signature") == signature:
+            continue
+        state[file] = {"signature": signature, "tokens": tokenize_file(path)}
+        reread += 1
+    for gone in set(state) - set(files):
+        del state[gone]
+    return state, reread
+
+
+def keyword_stats(keywords, state):
+    """DataFrame[keyword, hits, last_seen] for `keywords` from the per-file token cache."""
+    vocab = {}
+    for entry in state.values():
+        for word, (count, seen) in entry["tokens"].items():
+            known = vocab.get(word)
+            vocab[word] = [count, seen] if known is None else [known[0] + count, max(known[1], seen)]
+
+    # All words in one newline-separated string: each keyword is one C-level
+    # scan, and a match can never straddle two words
+    words = list(vocab)
+    text = "\n".join(words)
+    offsets, pos = [], 0
+    for word in words:
+        offsets.append(pos)
+        pos += len(word) + 1
+
+    rows = []
+    for kw in keywords:
+        hits, last_seen = 0, ""
+        for match in re.finditer(re.escape(kw), text):
+            count, seen = vocab[words[bisect_right(offsets, match.start()) - 1]]
+            hits += count
+            last_seen = max(last_seen, seen)
+        rows.append({"keyword": kw, "hits": hits, "last_seen": last_seen or None})
+    return pd.DataFrame(rows, columns=["keyword", "hits", "last_seen"])
+
+
+def load_stats():
+    if not os.path.exists(STATS_PATH):
+        return pd.DataFrame(columns=["keyword", "hits", "last_seen"])
+    return pd.read_csv(STATS_PATH, keep_default_na=False, na_values=[""])
+
+
+def build_keyword_stats(full=False):
+    state, reread = update_file_stats(full=full)
+    keywords = load_keywords()
+    stats = keyword_stats(keywords, state)
+    save_state(state)
+
+    os.makedirs(os.path.dirname(STATS_PATH), exist_ok=True)
+    stats.to_csv(STATS_PATH, index=False)
+    print(f"✅ Keyword stats for {len(keywords)} keywords ({reread}/{len(state)} news files re-read) ➜ {STATS_PATH}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count learned-keyword usage in the raw news headlines.")
+    parser.add_argument("--full", action="store_true", help="Re-read every news file, ignoring the saved state")
+    args = parser.parse_args()
+    build_keyword_stats(full=args.full)
@@ -1,33 +1,106 @@
 # backend/validate/learn_keywords.py
+#
+# Learns the top MAX_FEATURES terms of the manually flagged headlines
+# (data/manual_review/*_flagged_relevant.csv) into config/learned_keywords.txt.
+#
+# Incremental: term counts are kept per flagged file in STATE_PATH together
+# with the number of bytes already counted and a hash of the last GUARD_BYTES
+# of that prefix. Flagged files are append-only, so a run checks the guard,
+# seeks past the counted bytes and only reads and analyzes the rows appended
+# since the last run; a file whose guard changed (rewritten, truncated) is
+# recounted from scratch. Terms come from the same CountVectorizer analyzer
+# as before, ranked by (-count, term).
+#   python3 validate/learn_keywords.py [--full]
 
+import argparse
+import hashlib
+import io
+import json
 import os
+from collections import Counter
+
 import pandas as pd
 from sklearn.feature_extraction.text import CountVectorizer
 
 REVIEW_DIR = "data/manual_review"
 OUTPUT_FILE = "config/learned_keywords.txt"
+STATE_PATH = "outputs/state/learned_keywords.json"
 MAX_FEATURES = 100
+GUARD_BYTES = 4096
 STOP_WORDS = "english"
 
-def extract_keywords():
-    keyword_set = set()
-    all_titles = []
+def load_state():
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH, "r") as f:
+        return json.load(f)
 
-    for file in os.listdir(REVIEW_DIR):
-        if file.endswith("_flagged_relevant.csv"):
-            df = pd.read_csv(os.path.join(REVIEW_DIR, file))
-            titles = df["title"].dropna().astype(str).tolist()
-            all_titles.extend(titles)
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp_path = f"{STATE_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, STATE_PATH)
 
-    if not all_titles:
-        print("🚫 No flagged titles found to learn from.")
-        return
+def guard_digest(f, end):
+    """sha1 of the GUARD_BYTES before `end` (the last counted line)."""
+    start = max(0, end - GUARD_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+def read_new_titles(path, entry):
+    """(titles appended since `entry` was recorded, new entry position fields, full recount?)."""
+    done = entry.get("bytes", 0) if entry else 0
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if done and "guard" in entry and size >= done and guard_digest(f, done) == entry["guard"]:
+            f.seek(done)
+            tail = f.read()
+            columns = entry["columns"]
+            df = pd.read_csv(io.BytesIO(tail), header=None, names=columns) if tail.strip() else pd.DataFrame()
+            recount = False
+        else:
+            f.seek(0)
+            df = pd.read_csv(io.BytesIO(f.read()))
+            columns = df.columns.tolist()
+            recount = True
+        size = f.tell()
+        position = {"bytes": size, "guard": guard_digest(f, size), "columns": columns}
+    titles = df["title"].dropna().astype(str).tolist() if "title" in df.columns else []
+    return titles, position, recount
 
-    vectorizer = CountVectorizer(stop_words=STOP_WORDS, max_features=MAX_FEATURES)
-    X = vectorizer.fit_transform(all_titles)
-    keywords = vectorizer.get_feature_names_out()
+def update_term_counts(state, analyzer):
+    """Fold newly flagged rows into the per-file counts; returns the number of titles analyzed."""
+    files = sorted(f for f in os.listdir(REVIEW_DIR) if f.endswith("_flagged_relevant.csv")) if os.path.isdir(REVIEW_DIR) else []
+    analyzed = 0
+    for file in files:
+        entry = state.get(file)
+        titles, position, recount = read_new_titles(os.path.join(REVIEW_DIR, file), entry)
+        counts = Counter() if recount or entry is None else Counter(entry["counts"])
+        for title in titles:
+            counts.update(analyzer(title))
+        analyzed += len(titles)
+        state[file] = {**position, "counts": dict(counts)}
+    for gone in set(state) - set(files):
+        del state[gone]
+    return analyzed
 
-    keyword_set.update(keywords)
+def top_terms(state, n=MAX_FEATURES):
+    totals = Counter()
+    for entry in state.values():
+        totals.update(entry["counts"])
+    return [term for term, _ in sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))[:n]]
+
+def extract_keywords(full=False):
+    state = {} if full else load_state()
+    analyzer = CountVectorizer(stop_words=STOP_WORDS).build_analyzer()
+    analyzed = update_term_counts(state, analyzer)
+    save_state(state)
+
+    keyword_set = set(top_terms(state))
+    if not keyword_set:
+        print("🚫 No flagged titles found to learn from.")
+        return
 
     # Save learned keywords
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
@@ -35,8 +108,11 @@ def extract_keywords():
         for kw in sorted(keyword_set):
             f.write(f"{kw}\n")
 
-    print(f"✅ Learned {len(keyword_set)} keywords from flagged headlines.")
+    print(f"✅ Learned {len(keyword_set)} keywords from flagged headlines ({analyzed} new titles analyzed).")
     print(f"📁 Saved to: {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    extract_keywords()
+    parser = argparse.ArgumentParser(description="Learn relevance keywords from manually flagged headlines.")
+    parser.add_argument("--full", action="store_true", help="Recount every flagged file, ignoring the saved state")
+    args = parser.parse_args()
+    extract_keywords(full=args.full)
@@ -1,10 +1,9 @@
 # validate/prune_dead_keywords.py
+#
+# Hit counts come from validate/keyword_stats.py (outputs/state/keyword_stats.csv).
 
-import os
-import pandas as pd
+from keyword_stats import KEYWORDS_FILE, build_keyword_stats, load_stats
 
-KEYWORDS_FILE = "config/learned_keywords.txt"
-NEWS_DIR = "data/raw_news"
 PRUNE_THRESHOLD = 0  # Appear at least once to be kept
 
 def load_keywords():
@@ -16,21 +15,19 @@ def save_keywords(keywords):
         for kw in sorted(set(keywords)):
             f.write(f"{kw}\n")
 
-def collect_all_headlines():
-    all_titles = []
-    for file in os.listdir(NEWS_DIR):
-        if file.endswith("_news.csv"):
-            df = pd.read_csv(os.path.join(NEWS_DIR, file))
-            if "title" in df.columns:
-                all_titles.extend(df["title"].dropna().astype(str).tolist())
-    return " ".join(all_titles).lower()
+def load_keyword_hits(keywords):
+    """{keyword: hits} from the keyword-stats stage; rebuilt (incrementally) if it misses any keyword."""
+    stats = load_stats()
+    if not set(keywords) <= set(stats["keyword"]):
+        stats = build_keyword_stats()
+    return dict(zip(stats["keyword"], stats["hits"]))
 
 def prune_keywords():
     print("🧹 Pruning unused learned keywords...")
     current_keywords = load_keywords()
-    all_text = collect_all_headlines()
+    hits = load_keyword_hits(current_keywords)
 
-    surviving_keywords = [kw for kw in current_keywords if all_text.count(kw) > PRUNE_THRESHOLD]
+    surviving_keywords = [kw for kw in current_keywords if hits.get(kw, 0) > PRUNE_THRESHOLD]
 
     removed = set(current_keywords) - set(surviving_keywords)
     save_keywords(surviving_keywords)
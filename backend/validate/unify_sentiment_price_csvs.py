@@ -1,30 +1,25 @@
 # validate/unify_sentiment_price_csvs.py
 import os
-import glob
-import pandas as pd
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
 
 INPUT_DIR = "outputs/results/merged"
 OUTPUT_PATH = "outputs/results/merged_sentiment_price.csv"
 
 def unify_csvs():
-    files = glob.glob(os.path.join(INPUT_DIR, "merged_*.csv"))
-    all_dfs = []
-
-    for file in files:
-        ticker = os.path.basename(file).replace("merged_", "").replace(".csv", "")
-        try:
-            df = pd.read_csv(file)
-            df["ticker"] = ticker
-            all_dfs.append(df)
-        except Exception as e:
-            print(f"⚠️ Error processing {ticker}: {e}")
+    """
+    Stream every ticker of the merged dataset (Parquet partitions, or the
+    per-ticker merged_*.csv files without Parquet) into the unified CSV,
+    one ticker at a time.
+    """
+    if not storage.list_tickers("merged"):
+        print(f"❌ No merged data found in {storage.DATASET_DIR}/merged or {INPUT_DIR}.")
+        return
 
-    if all_dfs:
-        unified_df = pd.concat(all_dfs, ignore_index=True)
-        unified_df.to_csv(OUTPUT_PATH, index=False)
-        print(f"✅ Unified CSV saved to {OUTPUT_PATH} ({len(unified_df)} rows)")
-    else:
-        print("❌ No CSVs found or failed to load.")
+    rows = storage.export_unified_csv("merged")
+    print(f"✅ Unified CSV saved to {OUTPUT_PATH} ({rows} rows)")
 
 if __name__ == "__main__":
     unify_csvs()